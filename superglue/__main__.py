@@ -7,7 +7,11 @@ def main() -> None:
     load_dotenv()
     cli_args = parse_args()
     command = cli_args.command(cli_args=cli_args)
-    command()
+
+    try:
+        command()
+    finally:
+        command.close()
 
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import TypeVar
 from argparse import Namespace
+from superglue.cli.messages import Messages
 from superglue.core.components.project import SuperglueProject
 
 SuperglueCommandType = TypeVar("SuperglueCommandType", bound="BaseSuperglueCommand")
@@ -13,7 +14,7 @@ class BaseSuperglueCommand(ABC):
 
     def __init__(self, cli_args: Namespace) -> None:
         self.cli_args = cli_args
-        self.project = SuperglueProject()
+        self.project = SuperglueProject(use_hash_cache=not getattr(cli_args, "no_cache", False))
 
     @classmethod
     def method(cls) -> str:
@@ -22,3 +23,11 @@ class BaseSuperglueCommand(ABC):
     @abstractmethod
     def __call__(self) -> None:
         pass
+
+    def close(self) -> None:
+        """
+        called once the command has finished, even when it exits early.
+        Persists any local state the project gathered while running.
+        """
+        Messages.hash_cache_stats(self.project.hash_cache)
+        self.project.close()
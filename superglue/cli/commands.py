@@ -2,11 +2,55 @@ from superglue.cli.utils import validate_account
 from superglue.cli.base import BaseSuperglueCommand
 from superglue.cli.messages import Messages
 from superglue.cli.validation import ValidateNameArgument
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+from superglue.core.transfer import SuperglueUploadScheduler
+from superglue.core.deploy import SuperglueDeployScheduler
+from superglue.core.journal import SuperglueDeployJournal
+from superglue.core.plan import SuperglueDeployPlan
+from superglue.core.packaging import SuperglueModulePackager
+from superglue.core.bytecode import BYTECODE_MODES, bytecode_settings
+from superglue.core.components.base import SuperglueComponentType
+from superglue.core.components.component_list import SuperglueComponentList
+from superglue.core.aws import configure_clients, get_rate_limiter
+from superglue.environment.variables import (
+    SUPERGLUE_MAX_CONCURRENCY,
+    SUPERGLUE_AWS_MAX_POOL_CONNECTIONS,
+    SUPERGLUE_REMOTE_WORKERS,
+    SUPERGLUE_DEPLOY_PARALLELISM,
+    SUPERGLUE_S3_BUCKET,
+    SUPERGLUE_STORAGE_MODE,
+    SUPERGLUE_PACKAGE_WORKERS,
+    SUPERGLUE_ZIP_COMPRESSION,
+    SUPERGLUE_ZIP_COMPRESSION_LEVEL,
+    SUPERGLUE_BYTECODE,
+    SUPERGLUE_BYTECODE_PYTHON,
+)
 
 
 __version__ = "0.20.0"
 
 
+# shared by every command which hashes the files of superglue components
+NO_CACHE_ARG = {
+    ("--no-cache",): {
+        "action": "store_true",
+        "default": False,
+        "help": "Ignore the local hash cache and re-hash every file",
+    }
+}
+
+# shared by every command which validates the AWS account
+REVALIDATE_ARG = {
+    ("--revalidate",): {
+        "action": "store_true",
+        "default": False,
+        "help": "Ignore the cached AWS account and ask STS again",
+    }
+}
+
+
 class Version(BaseSuperglueCommand):
 
     help = "--> Print the current version of superglue and exit."
@@ -19,6 +63,8 @@ class Account(BaseSuperglueCommand):
 
     help = "--> Print the AWS account number that superglue is configured to use."
 
+    args = {**REVALIDATE_ARG}
+
     @validate_account
     def __call__(self) -> None:
         pass
@@ -70,7 +116,9 @@ class Check(BaseSuperglueCommand):
             "action": "store_true",
             "default": False,
             "help": "Set this flag to ignore the version check",
-        }
+        },
+        **NO_CACHE_ARG,
+        **REVALIDATE_ARG,
     }
 
     @validate_account
@@ -80,7 +128,7 @@ class Check(BaseSuperglueCommand):
             Messages.no_deployment()
             exit(1)
 
-        if self.project.modules.are_not_packaged():
+        if self.project.modules.are_not_packaged() or self.project.jobs.are_not_packaged():
             Messages.not_packaged()
             exit(1)
 
@@ -96,6 +144,8 @@ class Lock(BaseSuperglueCommand):
 
     help = "--> Lock superglue jobs and modules to the next version if they have active edits."
 
+    args = {**NO_CACHE_ARG}
+
     def __call__(self) -> None:
 
         Messages.locking_jobs()
@@ -121,7 +171,45 @@ class Package(BaseSuperglueCommand):
 
     help = "--> Packages all superglue jobs and modules which have been edited since the last package was issued."
 
-    args = {("-p", "--purge"): {"action": "store_true", "default": False}}
+    args = {
+        ("-p", "--purge"): {"action": "store_true", "default": False},
+        ("-f", "--force"): {
+            "action": "store_true",
+            "default": False,
+            "help": "Rebuild every module zip file, even those which are up to date",
+        },
+        ("-w", "--workers"): {
+            "type": int,
+            "default": SUPERGLUE_PACKAGE_WORKERS,
+            "help": "The number of processes building zip files at the same time.",
+        },
+        ("--compression",): {
+            "choices": ["stored", "deflated"],
+            "default": SUPERGLUE_ZIP_COMPRESSION,
+            "help": "How the files in module zip files are compressed.",
+        },
+        ("--compression-level",): {
+            "type": int,
+            "choices": range(0, 10),
+            "default": SUPERGLUE_ZIP_COMPRESSION_LEVEL,
+            "help": "Compression level from 0 (fastest) to 9 (smallest), ignored for stored zip files.",
+        },
+        ("--bytecode",): {
+            "choices": BYTECODE_MODES,
+            "default": SUPERGLUE_BYTECODE,
+            "help": "Add precompiled .pyc files to module zip files, next to the sources or in place of them.",
+        },
+        ("--bytecode-python",): {
+            "default": SUPERGLUE_BYTECODE_PYTHON,
+            "help": "The interpreter compiling the bytecode, it must be the python version of the glue runtime.",
+        },
+        ("--compare-imports",): {
+            "action": "store_true",
+            "default": False,
+            "help": "Time importing each module packaged with bytecode against importing it from its sources.",
+        },
+        **NO_CACHE_ARG,
+    }
 
     def __call__(self) -> None:
 
@@ -136,6 +224,10 @@ class Package(BaseSuperglueCommand):
         for module in self.project.modules:
             module.remove_zipfile()
             Messages.removed_zipfile(module)
+        for job in self.project.jobs:
+            if job.bundle_file.exists():
+                job.remove_bundle()
+                Messages.removed_bundle(job)
         Messages.purge_complete()
         exit(0)
 
@@ -145,12 +237,68 @@ class Package(BaseSuperglueCommand):
             exit(1)
 
     def package(self) -> None:
+        tasks = []
+        failed = []
+        bytecode = bytecode_settings(self.cli_args.bytecode, self.cli_args.bytecode_python)
+
         for module in self.project.modules:
-            module.package()
-            Messages.packaging_module(module.name)
+            try:
+                task = module.package_task(
+                    force=self.cli_args.force,
+                    compression=self.cli_args.compression,
+                    compression_level=self.cli_args.compression_level,
+                    bytecode=bytecode,
+                    compare_imports=self.cli_args.compare_imports,
+                )
+            except (RuntimeError, ValueError) as e:
+                failed.append(self.task_failed(module.name, module.zipfile, e))
+                continue
+
+            if task is None:
+                Messages.package_current(module.name)
+            else:
+                tasks.append(task)
+
+        for job in self.project.jobs:
+            if not job.bundled:
+                continue
+            try:
+                task = job.bundle_task(
+                    force=self.cli_args.force,
+                    compression=self.cli_args.compression,
+                    compression_level=self.cli_args.compression_level,
+                    bytecode=bytecode,
+                )
+            except (FileNotFoundError, RuntimeError, ValueError, SyntaxError) as e:
+                failed.append(self.task_failed(job.name, job.bundle_file, e))
+                continue
+
+            if task is None:
+                Messages.bundle_current(job.name)
+            else:
+                tasks.append(task)
+
+        # modules are built from the same files as the bundles, so all zip files are built at the same time
+        packager = SuperglueModulePackager(workers=self.cli_args.workers)
+        reports = {task["zipfile"]: task["report"] for task in tasks}
+        results = failed + packager.run(
+            tasks, on_complete=lambda result: Messages.package_result(result, reports.get(result["zipfile"]))
+        )
+
+        if any(r["status"] == "failed" for r in results):
+            Messages.packaging_failed(results)
+            exit(1)
+
         Messages.packaging_complete()
         exit(0)
 
+    @staticmethod
+    def task_failed(name: str, zipfile: Path, error: Exception) -> Dict:
+        """result of a zip file which failed before it could be built, e.g. when its requirements do not install"""
+        result = SuperglueModulePackager.failed({"name": name, "zipfile": zipfile.as_posix()}, error)
+        Messages.package_result(result)
+        return result
+
 
 class Status(BaseSuperglueCommand):
 
@@ -159,19 +307,29 @@ class Status(BaseSuperglueCommand):
     args = {
         ("-m", "--modules"): {"action": "store_true", "default": False, "dest": "only_modules"},
         ("-j", "--jobs"): {"action": "store_true", "default": False, "dest": "only_jobs"},
+        ("-c", "--concurrency"): {
+            "type": int,
+            "default": SUPERGLUE_REMOTE_WORKERS,
+            "help": "The maximum number of components whose remote status is looked up at the same time.",
+        },
+        **NO_CACHE_ARG,
+        **REVALIDATE_ARG,
     }
 
     @validate_account
     def __call__(self) -> None:
+        self.project.load_remote_state(max_workers=self.cli_args.concurrency)
         table = self.project.get_pretty_table()
+        components = []
 
         if not self.cli_args.only_jobs:
-            for module in self.project.modules:
-                table.add_row(module.pretty_table_row)
+            components.extend(self.project.modules)
 
         if not self.cli_args.only_modules:
-            for job in self.project.jobs:
-                table.add_row(job.pretty_table_row)
+            components.extend(self.project.jobs)
+
+        for row in self.project.pretty_table_rows(components, self.cli_args.concurrency):
+            table.add_row(row)
 
         print(table)
 
@@ -191,6 +349,33 @@ class Deploy(BaseSuperglueCommand):
             "default": False,
             "help": "Set this flag to increment the version number upon deployment.",
         },
+        ("--max-concurrency",): {
+            "type": int,
+            "default": SUPERGLUE_MAX_CONCURRENCY,
+            "help": "The maximum number of concurrent S3 transfers for the whole deployment.",
+        },
+        ("-p", "--parallelism"): {
+            "type": int,
+            "default": SUPERGLUE_DEPLOY_PARALLELISM,
+            "help": "The maximum number of modules and jobs deployed at the same time.",
+        },
+        ("--continue-on-error",): {
+            "action": "store_true",
+            "default": False,
+            "help": "Keep deploying the components which do not depend on a failed deployment.",
+        },
+        ("--resume",): {
+            "action": "store_true",
+            "default": False,
+            "help": "Continue an interrupted deployment from its journal instead of starting over.",
+        },
+        ("--plan-file",): {
+            "type": Path,
+            "default": None,
+            "help": "Execute a plan written by superglue plan --output instead of working it out again.",
+        },
+        **NO_CACHE_ARG,
+        **REVALIDATE_ARG,
     }
 
     @validate_account
@@ -200,10 +385,13 @@ class Deploy(BaseSuperglueCommand):
             Messages.no_deployment()
             exit(1)
 
-        if self.project.modules.are_not_packaged():
+        if self.project.modules.are_not_packaged() or self.project.jobs.are_not_packaged():
             Messages.not_packaged()
             exit(1)
 
+        self.plan = self.load_plan()
+        self.project.load_remote_state()
+
         if self.cli_args.dry:
             Messages.dry_run()
             self.dry_module_deploy()
@@ -211,8 +399,41 @@ class Deploy(BaseSuperglueCommand):
             exit(0)
 
         Messages.yes_deployment()
-        self.module_deploy()
-        self.job_deploy()
+        # make sure the shared S3 client can keep a connection open for every concurrent transfer
+        configure_clients(max_pool_connections=max(SUPERGLUE_AWS_MAX_POOL_CONNECTIONS, self.cli_args.max_concurrency))
+
+        deploy_scheduler = SuperglueDeployScheduler(
+            parallelism=self.cli_args.parallelism, continue_on_error=self.cli_args.continue_on_error
+        )
+        self.journal = self.start_journal()
+
+        try:
+            with SuperglueUploadScheduler(max_concurrency=self.cli_args.max_concurrency) as scheduler:
+                if self.plan:
+                    components = [c for c in self.project.components if self.plan.entry(c)]
+                    components.sort(key=lambda c: c.component_type != "superglue_module")
+                else:
+                    jobs = self.to_deploy(self.project.jobs)
+                    self.project.fetch_glue_state(jobs)
+                    components = self.to_deploy(self.project.modules) + jobs
+                results = deploy_scheduler.run(
+                    components,
+                    lambda c: self.deploy_component(c, scheduler),
+                    on_complete=self.deploy_complete,
+                )
+        finally:
+            # record whatever made it to S3, even when the deployment failed part way through
+            self.project.save_manifest()
+
+        # an interrupted or failed deployment keeps its journal, so it can be resumed
+        self.journal.close(deploy_scheduler.succeeded)
+
+        Messages.transfer_summary(self.project.components)
+        Messages.request_stats(get_rate_limiter().totals)
+        Messages.deploy_summary(results)
+
+        if not deploy_scheduler.succeeded:
+            exit(1)
 
     def dry_module_deploy(self) -> None:
         for module in self.project.modules.deployable():
@@ -223,22 +444,138 @@ class Deploy(BaseSuperglueCommand):
             job.generate_deployment_yml()
             Messages.job_deploy(job, dry=True)
 
-    def module_deploy(self) -> None:
-        for module in self.project.modules.deployable():
-            module.deploy(self.cli_args.increment_version)
-            Messages.module_deploy(module)
+    def load_plan(self) -> Optional[SuperglueDeployPlan]:
+        if not self.cli_args.plan_file:
+            return None
 
-    def job_deploy(self) -> None:
-        for job in self.project.jobs.deployable():
-            job.deploy(self.cli_args.increment_version)
-            Messages.job_deploy(job)
+        if self.cli_args.increment_version:
+            Messages.plan_with_increment_version()
+            exit(1)
+
+        plan = SuperglueDeployPlan.load(self.cli_args.plan_file)
+        stale = plan.stale(self.project.components)
+
+        if plan.bucket != SUPERGLUE_S3_BUCKET or plan.storage_mode != SUPERGLUE_STORAGE_MODE or stale:
+            Messages.stale_plan(self.cli_args.plan_file, stale)
+            exit(1)
+        return plan
+
+    def start_journal(self) -> SuperglueDeployJournal:
+        journal = SuperglueDeployJournal()
+
+        if journal.exists and not self.cli_args.resume:
+            Messages.discarding_journal()
+
+        journal.start(resume=self.cli_args.resume)
+        if self.cli_args.resume:
+            Messages.resuming_deploy(journal.resumed)
+
+        for component in self.project.components:
+            component.journal = journal
+        return journal
+
+    def to_deploy(self, components: SuperglueComponentList) -> List[SuperglueComponentType]:
+        """
+        the deployable components, plus the components an interrupted deployment started but did not finish.
+        a job whose files all made it to S3 is no longer deployable, but its glue jobs may not be up to date yet.
+        """
+        deployable = components.deployable()
+        if not self.journal.resumed:
+            return deployable
+
+        unfinished = [
+            c for c in components if c not in deployable and self.journal.started(c) and not self.journal.is_deployed(c)
+        ]
+        return deployable + unfinished
+
+    def deploy_component(self, component: SuperglueComponentType, scheduler: SuperglueUploadScheduler) -> None:
+        # a version number assigned by the interrupted deployment is kept, not incremented a second time
+        if self.cli_args.increment_version and self.journal.version_number(component) is None:
+            component.append_version()
+            self.journal.record_version(component)
+        component.deploy(False, scheduler, self.plan.entry(component) if self.plan else None)
+
+    def deploy_complete(self, result: Dict) -> None:
+        component = result["component"]
+
+        if result["status"] != "deployed":
+            Messages.deploy_failed(result)
+            return
+
+        self.journal.record_deployed(component)
+        self.project.manifest.update(component)
+        if component.component_type == "superglue_module":
+            Messages.module_deploy(component)
+        else:
+            Messages.job_deploy(component)
+        Messages.sync_stats(component)
+
+
+class Plan(BaseSuperglueCommand):
+
+    help = "--> Work out everything superglue deploy would do, without changing anything."
+
+    args = {
+        ("-o", "--output"): {
+            "type": Path,
+            "default": None,
+            "help": "Write the plan as json to this file, it can be executed with superglue deploy --plan-file",
+        },
+        ("--json",): {
+            "action": "store_true",
+            "default": False,
+            "help": "Print the plan as json instead of a summary",
+        },
+        **NO_CACHE_ARG,
+        **REVALIDATE_ARG,
+    }
+
+    @validate_account
+    def __call__(self) -> None:
+
+        if not self.project.is_locked():
+            Messages.no_deployment()
+            exit(1)
+
+        if self.project.modules.are_not_packaged() or self.project.jobs.are_not_packaged():
+            Messages.not_packaged()
+            exit(1)
+
+        # one bulk read of the remote state, everything else is worked out from local hashes
+        self.project.load_remote_state()
+        jobs = self.project.jobs.deployable()
+        self.project.fetch_glue_state(jobs)
+
+        plan = SuperglueDeployPlan.build(self.project.modules.deployable() + jobs)
+
+        if self.cli_args.output:
+            plan.save(self.cli_args.output)
+
+        if self.cli_args.json:
+            print(json.dumps(plan.to_dict(), indent=4))
+        else:
+            Messages.plan_summary(plan, self.cli_args.output)
 
 
 class Refresh(BaseSuperglueCommand):
 
     help = "--> Refresh all local version numbers with the latest versions stored in S3."
 
+    args = {
+        ("--rebuild-manifest",): {
+            "action": "store_true",
+            "default": False,
+            "help": "Rebuild the remote project manifest from the .version files of every component",
+        }
+    }
+
     def __call__(self) -> None:
+        if self.cli_args.rebuild_manifest:
+            self.project.load_remote_state(rebuild_manifest=True)
+            self.project.save_manifest()
+            Messages.manifest_rebuilt()
+        else:
+            self.project.load_remote_state()
 
         for component in self.project.components:
             remote_version = component.fetch_s3_version_number()
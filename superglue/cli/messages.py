@@ -1,7 +1,18 @@
-from typing import Optional
+from pathlib import Path
+from typing import Dict, Optional, List
 from superglue.core.components.base import SuperglueComponentType
 from superglue.core.components.job import SuperglueJobType
 from superglue.core.components.module import SuperglueModuleType
+from superglue.core.hash_cache import SuperglueHashCache
+from superglue.core.plan import SuperglueDeployPlan
+
+
+def format_bytes(size: int) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024 or unit == "GB":
+            break
+        size /= 1024
+    return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
 
 
 class Messages:
@@ -35,6 +46,73 @@ class Messages:
             pre = "-- Dry Run -- "
         print(f"{pre}Packaging superglue module :: {name}")
 
+    @staticmethod
+    def package_result(result: Dict, report: Optional[Dict] = None) -> None:
+        if result["status"] == "failed":
+            print(f"Packaging superglue component {result['name']} failed :: {result['error']}")
+        else:
+            if result["component_type"] == "superglue_job":
+                Messages.bundling_job(result["name"])
+            else:
+                Messages.packaging_module(result["name"])
+            print(f"    {result['files']} files, {format_bytes(result['bytes'])} :: {result['zipfile']}")
+            if report:
+                Messages.package_report(report)
+            if result.get("bytecode"):
+                print(f"    bytecode compiled for python {result['bytecode']}")
+            if result.get("import_times"):
+                Messages.import_times(result["import_times"])
+
+    @staticmethod
+    def bundling_job(name: str) -> None:
+        print(f"Bundling superglue job :: {name}")
+
+    @staticmethod
+    def package_report(report: Dict) -> None:
+        if report.get("tree_shake"):
+            trimmed_bytes = report["bytes"] - report["kept_bytes"]
+            trimmed = trimmed_bytes / report["bytes"] if report["bytes"] else 0
+            print(
+                f"    kept {report['kept_files']} of {report['files']} files from {report['modules']} modules, "
+                f"trimmed {format_bytes(trimmed_bytes)} ({trimmed:.0%})"
+            )
+        if report.get("dynamic"):
+            print(f"    kept whole, imports by computed names :: {', '.join(report['dynamic'])}")
+        if report.get("entries", 0) > 1:
+            print(f"    replaces {report['entries']} --extra-py-files entries")
+        if report.get("requirements"):
+            print(f"    vendored {report['vendored_files']} files for {report['requirements']} requirements")
+
+    @staticmethod
+    def bundle_current(name: str) -> None:
+        print(f"The module bundle of superglue job {name} is already built from its current files")
+
+    @staticmethod
+    def removed_bundle(job: SuperglueJobType) -> None:
+        print(f"Removed module bundle for superglue job {job.name}")
+
+    @staticmethod
+    def import_times(times: Dict) -> None:
+        if "error" in times:
+            print(f"    import times not measured :: {times['error']}")
+        else:
+            saved = 1 - times["bytecode"] / times["source"] if times["source"] else 0
+            print(
+                f"    import time :: source {times['source'] * 1000:.1f} ms, "
+                f"bytecode {times['bytecode'] * 1000:.1f} ms ({saved:.0%} faster)"
+            )
+
+    @staticmethod
+    def packaging_failed(results: List[Dict]) -> None:
+        failed = [r for r in results if r["status"] == "failed"]
+        print(f"\nPackaged {len(results) - len(failed)} modules, {len(failed)} failed.")
+        for result in failed:
+            print(f"  failed :: {result['name']} :: {result['error']}")
+
+    @staticmethod
+    def package_current(name: str) -> None:
+        print(f"Superglue module {name} is already packaged from its current files")
+
     @staticmethod
     def locking_jobs() -> None:
         print("\n------------------> Locking Superglue Jobs <------------------\n")
@@ -115,7 +193,7 @@ class Messages:
 
     @staticmethod
     def not_packaged() -> None:
-        print("There are unpackaged modules present. Deployment not possible.")
+        print("There are unpackaged modules or out of date job bundles present. Deployment not possible.")
 
     @staticmethod
     def all_jobs_locked() -> None:
@@ -125,6 +203,102 @@ class Messages:
     def all_modules_locked() -> None:
         print("All superglue modules are locked")
 
+    @staticmethod
+    def sync_stats(component: SuperglueComponentType) -> None:
+        stats = component.sync_stats
+        print(
+            f"Uploaded {stats['uploaded_files']} files ({format_bytes(stats['uploaded_bytes'])}), "
+            f"copied {stats['copied_files']} unchanged files in S3 ({format_bytes(stats['copied_bytes'])})"
+        )
+
+    @staticmethod
+    def transfer_summary(components: List[SuperglueComponentType]) -> None:
+        uploaded = sum(c.sync_stats["uploaded_bytes"] for c in components)
+        copied = sum(c.sync_stats["copied_bytes"] for c in components)
+        print(f"\nDeployment transferred {format_bytes(uploaded)} and copied {format_bytes(copied)} in S3.")
+
+    @staticmethod
+    def deploy_failed(result: Dict) -> None:
+        component = result["component"]
+        if result["status"] == "skipped":
+            print(f"Skipped {component.component_type} {component.name}, a deployment it depends on failed.")
+        else:
+            print(f"Deployment of {component.component_type} {component.name} failed :: {result['error']}")
+
+    @staticmethod
+    def deploy_summary(results: List[Dict]) -> None:
+        counts = {"deployed": 0, "failed": 0, "skipped": 0}
+        for result in results:
+            counts[result["status"]] += 1
+        print(f"Deployed {counts['deployed']}, failed {counts['failed']}, skipped {counts['skipped']} components.")
+
+        for result in results:
+            if result["status"] == "failed":
+                component = result["component"]
+                print(f"  failed :: {component.component_type} {component.name} :: {result['error']}")
+
+    @staticmethod
+    def request_stats(totals: Dict[str, int]) -> None:
+        print(
+            f"AWS requests :: {totals['requests']} sent, {totals['retries']} retried, "
+            f"{totals['throttles']} throttled"
+        )
+
+    @staticmethod
+    def resuming_deploy(resumed: bool) -> None:
+        if resumed:
+            print("Resuming the interrupted deployment from its journal.")
+        else:
+            print("No interrupted deployment to resume, starting a new deployment.")
+
+    @staticmethod
+    def discarding_journal() -> None:
+        print("Discarding the journal of an interrupted deployment. Use --resume to continue it instead.")
+
+    @staticmethod
+    def plan_summary(plan: SuperglueDeployPlan, output: Optional[Path] = None) -> None:
+        if not plan.components:
+            Messages.nothing_to_deploy()
+            return
+
+        for entry in plan.components:
+            summary = plan.component_summary(entry)
+            print(f"{entry['component_type']} {entry['component_name']} :: version {entry['version_number']}")
+            print(
+                f"    upload {summary['upload_files']} files ({format_bytes(summary['upload_bytes'])}), "
+                f"copy {summary['copy_files']} files ({format_bytes(summary['copy_bytes'])}), "
+                f"skip {summary['skip_files']} files"
+            )
+            if "glue_jobs" in entry:
+                print(
+                    f"    glue jobs :: {summary['glue_create']} created, {summary['glue_update']} updated, "
+                    f"{summary['glue_unchanged']} unchanged"
+                )
+
+        calls = plan.api_calls()
+        print(f"\nEstimated AWS requests :: {calls['total']} ({calls['s3']} S3, {calls['glue']} Glue)")
+        if output:
+            print(f"Plan written to {output}, execute it with superglue deploy --plan-file {output}")
+
+    @staticmethod
+    def stale_plan(plan_file: Path, stale: List[str]) -> None:
+        print(f"The plan {plan_file} no longer matches the project. Run superglue plan again.")
+        for name in stale:
+            print(f"  changed since planning :: {name}")
+
+    @staticmethod
+    def plan_with_increment_version() -> None:
+        print("A plan is executed as it was planned, --increment-version can not be combined with --plan-file.")
+
+    @staticmethod
+    def manifest_rebuilt() -> None:
+        print("Rebuilt the superglue project manifest in S3.")
+
+    @staticmethod
+    def hash_cache_stats(hash_cache: SuperglueHashCache) -> None:
+        if hash_cache.lookups:
+            print(f"\nHash cache :: {hash_cache.hits} hits, {hash_cache.misses} misses")
+
     def component_exists(self) -> None:
         print(f"{self.component.component_type.capitalize()} {self.component.component_name} already exists.")
 
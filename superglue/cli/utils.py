@@ -1,7 +1,7 @@
-import boto3
 import inspect
 from types import ModuleType
 from typing import List, Any, Callable, Type
+from superglue.core.identity import SuperglueIdentityCache
 from superglue.cli.base import BaseSuperglueCommand
 from superglue.environment.variables import SUPERGLUE_AWS_ACCOUNT
 
@@ -17,8 +17,9 @@ def get_commands(module: ModuleType) -> List[Type[BaseSuperglueCommand]]:
 
 def validate_account(func: Callable) -> Callable:
     def wrapper(*args, **kwargs) -> Any:
-        sts = boto3.client("sts")
-        account_id = int(sts.get_caller_identity()["Account"])
+        command = args[0]
+        revalidate = getattr(command.cli_args, "revalidate", False)
+        account_id = int(SuperglueIdentityCache().account_id(revalidate=revalidate))
 
         if account_id != SUPERGLUE_AWS_ACCOUNT:
             print(f"superglue expects account {SUPERGLUE_AWS_ACCOUNT} but account is {account_id}")
@@ -0,0 +1,109 @@
+import boto3
+import threading
+from botocore.config import Config
+from botocore.client import BaseClient
+from typing import Dict, Optional
+from superglue.core.throttle import SuperglueRateLimiter
+from superglue.environment.variables import (
+    SUPERGLUE_AWS_ENDPOINT_URL,
+    SUPERGLUE_AWS_MAX_POOL_CONNECTIONS,
+    SUPERGLUE_AWS_RETRY_MODE,
+    SUPERGLUE_AWS_MAX_ATTEMPTS,
+    SUPERGLUE_AWS_CONNECT_TIMEOUT,
+    SUPERGLUE_AWS_READ_TIMEOUT,
+    SUPERGLUE_S3_ENDPOINT_URL,
+    SUPERGLUE_GLUE_ENDPOINT_URL,
+    SUPERGLUE_STS_ENDPOINT_URL,
+)
+
+# creating a client resolves credentials and loads endpoint metadata, which is slow.
+# superglue therefore creates at most one client per service and process, and shares it between threads.
+_session: Optional[boto3.session.Session] = None
+_clients: Dict[str, BaseClient] = {}
+_lock = threading.Lock()
+_limiter: Optional[SuperglueRateLimiter] = None
+
+_settings = {
+    "max_pool_connections": SUPERGLUE_AWS_MAX_POOL_CONNECTIONS,
+    "retry_mode": SUPERGLUE_AWS_RETRY_MODE,
+    "max_attempts": SUPERGLUE_AWS_MAX_ATTEMPTS,
+    "connect_timeout": SUPERGLUE_AWS_CONNECT_TIMEOUT,
+    "read_timeout": SUPERGLUE_AWS_READ_TIMEOUT,
+}
+
+SERVICE_ENDPOINT_URLS = {
+    "s3": SUPERGLUE_S3_ENDPOINT_URL,
+    "glue": SUPERGLUE_GLUE_ENDPOINT_URL,
+    "sts": SUPERGLUE_STS_ENDPOINT_URL,
+}
+
+
+def configure_clients(**settings) -> None:
+    """
+    Overrides client settings for the rest of the process. Clients which already exist are dropped,
+    so they are rebuilt with the new settings on next use.
+    """
+    unknown = set(settings) - set(_settings)
+    if unknown:
+        raise ValueError(f"Unknown client settings {sorted(unknown)}")
+
+    with _lock:
+        _settings.update({k: v for k, v in settings.items() if v is not None})
+        _clients.clear()
+
+        if _limiter is not None:
+            _limiter.max_attempts = _settings["max_attempts"]
+
+
+def client_config() -> Config:
+    if _settings["retry_mode"] == "superglue":
+        # superglue decides on retries itself, botocore makes a single attempt per retry
+        retries = {"mode": "standard", "total_max_attempts": 1}
+    else:
+        retries = {"mode": _settings["retry_mode"], "max_attempts": _settings["max_attempts"]}
+
+    return Config(
+        max_pool_connections=_settings["max_pool_connections"],
+        retries=retries,
+        connect_timeout=_settings["connect_timeout"],
+        read_timeout=_settings["read_timeout"],
+    )
+
+
+def endpoint_url(service: str) -> Optional[str]:
+    return SERVICE_ENDPOINT_URLS.get(service) or SUPERGLUE_AWS_ENDPOINT_URL
+
+
+def get_session() -> boto3.session.Session:
+    global _session
+    with _lock:
+        if _session is None:
+            _session = boto3.session.Session()
+        return _session
+
+
+def get_rate_limiter() -> SuperglueRateLimiter:
+    global _limiter
+    with _lock:
+        if _limiter is None:
+            _limiter = SuperglueRateLimiter(max_attempts=_settings["max_attempts"])
+        return _limiter
+
+
+def get_client(service: str) -> BaseClient:
+    session = get_session()
+    limiter = get_rate_limiter()
+    with _lock:
+        if service not in _clients:
+            client = session.client(service, config=client_config(), endpoint_url=endpoint_url(service))
+            limiter.register(client, service, retries=_settings["retry_mode"] == "superglue")
+            _clients[service] = client
+        return _clients[service]
+
+
+def reset_clients() -> None:
+    global _session, _limiter
+    with _lock:
+        _clients.clear()
+        _session = None
+        _limiter = None
@@ -0,0 +1,76 @@
+import json
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# runs in the target interpreter, so it must stay compatible with the oldest python glue runs (3.7)
+COMPILE_SCRIPT = """
+import sys, json, py_compile, importlib.util
+for source, cfile, dfile in json.load(sys.stdin):
+    py_compile.compile(
+        source, cfile=cfile, dfile=dfile, doraise=True,
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+    )
+print(json.dumps({"version": "%d.%d" % sys.version_info[:2], "magic": importlib.util.MAGIC_NUMBER.hex()}))
+"""
+
+IMPORT_TIME_SCRIPT = """
+import sys, time
+sys.path.insert(0, sys.argv[1])
+start = time.perf_counter()
+__import__(sys.argv[2])
+print(time.perf_counter() - start)
+"""
+
+
+BYTECODE_MODES = ["off", "with-sources", "only"]
+
+
+def bytecode_settings(mode: str, python: str) -> Optional[Dict]:
+    """the bytecode settings of a packaging task, None when modules are packaged as sources only"""
+    if mode not in BYTECODE_MODES:
+        raise ValueError(f"Unknown bytecode mode {mode}, expected one of {', '.join(BYTECODE_MODES)}")
+    if mode == "off":
+        return None
+    return {"python": python, "sources": mode == "with-sources"}
+
+
+def find_python(python: str) -> str:
+    path = shutil.which(python)
+    if path is None:
+        raise RuntimeError(f"No python interpreter {python} found to compile bytecode with")
+    return path
+
+
+def run_python(python: str, args: List[str], stdin: Optional[str] = None) -> str:
+    process = subprocess.run([find_python(python), "-I", *args], input=stdin, capture_output=True, text=True)
+    if process.returncode != 0:
+        lines = process.stderr.strip().splitlines() or ["no output"]
+        raise RuntimeError(f"{python} exited with {process.returncode} :: {lines[-1]}")
+    return process.stdout
+
+
+def compile_bytecode(python: str, files: List[List[str]], output_dir: Path) -> Dict:
+    """
+    Compiles the python files among [source, arcname] pairs with the given interpreter, which must be the python
+    version of the glue runtime, as bytecode is only importable by the version which wrote it. Each .pyc file is
+    written next to where its source sits in the zip file, which is where zipimport looks for it.
+
+    The .pyc files are unchecked hash based. Timestamp based ones would be rejected by zipimport, which compares
+    them to the fixed timestamps of the zip entries, and recompiled from source on every import.
+    """
+    compiled = []
+    for source, arcname in files:
+        if arcname.endswith(".py"):
+            cfile = output_dir / f"{arcname}c"
+            cfile.parent.mkdir(parents=True, exist_ok=True)
+            compiled.append([source, cfile.as_posix(), arcname])
+
+    runtime = json.loads(run_python(python, ["-c", COMPILE_SCRIPT], json.dumps(compiled))) if compiled else {}
+    return dict(runtime, files=[[cfile, f"{arcname}c"] for _, cfile, arcname in compiled])
+
+
+def import_time(python: str, path: str, module_name: str, runs: Optional[int] = 5) -> float:
+    """the fastest of several cold imports of the module from a zip file, each in a new interpreter"""
+    return min(float(run_python(python, ["-c", IMPORT_TIME_SCRIPT, path, module_name])) for _ in range(runs))
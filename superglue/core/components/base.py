@@ -1,15 +1,25 @@
-import re
-import boto3
 import json
 import botocore
 from io import BytesIO
 from pathlib import Path
-from hashlib import md5
 from abc import ABC, abstractmethod
-from multiprocessing import Pool, cpu_count
 from jinja2 import Environment, PackageLoader
-from typing import Optional, Dict, Tuple, List, TypeVar, Generator
-from superglue.environment.variables import SUPERGLUE_IAM_ROLE, SUPERGLUE_S3_BUCKET, SUPERGLUE_S3_PREFIX
+from typing import Optional, Dict, Tuple, List, TypeVar
+from superglue.core.aws import get_client
+from superglue.core.hash_cache import SuperglueHashCache
+from superglue.core.journal import SuperglueDeployJournal
+from superglue.core.hashing import file_digest
+from superglue.core.remote import list_version_numbers, s3_prefix_root
+from superglue.core.manifest import version_digest
+from superglue.core.transfer import SuperglueUploadScheduler
+from superglue.core.vendor import SuperglueVendorCache
+from concurrent.futures import ThreadPoolExecutor
+from superglue.environment.variables import (
+    SUPERGLUE_IAM_ROLE,
+    SUPERGLUE_S3_BUCKET,
+    SUPERGLUE_STORAGE_MODE,
+    SUPERGLUE_REMOTE_WORKERS,
+)
 
 
 BaseSuperglueComponentType = TypeVar(name="BaseSuperglueComponentType", bound="BaseSuperglueComponent")
@@ -50,8 +60,17 @@ SuperglueComponentType = TypeVar("SuperglueComponentType", bound="SuperglueCompo
 
 
 class SuperglueComponent(BaseSuperglueComponent, ABC):
+    # set by the project so digests of unchanged files are reused between invocations
+    hash_cache: Optional[SuperglueHashCache] = None
 
-    version_pattern = r".*(version=[0-9]+).*"
+    # journal of the deployment in progress, set by the deploy command
+    journal: Optional[SuperglueDeployJournal] = None
+
+    # third party packages installed from the local wheelhouse, set by the project
+    vendor_cache: Optional[SuperglueVendorCache] = None
+
+    # "versioned" or "content", see SUPERGLUE_STORAGE_MODE
+    storage_mode = SUPERGLUE_STORAGE_MODE
 
     def __init__(
         self, bucket: Optional[str] = SUPERGLUE_S3_BUCKET, iam_role: Optional[str] = SUPERGLUE_IAM_ROLE, *args, **kwargs
@@ -61,6 +80,17 @@ class SuperglueComponent(BaseSuperglueComponent, ABC):
         self.bucket = bucket
         self.iam_role = iam_role
 
+        # byte and file counts of the last sync to S3
+        self.sync_stats = {"uploaded_files": 0, "uploaded_bytes": 0, "copied_files": 0, "copied_bytes": 0}
+
+        # memoized state, computed at most once per command, remote state is dropped again after a sync
+        # version_hashes is also filled in by the hashing engine when a whole project is hashed at once
+        self.version_hashes: Optional[Dict[str, str]] = None
+        self.remote_version: Optional[Dict[str, str]] = None
+        self.remote_version_digest: Optional[str] = None
+        self.remote_version_number: Optional[int] = None
+        self.remote_files: Dict[int, Dict[str, str]] = {}
+
         try:
             self.version = json.load(self.version_file.open())
         except FileNotFoundError:
@@ -83,9 +113,7 @@ class SuperglueComponent(BaseSuperglueComponent, ABC):
 
     @property
     def s3_prefix_root(self) -> str:
-        if SUPERGLUE_S3_PREFIX:
-            return f"{SUPERGLUE_S3_PREFIX}/superglue"
-        return f"superglue"
+        return s3_prefix_root()
 
     @property
     def s3_path(self) -> str:
@@ -95,13 +123,44 @@ class SuperglueComponent(BaseSuperglueComponent, ABC):
     def s3_prefix(self) -> str:
         return f"{self.s3_prefix_root}/{self.component_type}/{self.component_name}/version={self.version_number}"
 
+    def s3_version_prefix(self, version_number: int) -> str:
+        return f"{self.s3_filter}/version={version_number}"
+
+    @property
+    def s3_type_prefix(self) -> str:
+        return f"{self.s3_prefix_root}/{self.component_type}"
+
     @property
     def s3_filter(self) -> str:
-        return f"{self.s3_prefix_root}/{self.component_type}/{self.component_name}"
+        return f"{self.s3_type_prefix}/{self.component_name}"
 
     @property
     def s3_version_path(self) -> str:
-        return f"{self.s3_prefix}/{self.component_name}/.version"
+        return self.s3_version_key(self.version_number)
+
+    def s3_version_key(self, version_number: int) -> str:
+        return f"{self.s3_filter}/version={version_number}/{self.component_name}/.version"
+
+    def s3_files_manifest_key(self, version_number: int) -> str:
+        return f"{self.s3_version_prefix(version_number)}/manifest.json"
+
+    @property
+    def s3_blob_prefix(self) -> str:
+        return f"{self.s3_prefix_root}/blobs"
+
+    @property
+    def content_addressed(self) -> bool:
+        return self.storage_mode == "content"
+
+    def blob_key(self, path: Path, digest: Optional[str] = None) -> str:
+        # the file name is kept, glue relies on it to import python files and to find jars
+        return f"{self.s3_blob_prefix}/{digest or self.local_digest(path)}/{path.name}"
+
+    def s3_object_path(self, path: Path) -> str:
+        """the s3 uri glue reads a file of this component from once it is deployed"""
+        if self.content_addressed:
+            return f"s3://{self.bucket}/{self.blob_key(path)}"
+        return f"{self.s3_path}/{path.relative_to(self.component_path).as_posix()}"
 
     @property
     def is_locked(self) -> bool:
@@ -112,11 +171,14 @@ class SuperglueComponent(BaseSuperglueComponent, ABC):
         return not self.is_locked
 
     @property
-    def is_deployable(self) -> bool:
-        s3_version = self.fetch_s3_version()
+    def version_digest(self) -> str:
         local_version = self.version.copy()
         local_version["version_number"] = self.version_number
-        return self.is_locked and local_version != s3_version
+        return version_digest(local_version)
+
+    @property
+    def is_deployable(self) -> bool:
+        return self.is_locked and self.version_digest != self.fetch_s3_version_digest()
 
     @property
     def status(self) -> Tuple[str, str, str]:
@@ -170,62 +232,279 @@ class SuperglueComponent(BaseSuperglueComponent, ABC):
                     file_list.append(path)
         return file_list
 
+    def vendored_files(self, requirements: List[str]) -> Dict[str, Dict]:
+        if not requirements:
+            return {}
+        if self.vendor_cache is None:
+            self.vendor_cache = SuperglueVendorCache()
+        return self.vendor_cache.files(requirements)
+
     def get_relative_path(self, path: Path) -> str:
         return path.relative_to(self.root_dir).as_posix()
 
     def hash_file(self, path: Path) -> Tuple[str, str]:
-
         relative_path = self.get_relative_path(path)
-        md5_hash = md5()
 
-        with path.open("rb") as data:
-            for chunk in iter(lambda: data.read(4096), b""):
-                md5_hash.update(chunk)
-            return relative_path, md5_hash.hexdigest()
+        if self.hash_cache is not None:
+            return relative_path, self.hash_cache.get_digest(path, file_digest)
+        return relative_path, file_digest(path)
 
-    def get_version_hashes(self) -> Dict[str, str]:
-        version_hashes = {}
+    def version_file_paths(self) -> List[Path]:
         filters = [
             ".version",
             "config_merged.yml",
         ]
+        return [p for p in self.component_files() if p.name not in filters and p.suffix != ".zip"]
 
-        for path in self.component_files():
-            if path.name not in filters and path.suffix != ".zip":
+    def get_version_hashes(self) -> Dict[str, str]:
+        if self.version_hashes is None:
+            version_hashes = {}
+            for path in self.version_file_paths():
                 key, digest = self.hash_file(path)
                 version_hashes[key] = digest
-        return version_hashes
+            self.version_hashes = version_hashes
+        return self.version_hashes.copy()
+
+    def invalidate_remote(self) -> None:
+        self.remote_version = None
+        self.remote_version_digest = None
+        self.remote_version_number = None
+        self.remote_files = {}
 
     def save_version_file(self, version_number: Optional[int] = None) -> None:
         version_hashes = self.get_version_hashes()
 
-        if not version_number:
-            version_hashes["version_number"] = self.version_number
-        else:
-            version_hashes["version_number"] = version_number
+        if version_number:
+            self.version_number = version_number
+
+        self.version = version_hashes.copy()
+        version_hashes["version_number"] = self.version_number
         json.dump(version_hashes, self.version_file.open(mode="w"), indent=4)
 
-    def upload_object_to_s3(self, path: Path) -> None:
-        s3_client = boto3.client("s3")
-        relative_path = self.get_relative_path(path)
-        print(f"Uploading -- s3://{self.bucket}/{self.s3_prefix}/{relative_path}")
-        s3_client.upload_file(path.as_posix(), self.bucket, f"{self.s3_prefix}/{relative_path}")
+        # the remote .version we compare against depends on the local version number
+        self.remote_version = None
+        self.remote_version_digest = None
+
+    def upload_object_to_s3(self, path: Path, scheduler: SuperglueUploadScheduler, key: Optional[str] = None) -> None:
+        key = key or f"{self.s3_prefix}/{self.get_relative_path(path)}"
+        print(f"Uploading -- s3://{self.bucket}/{key}")
+        scheduler.upload_file(path, self.bucket, key)
+
+    def copy_object_in_s3(self, source_key: str, key: str, scheduler: SuperglueUploadScheduler) -> None:
+        print(f"Copying -- s3://{self.bucket}/{source_key} -> s3://{self.bucket}/{key}")
+        scheduler.copy_object(self.bucket, source_key, key)
 
-    def sync(self) -> None:
-        with Pool(cpu_count()) as pool:
-            files = self.component_files()
-            pool.map(self.upload_object_to_s3, files)
+    def local_digest(self, path: Path) -> str:
+        digest = self.get_version_hashes().get(self.get_relative_path(path))
+        if digest is None:
+            _, digest = self.hash_file(path)
+        return digest
+
+    def object_size(self, key: str) -> Optional[int]:
+        """size of an object in S3 read with a HEAD request, None when the object does not exist"""
+        s3_client = get_client("s3")
+        try:
+            return s3_client.head_object(Bucket=self.bucket, Key=key)["ContentLength"]
+        except botocore.exceptions.ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ["404", "NoSuchKey", "Not Found"]:
+                return None
+            raise e
+
+    def blob_exists(self, key: str) -> bool:
+        return self.object_size(key) is not None
+
+    def plan_content_sync(self) -> List[Dict]:
+        """
+        Content addressed variant of plan_sync. Every file is stored once under its digest, so only blobs which do
+        not exist in S3 yet are uploaded. Blobs referenced by the latest deployed version are known to exist,
+        everything else is checked with a HEAD request.
+        """
+        known_blobs = set(self.fetch_files_manifest(self.fetch_s3_version_number()).values())
+        version_key = f"{self.s3_prefix}/{self.get_relative_path(self.version_file)}"
+        actions = []
+
+        for path in self.component_files():
+            relative_path = self.get_relative_path(path)
+            action = {"path": relative_path, "bytes": path.stat().st_size, "action": "upload"}
+
+            if path == self.version_file:
+                action["key"] = version_key
+            else:
+                action["digest"] = self.local_digest(path)
+                action["key"] = self.blob_key(path, action["digest"])
+            actions.append(action)
+
+        unknown = [a for a in actions if "digest" in a and a["key"] not in known_blobs]
+        with ThreadPoolExecutor(max_workers=SUPERGLUE_REMOTE_WORKERS) as pool:
+            exists = dict(zip([a["key"] for a in unknown], pool.map(self.blob_exists, [a["key"] for a in unknown])))
+
+        for action in actions:
+            if "digest" in action and (action["key"] in known_blobs or exists.get(action["key"])):
+                action["action"] = "skip"
+        return actions
+
+    def fetch_files_manifest(self, version_number: Optional[int] = None) -> Dict[str, str]:
+        """maps the relative paths of a content addressed version to the blob keys holding them"""
+        version_number = self.version_number if version_number is None else version_number
+
+        if version_number not in self.remote_files:
+            s3_client = get_client("s3")
+            try:
+                response = s3_client.get_object(Bucket=self.bucket, Key=self.s3_files_manifest_key(version_number))
+                self.remote_files[version_number] = json.load(response["Body"])["files"]
+            except botocore.exceptions.ClientError as e:
+                if e.response.get("Error", {}).get("Code") not in ["NoSuchKey", "404", "AccessDenied", "403"]:
+                    raise e
+                self.remote_files[version_number] = {}
+        return self.remote_files[version_number].copy()
+
+    def upload_files_manifest(self, actions: List[Dict]) -> None:
+        files = {a["path"]: a["key"] for a in actions if "digest" in a}
+        key = self.s3_files_manifest_key(self.version_number)
+        body = json.dumps({"files": files}, indent=4, sort_keys=True).encode("utf-8")
+
+        print(f"Uploading -- s3://{self.bucket}/{key}")
+        get_client("s3").put_object(Bucket=self.bucket, Key=key, Body=body, ContentType="application/json")
+
+    def plan_sync(self) -> List[Dict]:
+        """
+        Decides how each file of the component gets to S3. Files whose hash matches the .version of the latest
+        deployed version are copied server side from there (or skipped when redeploying that same version),
+        everything else is uploaded. A previous version deployed in content mode only holds its .version and
+        files manifest, so its files are copied from the blobs the manifest points at.
+        """
+        if self.content_addressed:
+            return self.plan_content_sync()
+
+        previous_version_number = self.fetch_s3_version_number()
+        previous_version = self.download_s3_version(previous_version_number)
+        previous_blobs = self.fetch_files_manifest(previous_version_number)
+        local_version = self.get_version_hashes()
+        actions = []
+
+        for path in self.component_files():
+            relative_path = self.get_relative_path(path)
+            digest = local_version.get(relative_path)
+            action = {
+                "path": relative_path,
+                "key": f"{self.s3_prefix}/{relative_path}",
+                "bytes": path.stat().st_size,
+                "action": "upload",
+            }
+
+            if digest is not None and previous_version.get(relative_path) == digest:
+                if relative_path in previous_blobs:
+                    action["action"] = "copy"
+                    action["source_key"] = previous_blobs[relative_path]
+                elif previous_version_number == self.version_number:
+                    action["action"] = "skip"
+                else:
+                    action["action"] = "copy"
+                    action["source_key"] = f"{self.s3_version_prefix(previous_version_number)}/{relative_path}"
+
+            actions.append(action)
+        return actions
+
+    def action_digest(self, action: Dict) -> str:
+        return action.get("digest") or self.local_digest(self.root_dir / action["path"])
+
+    def transferred_before(self, action: Dict) -> bool:
+        """
+        True when the journal of an interrupted deployment records this exact file at this key,
+        and a HEAD request confirms the object is in S3 with the expected size.
+        """
+        entry = self.journal.find("transfer", key=action["key"], digest=self.action_digest(action))
+        return entry is not None and self.object_size(action["key"]) == action["bytes"]
+
+    def transfer_object(self, action: Dict, scheduler: SuperglueUploadScheduler) -> None:
+        if action["action"] == "skip":
+            return
+
+        if self.journal and self.journal.resumed and self.transferred_before(action):
+            print(f"Already transferred -- s3://{self.bucket}/{action['key']}")
+            action["action"] = "skip"
+            return
+
+        if action["action"] == "upload":
+            self.upload_object_to_s3(self.root_dir / action["path"], scheduler, action["key"])
+        elif action["action"] == "copy":
+            self.copy_object_in_s3(action["source_key"], action["key"], scheduler)
+
+        if self.journal:
+            self.journal.record(
+                "transfer",
+                component_type=self.component_type,
+                component_name=self.component_name,
+                key=action["key"],
+                digest=self.action_digest(action),
+            )
+
+    def count_sync_stats(self, actions: List[Dict]) -> None:
+        for action in actions:
+            if action["action"] == "upload":
+                self.sync_stats["uploaded_files"] += 1
+                self.sync_stats["uploaded_bytes"] += action["bytes"]
+            elif action["action"] == "copy":
+                self.sync_stats["copied_files"] += 1
+                self.sync_stats["copied_bytes"] += action["bytes"]
+
+    def plan(self) -> Dict:
+        """everything a deployment of the component would do, see SuperglueDeployPlan"""
+        return {
+            "component_type": self.component_type,
+            "component_name": self.component_name,
+            "version_number": self.version_number,
+            "version_digest": self.version_digest,
+            "files": self.plan_sync(),
+        }
+
+    def sync(self, scheduler: Optional[SuperglueUploadScheduler] = None, actions: Optional[List[Dict]] = None) -> None:
+        if scheduler is None:
+            with SuperglueUploadScheduler() as scheduler:
+                return self.sync(scheduler, actions)
+
+        # actions planned up front, e.g. read from a plan file, are executed as they are
+        actions = self.plan_sync() if actions is None else [action.copy() for action in actions]
+
+        # the .version file is what later deployments trust to know which files exist remotely,
+        # so it is only written once every other file has made it to S3.
+        version_key = f"{self.s3_prefix}/{self.get_relative_path(self.version_file)}"
+        file_actions = [a for a in actions if a["key"] != version_key]
+        version_actions = [a for a in actions if a["key"] == version_key]
+
+        scheduler.map(lambda action: self.transfer_object(action, scheduler), file_actions)
+
+        if self.content_addressed:
+            self.upload_files_manifest(actions)
+
+        for action in version_actions:
+            self.transfer_object(action, scheduler)
+
+        self.count_sync_stats(actions)
+        self.invalidate_remote()
 
     def fetch_s3_version(self) -> Dict[str, str]:
-        s3_client = boto3.client("s3")
+        if self.remote_version is None:
+            self.remote_version = self.download_s3_version()
+        return self.remote_version.copy()
+
+    def fetch_s3_version_digest(self) -> str:
+        if self.remote_version_digest is None:
+            self.remote_version_digest = version_digest(self.fetch_s3_version())
+        return self.remote_version_digest
+
+    def download_s3_version(self, version_number: Optional[int] = None) -> Dict[str, str]:
+        s3_client = get_client("s3")
+        if version_number is None:
+            version_number = self.version_number
         try:
             with BytesIO() as buffer:
-                s3_client.download_fileobj(self.bucket, self.s3_version_path, buffer)
+                s3_client.download_fileobj(self.bucket, self.s3_version_key(version_number), buffer)
                 buffer.seek(0)
                 return json.load(buffer)
         except botocore.exceptions.ClientError as e:
-            code = e.args[0].partition(":")[2].strip()
-            if code in ["Not Found", "Forbidden"]:
+            # the message is not parsed, botocore appends retry details to it
+            if e.response.get("Error", {}).get("Code") in ["404", "NoSuchKey", "Not Found", "403", "AccessDenied"]:
                 return {}
             raise e
 
@@ -236,42 +515,21 @@ class SuperglueComponent(BaseSuperglueComponent, ABC):
         self.increment_version()
         self.save_version_file()
 
-    @staticmethod
-    def compare_previous(previous: int, current: int) -> int:
-        return max(previous, current)
-
-    def parse_version_numbers(self, keys):
-        for key in keys:
-            yield int(re.match(self.version_pattern, key).group(1).partition("=")[2])
-
-    def list_superglue_components(self) -> Generator[List[str], None, None]:
-        s3_client = boto3.client("s3")
-        continue_token = "start"
-        while continue_token:
-
-            kwargs = {"Bucket": self.bucket, "Prefix": self.s3_filter}
-
-            if continue_token and continue_token != "start":
-                kwargs["ContinuationToken"] = continue_token
-
-            results = s3_client.list_objects_v2(**kwargs)
-
-            try:
-                yield [key["Key"] for key in results["Contents"] if key["Key"]]
-            except KeyError:
-                yield []
-
-            continue_token = results.get("ContinuationToken")
-
     def fetch_s3_version_number(self) -> int:
-        v = 0
-        for keys in self.list_superglue_components():
-            for version in self.parse_version_numbers(keys):
-                v = self.compare_previous(v, version)
-        return int(v)
+        if self.remote_version_number is None:
+            self.remote_version_number = self.list_s3_version_number()
+        return self.remote_version_number
+
+    def list_s3_version_number(self) -> int:
+        return max(list_version_numbers(self.bucket, self.s3_filter), default=0)
 
     @abstractmethod
-    def deploy(self, increment_version: bool) -> None:
+    def deploy(
+        self,
+        increment_version: bool,
+        scheduler: Optional[SuperglueUploadScheduler] = None,
+        plan: Optional[Dict] = None,
+    ) -> None:
         pass
 
     @abstractmethod
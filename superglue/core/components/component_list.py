@@ -1,18 +1,26 @@
 from typing import List
+from superglue.core.hashing import SuperglueHashingEngine
 from superglue.core.components.base import SuperglueComponentType
 
 
 class SuperglueComponentList(list):
+    def hash_versions(self) -> None:
+        SuperglueHashingEngine().hash_components(self)
+
     def deployable(self) -> List[SuperglueComponentType]:
+        self.hash_versions()
         return [c for c in self if c.is_deployable]
 
     def locked(self) -> List[SuperglueComponentType]:
+        self.hash_versions()
         return [c for c in self if c.is_locked]
 
     def unlocked(self) -> List[SuperglueComponentType]:
+        self.hash_versions()
         return [c for c in self if c.is_unlocked]
 
     def are_locked(self) -> bool:
+        self.hash_versions()
         locked_status = [c.is_locked for c in self]
         return False not in locked_status
 
@@ -1,15 +1,27 @@
 import os
 import yaml
-import boto3
-import botocore
 from io import StringIO
 from pathlib import Path
-from typing import Dict, List, Optional, TypeVar, Any
+from typing import Dict, List, Optional, Tuple, TypeVar, Any
+from superglue.core.aws import get_client
+from superglue.core.bytecode import bytecode_settings
+from superglue.core.imports import SuperglueImportGraph
+from superglue.core.packaging import ZIP_MANIFEST_NAME, read_zip_manifest, zip_manifest
+from superglue.core.glue import SuperglueGlueState, job_arn, job_update_differs, tag_changes
+from superglue.core.hashing import file_digest
 from superglue.core.components.module import SuperglueModule
 from superglue.core.components.base import SuperglueComponent
+from superglue.core.transfer import SuperglueUploadScheduler
 from superglue.environment.config import JOBS_PATH
 from superglue.core.components.component_list import SuperglueComponentList
-from superglue.environment.variables import SUPERGLUE_S3_BUCKET, SUPERGLUE_IAM_ROLE, AWS_REGION, SUPERGLUE_AWS_ACCOUNT
+from superglue.environment.variables import (
+    SUPERGLUE_S3_BUCKET,
+    SUPERGLUE_IAM_ROLE,
+    SUPERGLUE_ZIP_COMPRESSION,
+    SUPERGLUE_ZIP_COMPRESSION_LEVEL,
+    SUPERGLUE_BYTECODE,
+    SUPERGLUE_BYTECODE_PYTHON,
+)
 from superglue.core.components.tests import SuperglueTests
 from copy import deepcopy
 
@@ -22,6 +34,13 @@ class NoAnchorsDumper(yaml.SafeDumper):
 
 
 class SuperglueJob(SuperglueComponent):
+
+    # remote job definitions shared by every job of a project, set by the project
+    glue_state: Optional[SuperglueGlueState] = None
+
+    # single zip file glue imports the job's modules and py files from, built when the job config asks for it
+    bundle_name = "superglue_bundle.zip"
+
     def __init__(self, job_name: str, tests: Optional[SuperglueTests] = None, *args, **kwargs) -> None:
         self.tests = tests or SuperglueTests()
 
@@ -83,6 +102,51 @@ class SuperglueJob(SuperglueComponent):
     def superglue_modules(self) -> Dict[str, str]:
         return self.config.get("superglue_modules", {})
 
+    @property
+    def bundle_config(self) -> Dict:
+        return self.config.get("superglue_bundle") or {}
+
+    @property
+    def tree_shake(self) -> bool:
+        return bool(self.bundle_config.get("tree_shake")) and bool(self.superglue_modules)
+
+    @property
+    def requirements(self) -> List[str]:
+        return self.config.get("requirements") or []
+
+    @property
+    def consolidate(self) -> bool:
+        return bool(self.bundle_config.get("consolidate"))
+
+    @property
+    def bundled(self) -> bool:
+        """True when glue gets one bundle in --extra-py-files in place of the module zips and py files"""
+        if self.requirements:
+            return True
+        if self.consolidate:
+            return bool(self.superglue_modules) or any(p.suffix == ".py" for p in self.py_files)
+        return self.tree_shake
+
+    @property
+    def bundle_file(self) -> Path:
+        return self.job_path / self.bundle_name
+
+    @property
+    def is_bundle_current(self) -> bool:
+        """True when the bundle holds exactly the files it would be built from now, whatever its settings"""
+        manifest = read_zip_manifest(self.bundle_file)
+        if manifest is None:
+            return False
+        try:
+            files, _ = self.bundle_contents()
+        except (FileNotFoundError, RuntimeError, ValueError, SyntaxError):
+            return False
+        return manifest["files"] == {arcname: file["digest"] for arcname, file in files.items()}
+
+    @property
+    def is_packaged(self) -> bool:
+        return not self.bundled or self.is_bundle_current
+
     @property
     def overrides(self) -> List[Dict]:
         try:
@@ -110,25 +174,25 @@ class SuperglueJob(SuperglueComponent):
 
     @property
     def s3_main_script_path(self) -> str:
+        if self.content_addressed and self.main_script_file.exists():
+            return self.s3_object_path(self.main_script_file)
         return f"{self.s3_path}/main.py"
 
+    @property
+    def s3_bundle_path(self) -> str:
+        if self.content_addressed and self.bundle_file.exists():
+            return self.s3_object_path(self.bundle_file)
+        return f"{self.s3_path}/{self.bundle_name}"
+
     @property
     def s3_py_paths(self) -> List[str]:
-        py_s3_paths = []
-        for py_file in self.py_files:
-            relative_path = py_file.relative_to(self.job_path)
-            py_s3_path = f"{self.s3_path}/{relative_path}"
-            py_s3_paths.append(py_s3_path)
-        return py_s3_paths
+        # python files of a consolidated job are imported from its bundle, jars are still fetched one by one
+        py_files = [p for p in self.py_files if not (self.consolidate and p.suffix == ".py")]
+        return [self.s3_object_path(py_file) for py_file in py_files]
 
     @property
     def s3_jar_paths(self) -> List[str]:
-        jar_s3_paths = []
-        for jar_file in self.jar_files:
-            relative_path = jar_file.relative_to(self.job_path)
-            jar_s3_path = f"{self.s3_path}/{relative_path}"
-            jar_s3_paths.append(jar_s3_path)
-        return jar_s3_paths
+        return [self.s3_object_path(jar_file) for jar_file in self.jar_files]
 
     @classmethod
     def new(cls, job_name: str) -> SuperglueJobType:
@@ -143,14 +207,17 @@ class SuperglueJob(SuperglueComponent):
 
     @staticmethod
     def job_arn(job_name: str) -> str:
-        return f"arn:aws:glue:{AWS_REGION}:{SUPERGLUE_AWS_ACCOUNT}:job/{job_name}"
+        return job_arn(job_name)
 
     def render(self) -> None:
+        self.deployment_config = {"job_configs": []}
         extra_file_args = self.get_extra_file_args()
-        modules = self.modules()
         config = deepcopy(self.config)
 
-        s3_module_paths = ",".join([module.s3_zipfile_path for module in modules])
+        if self.bundled:
+            s3_module_paths = self.s3_bundle_path
+        else:
+            s3_module_paths = ",".join([module.s3_zipfile_path for module in self.modules()])
 
         if s3_module_paths:
             try:
@@ -179,52 +246,91 @@ class SuperglueJob(SuperglueComponent):
                 base_config[key] = overrides[key]
         return base_config
 
-    def create_or_update(self) -> None:
-        glue_client = boto3.client("glue")
+    @property
+    def job_names(self) -> List[str]:
+        return [config["Name"] for config in self.deployment_config["job_configs"]]
+
+    def plan_glue(self) -> List[Dict]:
+        """
+        Decides for every rendered config of the job whether its glue job is created, updated or left unchanged,
+        and which tags change. The remote definitions come from the batched glue state, so existence checks for
+        every config cost as few batch_get_jobs calls as possible, and jobs prefetched for a deployment none at all.
+        """
+        if self.glue_state is None:
+            self.glue_state = SuperglueGlueState()
+        self.glue_state.fetch(self.job_names)
+        actions = []
 
         for config in self.deployment_config["job_configs"]:
-            try:
-                # check if the glue job exists
-                job_exists = glue_client.get_job(JobName=config["Name"])
-
-            except botocore.exceptions.ClientError:
-                # the job does not exist, set to None to create it.
-                print(f"the job {config['Name']} does not exist. It will be created")
-                job_exists = None
+            # create and update glue api have different parameters for job name, and tags are not supported
+            # in the job update API, so pop both out of our config to get the JobUpdate.
+            params = config.copy()
+            job_name = params.pop("Name")
+            local_tags = params.pop("Tags", None) or {}
+            remote_job = self.glue_state.get(job_name)
+
+            if remote_job:
+                action = "update" if job_update_differs(params, remote_job) else "unchanged"
+                # only touch the tags which differ, so the job is never left untagged part way through
+                tags_to_add, tags_to_remove = tag_changes(local_tags, self.glue_state.get_tags(job_name))
+            else:
+                # a new job is created with its tags
+                action = "create"
+                tags_to_add, tags_to_remove = {}, []
 
-            if job_exists:  # then update the job definition
-                print(f"the job {config['Name']} exists. It will be updated")
+            actions.append(
+                {"name": job_name, "action": action, "tags_to_add": tags_to_add, "tags_to_remove": tags_to_remove}
+            )
+        return actions
 
-                params = config.copy()
-                job_name = params.pop("Name")
+    def apply_glue_plan(self, actions: List[Dict]) -> None:
+        glue_client = get_client("glue")
+        if self.glue_state is None:
+            self.glue_state = SuperglueGlueState()
+        configs = {config["Name"]: config for config in self.deployment_config["job_configs"]}
 
-                remote_tags = glue_client.get_tags(ResourceArn=self.job_arn(job_name))
+        for action in actions:
+            job_name = action["name"]
+            if job_name not in configs:
+                raise ValueError(f"The job {self.name} does not render a glue job named {job_name}")
 
-                # create and update glue api have different parameters for job name, so pop the name param
-                # out of our config and pass it to the 'JobName' parameter of the update api.
+            params = configs[job_name].copy()
+            params.pop("Name")
+            local_tags = params.pop("Tags", None) or {}
 
-                # get rid of the tags parameter as it is not supported in the job update API
-                try:
-                    local_tags = params.pop("Tags")
-                except KeyError:
-                    local_tags = {}
+            if action["action"] == "create":
+                # if it fails a client exception is raised.
+                print(f"the job {job_name} does not exist. It will be created")
+                _ = glue_client.create_job(**configs[job_name])
+                self.glue_state.record(job_name, params)
+                self.record_glue_action(job_name, "create")
 
-                # request a job update, if it fails a client exception is raised.
+            elif action["action"] == "update":
+                # if it fails a client exception is raised.
+                print(f"the job {job_name} exists. It will be updated")
                 _ = glue_client.update_job(JobName=job_name, JobUpdate=params)
+                self.glue_state.record(job_name, params)
+                self.record_glue_action(job_name, "update")
+
+            else:
+                print(f"the job {job_name} is unchanged. The update is skipped")
 
-                # remove all tags from the job
+            if action["tags_to_remove"]:
                 _ = glue_client.untag_resource(
-                    ResourceArn=self.job_arn(job_name), TagsToRemove=list(remote_tags["Tags"].keys())
+                    ResourceArn=self.job_arn(job_name), TagsToRemove=action["tags_to_remove"]
                 )
 
-                # re-tag resource with local settings
-                if local_tags:
-                    _ = glue_client.tag_resource(ResourceArn=self.job_arn(job_name), TagsToAdd=local_tags)
+            if action["tags_to_add"]:
+                _ = glue_client.tag_resource(ResourceArn=self.job_arn(job_name), TagsToAdd=action["tags_to_add"])
 
-            else:
-                # otherwise create the job for the first time
-                # if it fails a client exception is raised.
-                _ = glue_client.create_job(**config)
+            self.glue_state.record_tags(job_name, local_tags)
+
+    def create_or_update(self) -> None:
+        self.apply_glue_plan(self.plan_glue())
+
+    def record_glue_action(self, job_name: str, action: str) -> None:
+        if self.journal:
+            self.journal.record("glue", component_name=self.component_name, job_name=job_name, action=action)
 
     def update_tags(self) -> None:
         for config in self.deployment_config["job_configs"]:
@@ -237,9 +343,129 @@ class SuperglueJob(SuperglueComponent):
         component_list = SuperglueComponentList()
         for name, meta in self.superglue_modules.items():
             module = SuperglueModule.from_version(module_name=name, version_number=int(meta["version_number"]))
+            module.hash_cache = self.hash_cache
+            module.vendor_cache = self.vendor_cache
             component_list.append(module)
         return component_list
 
+    def bundle_entries(self) -> Dict[str, Path]:
+        """the scripts glue runs or puts on the python path itself, by the names they are imported by"""
+        entries = {py_file.stem: py_file for py_file in self.py_files if py_file.suffix == ".py"}
+        if self.main_script_file.exists():
+            entries["__main__"] = self.main_script_file
+        return entries
+
+    def bundle_candidates(self) -> Dict[str, Dict]:
+        """every file of the zip files of the modules the job uses, vendored ones included, by their name in them"""
+        candidates = {}
+        for module in self.modules():
+            local_version = SuperglueModule.get(module.name).version_number
+            if local_version != module.version_number:
+                raise ValueError(
+                    f"The job {self.name} uses version {module.version_number} of the module {module.name}, "
+                    f"but version {local_version} is checked out. Bundles are built from the local module files."
+                )
+
+            for arcname, file in module.package_files().items():
+                candidates.setdefault(arcname, file)
+        return candidates
+
+    def bundle_py_files(self) -> Dict[str, Dict]:
+        """the python files of the py directory by their name in the bundle, glue puts each on the python path"""
+        files = {}
+        for py_file in self.py_files:
+            if py_file.suffix != ".py":
+                continue
+            if py_file.name in files:
+                raise ValueError(f"The job {self.name} has more than one py file named {py_file.name}")
+            files[py_file.name] = {"path": py_file, "digest": self.local_digest(py_file)}
+        return files
+
+    def bundle_contents(self) -> Tuple[Dict[str, Dict], Dict]:
+        """
+        The files of the bundle by their name in it, and a report of what went into it. Module files are tree
+        shaken down to those reachable from the job scripts when the job asks for it, and a consolidated bundle
+        holds the python files of the py directory as well, at its root where glue would have put them. The
+        vendored third party requirements of the job go into the bundle last.
+        """
+        candidates = self.bundle_candidates()
+        dynamic = []
+
+        if self.tree_shake:
+            graph = SuperglueImportGraph({arcname: c["path"] for arcname, c in candidates.items()})
+            files = {arcname: candidates[arcname] for arcname in graph.reachable(self.bundle_entries())}
+            dynamic = sorted(graph.dynamic)
+            # installed package metadata is read by name through importlib.metadata, never imported
+            files.update({a: c for a, c in candidates.items() if a.split("/")[0].endswith(".dist-info")})
+        else:
+            files = dict(candidates)
+
+        sizes = {arcname: c["path"].stat().st_size for arcname, c in candidates.items()}
+        report = {
+            "tree_shake": self.tree_shake,
+            "modules": len(self.superglue_modules),
+            "files": len(candidates),
+            "bytes": sum(sizes.values()),
+            "kept_files": len(files),
+            "kept_bytes": sum(sizes[arcname] for arcname in files),
+            "dynamic": dynamic,
+            "entries": len(self.superglue_modules),
+        }
+
+        if self.consolidate:
+            py_files = self.bundle_py_files()
+            top_levels = {SuperglueImportGraph.top_level(arcname) for arcname in candidates}
+            clashes = sorted(name for name in py_files if Path(name).stem in top_levels)
+            if clashes:
+                raise ValueError(f"The py files {', '.join(clashes)} of job {self.name} clash with its modules")
+
+            files.update(py_files)
+            report["entries"] += len(py_files)
+
+        vendored = self.vendored_files(self.requirements)
+        clashes = sorted(set(files) & set(vendored))
+        if clashes:
+            raise ValueError(f"The requirements of job {self.name} clash with its files {', '.join(clashes)}")
+        files.update(vendored)
+        report["requirements"] = len(self.requirements)
+        report["vendored_files"] = len(vendored)
+
+        return dict(sorted(files.items())), report
+
+    def bundle_task(
+        self,
+        force: Optional[bool] = False,
+        compression: Optional[str] = SUPERGLUE_ZIP_COMPRESSION,
+        compression_level: Optional[int] = SUPERGLUE_ZIP_COMPRESSION_LEVEL,
+        bytecode: Optional[Dict] = bytecode_settings(SUPERGLUE_BYTECODE, SUPERGLUE_BYTECODE_PYTHON),
+    ) -> Optional[Dict]:
+        """
+        Describes how to build the bundle of the job, in the same form as a module packaging task, with a report
+        of what went into it. Returns None when the existing bundle was built from exactly the files and settings
+        it would be built from now.
+        """
+        files, report = self.bundle_contents()
+        manifest = zip_manifest({a: f["digest"] for a, f in files.items()}, compression, compression_level, bytecode)
+        if not force and read_zip_manifest(self.bundle_file) == manifest:
+            return None
+
+        return {
+            "name": self.name,
+            "component_type": self.component_type,
+            "zipfile": self.bundle_file.as_posix(),
+            "files": [[file["path"].as_posix(), arcname] for arcname, file in files.items()],
+            "manifest_name": ZIP_MANIFEST_NAME,
+            "manifest": manifest,
+            "compression": compression,
+            "compression_level": compression_level,
+            "bytecode": bytecode,
+            "report": report,
+        }
+
+    def remove_bundle(self) -> None:
+        if self.bundle_file.exists():
+            self.bundle_file.unlink()
+
     def get_extra_file_args(self) -> Dict[str, str]:
         extra_file_args = {}
 
@@ -253,12 +479,36 @@ class SuperglueJob(SuperglueComponent):
 
         return extra_file_args
 
-    def deploy(self, increment_version: bool) -> None:
+    def plan(self) -> Dict:
+        # the merged config is synced with the other files of the job, so it is written before they are planned
+        self.generate_deployment_yml()
+        plan = super(SuperglueJob, self).plan()
+        plan["deployment_config_digest"] = file_digest(self.deployment_config_file)
+        plan["glue_jobs"] = self.plan_glue()
+        return plan
+
+    def check_deployment_yml(self, plan: Dict) -> None:
+        """raises when the merged config written for a planned deployment is not the one the plan was made from"""
+        if file_digest(self.deployment_config_file) != plan.get("deployment_config_digest"):
+            raise ValueError(f"The merged config of {self.name} changed since it was planned, plan again")
+
+    def deploy(
+        self,
+        increment_version: bool,
+        scheduler: Optional[SuperglueUploadScheduler] = None,
+        plan: Optional[Dict] = None,
+    ) -> None:
         if increment_version:
             self.append_version()
         self.generate_deployment_yml()
-        self.sync()
-        self.create_or_update()
+
+        if plan:
+            self.check_deployment_yml(plan)
+            self.sync(scheduler, plan["files"])
+            self.apply_glue_plan(plan["glue_jobs"])
+        else:
+            self.sync(scheduler)
+            self.create_or_update()
 
     def delete(self) -> None:
         pass
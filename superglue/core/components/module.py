@@ -1,16 +1,33 @@
-import zipfile
+import yaml
 from pathlib import Path
-from typing import Optional, TypeVar, List
+from typing import Dict, Optional, TypeVar, List
 from superglue.environment.config import MODULES_PATH
 from superglue.core.components.base import SuperglueComponent
+from superglue.core.bytecode import bytecode_settings
+from superglue.core.packaging import ZIP_MANIFEST_NAME, build_zipfile, read_zip_manifest, zip_manifest
+from superglue.core.transfer import SuperglueUploadScheduler
 from superglue.core.components.tests import SuperglueTests
-from superglue.environment.variables import SUPERGLUE_S3_BUCKET, SUPERGLUE_IAM_ROLE
+from superglue.environment.variables import (
+    SUPERGLUE_S3_BUCKET,
+    SUPERGLUE_IAM_ROLE,
+    SUPERGLUE_ZIP_COMPRESSION,
+    SUPERGLUE_ZIP_COMPRESSION_LEVEL,
+    SUPERGLUE_BYTECODE,
+    SUPERGLUE_BYTECODE_PYTHON,
+)
 
 
 SuperglueModuleType = TypeVar("SuperglueModuleType", bound="SuperglueModule")
 
 
 class SuperglueModule(SuperglueComponent):
+
+    # entry of the zip file recording the digests of the files it was packaged from
+    zip_manifest_name = ZIP_MANIFEST_NAME
+
+    # files never packaged, whatever the include patterns say
+    package_filters = ["__pycache__", ".DS_Store", ".version", ".zip", ".pyc", ".tmp"]
+
     def __init__(
         self,
         name: str,
@@ -32,6 +49,8 @@ class SuperglueModule(SuperglueComponent):
             **kwargs,
         )
 
+        # the locked version of the local files, a module loaded from_version may point at another one
+        self.local_version_number = self.version_number
         if version_number:
             self.version_number = version_number
 
@@ -49,9 +68,49 @@ class SuperglueModule(SuperglueComponent):
 
     @property
     def s3_zipfile_path(self) -> str:
+        if self.content_addressed:
+            # the module version may not be the local one, so the blob is looked up in the deployed version.
+            # versions deployed before content addressing was enabled fall back to their versioned location.
+            blob_key = self.fetch_files_manifest().get(self.get_relative_path(self.zipfile))
+            if blob_key:
+                return f"s3://{self.bucket}/{blob_key}"
+
+            # the local version when it is not deployed yet, e.g. when it is planned together with a job using it.
+            # deploying it uploads the zip file under the digest of the local one.
+            if (
+                self.version_number == self.local_version_number
+                and self.zipfile.exists()
+                and not self.fetch_s3_version()
+            ):
+                return f"s3://{self.bucket}/{self.blob_key(self.zipfile)}"
+
         relative_path = self.zipfile.relative_to(self.module_root_path)
         return f"{self.s3_path}/{relative_path}"
 
+    @property
+    def config_file(self) -> Path:
+        return self.module_root_path / "config.yml"
+
+    @property
+    def config(self) -> Dict:
+        try:
+            return yaml.safe_load(self.config_file.read_text()) or {}
+        except FileNotFoundError:
+            return {}
+
+    @property
+    def package_include(self) -> List[str]:
+        """glob patterns, relative to the module root, of the files packaged into the zip file"""
+        return ["**/*.py"] + self.config.get("package", {}).get("include", [])
+
+    @property
+    def package_exclude(self) -> List[str]:
+        return self.config.get("package", {}).get("exclude", [])
+
+    @property
+    def requirements(self) -> List[str]:
+        return self.config.get("requirements") or []
+
     @property
     def module_test_path(self) -> Path:
         return self.tests.modules_test_dir / self.name
@@ -62,7 +121,15 @@ class SuperglueModule(SuperglueComponent):
 
     @property
     def is_packaged(self) -> bool:
-        return self.zipfile.exists()
+        """True when the zip file holds exactly the files it would be packaged from now, whatever its settings"""
+        manifest = self.packaged_manifest()
+        if manifest is None:
+            return False
+        try:
+            files = self.package_files()
+        except (RuntimeError, ValueError):
+            return False
+        return manifest["files"] == {arcname: file["digest"] for arcname, file in files.items()}
 
     @classmethod
     def new(cls, module_name: str) -> SuperglueModuleType:
@@ -83,7 +150,20 @@ class SuperglueModule(SuperglueComponent):
         return sg_module
 
     def module_files(self) -> List[Path]:
-        return list(self.module_root_path.glob("**/*.py"))
+        """
+        the python files of the module, and any package data such as json, sql or yaml resources the include
+        patterns of the module config select, less the files its exclude patterns select.
+        """
+        included = {p for pattern in self.package_include for p in self.module_root_path.glob(pattern)}
+        excluded = {p for pattern in self.package_exclude for p in self.module_root_path.glob(pattern)}
+
+        files = []
+        for path in sorted(included - excluded):
+            relative_path = path.relative_to(self.module_root_path)
+            filtered = any(f in relative_path.parts or relative_path.name.endswith(f) for f in self.package_filters)
+            if path.is_file() and not filtered and path != self.config_file:
+                files.append(path)
+        return files
 
     def save(self) -> None:
         self.module_inner_path.mkdir(parents=True, exist_ok=True)
@@ -92,10 +172,15 @@ class SuperglueModule(SuperglueComponent):
         self.save_version_file()
         self.save_tests()
 
-    def deploy(self, increment_version: bool) -> None:
+    def deploy(
+        self,
+        increment_version: bool,
+        scheduler: Optional[SuperglueUploadScheduler] = None,
+        plan: Optional[Dict] = None,
+    ) -> None:
         if increment_version:
             self.append_version()
-        self.sync()
+        self.sync(scheduler, plan["files"] if plan else None)
 
     def delete(self) -> None:
         raise NotImplementedError
@@ -103,15 +188,85 @@ class SuperglueModule(SuperglueComponent):
     def zipfile_relative_path(self, path: Path) -> str:
         return path.relative_to(self.module_root_path).as_posix()
 
-    def zipfile_content(self, path: Path) -> str:
-        return path.read_text(encoding="utf-8")
+    def package_manifest(
+        self,
+        compression: Optional[str] = SUPERGLUE_ZIP_COMPRESSION,
+        compression_level: Optional[int] = SUPERGLUE_ZIP_COMPRESSION_LEVEL,
+        bytecode: Optional[Dict] = bytecode_settings(SUPERGLUE_BYTECODE, SUPERGLUE_BYTECODE_PYTHON),
+    ) -> Dict:
+        """the manifest of the zip file, with digests taken from the version hashes of the module"""
+        files = {arcname: file["digest"] for arcname, file in self.package_files().items()}
+        return zip_manifest(files, compression, compression_level, bytecode)
+
+    def package_files(self) -> Dict[str, Dict]:
+        """the files of the module and its vendored requirements, by their name in the zip file"""
+        files = {}
+        for file in self.module_files():
+            files[self.zipfile_relative_path(file)] = {"path": file, "digest": self.local_digest(file)}
+
+        vendored = self.vendored_files(self.requirements)
+        clashes = sorted(set(files) & set(vendored))
+        if clashes:
+            raise ValueError(f"The module {self.name} and its requirements both have {', '.join(clashes)}")
+        files.update(vendored)
+        return files
+
+    def packaged_manifest(self) -> Optional[Dict]:
+        return read_zip_manifest(self.zipfile)
+
+    @property
+    def is_package_current(self) -> bool:
+        return self.packaged_manifest() == self.package_manifest()
+
+    def package_task(
+        self,
+        force: Optional[bool] = False,
+        compression: Optional[str] = SUPERGLUE_ZIP_COMPRESSION,
+        compression_level: Optional[int] = SUPERGLUE_ZIP_COMPRESSION_LEVEL,
+        bytecode: Optional[Dict] = bytecode_settings(SUPERGLUE_BYTECODE, SUPERGLUE_BYTECODE_PYTHON),
+        compare_imports: Optional[bool] = False,
+    ) -> Optional[Dict]:
+        """
+        Describes how to build the zip file of the module, with nothing but paths, so it can be built in another
+        process. Returns None when the existing zip file was built from exactly the current files and settings.
+        """
+        manifest = self.package_manifest(compression, compression_level, bytecode)
+        if not force and self.packaged_manifest() == manifest:
+            return None
+
+        files = self.package_files()
+        module_files = self.module_files()
+
+        return {
+            "name": self.name,
+            "zipfile": self.zipfile.as_posix(),
+            "files": [[file["path"].as_posix(), arcname] for arcname, file in files.items()],
+            "manifest_name": self.zip_manifest_name,
+            "manifest": manifest,
+            "compression": compression,
+            "compression_level": compression_level,
+            "bytecode": bytecode,
+            "compare_imports": compare_imports,
+            "report": {"requirements": len(self.requirements), "vendored_files": len(files) - len(module_files)},
+        }
+
+    def package(
+        self,
+        force: Optional[bool] = False,
+        compression: Optional[str] = SUPERGLUE_ZIP_COMPRESSION,
+        compression_level: Optional[int] = SUPERGLUE_ZIP_COMPRESSION_LEVEL,
+        bytecode: Optional[Dict] = bytecode_settings(SUPERGLUE_BYTECODE, SUPERGLUE_BYTECODE_PYTHON),
+    ) -> bool:
+        """
+        Builds the zip file of the module, unless the existing one was built from exactly the current files.
+        Returns True when the zip file was (re)built.
+        """
+        task = self.package_task(force, compression, compression_level, bytecode)
+        if task is None:
+            return False
 
-    def package(self) -> None:
-        with zipfile.ZipFile(self.zipfile, mode="w") as zip_file:
-            for file in self.module_files():
-                content = self.zipfile_content(file)
-                relative_path = self.zipfile_relative_path(file)
-                zip_file.writestr(relative_path, content)
+        build_zipfile(task)
+        return True
 
     def remove_zipfile(self) -> None:
         if self.zipfile.exists():
@@ -1,6 +1,7 @@
 import operator
 from pathlib import Path
-from typing import List, Type
+from typing import List, Type, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from prettytable import PrettyTable
 from superglue.environment.config import JOBS_PATH, MODULES_PATH, NOTEBOOKS_PATH, TOOLS_PATH
 from superglue.core.components.component_list import SuperglueComponentList
@@ -9,11 +10,28 @@ from superglue.core.components.module import SuperglueModule
 from superglue.core.components.job import SuperglueJob
 from superglue.core.components.tests import SuperglueTests
 from superglue.core.components.files import SuperglueFiles
+from superglue.core.components.base import SuperglueComponentType
+from superglue.core.hash_cache import SuperglueHashCache
+from superglue.core.vendor import SuperglueVendorCache
+from superglue.core.remote import SuperglueRemoteIndex
+from superglue.core.manifest import SuperglueManifest
+from superglue.core.glue import SuperglueGlueState
+from superglue.environment.variables import SUPERGLUE_REMOTE_WORKERS
 
 
 class SuperglueProject:
     """Class represents the superglue project structure"""
 
+    def __init__(self, use_hash_cache: Optional[bool] = True) -> None:
+        self.hash_cache = SuperglueHashCache(enabled=use_hash_cache)
+
+        # the project directories are scanned once and the components reused for the whole command
+        self._jobs: Optional[SuperglueComponentList] = None
+        self._modules: Optional[SuperglueComponentList] = None
+        self.manifest = SuperglueManifest()
+        self.glue_state = SuperglueGlueState()
+        self.vendor_cache = SuperglueVendorCache()
+
     @property
     def jobs_path(self) -> Path:
         return JOBS_PATH
@@ -40,8 +58,12 @@ class SuperglueProject:
 
     @property
     def jobs(self) -> SuperglueComponentList[SuperglueJob]:
-        jobs = [self.job.get(p.name) for p in self.jobs_path.iterdir()]
-        return SuperglueComponentList(jobs)
+        if self._jobs is None:
+            jobs = [self.job.get(p.name) for p in self.jobs_path.iterdir()]
+            for job in jobs:
+                job.glue_state = self.glue_state
+            self._jobs = self.attach_components(jobs)
+        return self._jobs
 
     @property
     def module(self) -> Type[SuperglueModule]:
@@ -49,8 +71,10 @@ class SuperglueProject:
 
     @property
     def modules(self) -> SuperglueComponentList[SuperglueModule]:
-        modules = [self.module.get(p.name) for p in self.modules_path.iterdir()]
-        return SuperglueComponentList(modules)
+        if self._modules is None:
+            modules = [self.module.get(p.name) for p in self.modules_path.iterdir()]
+            self._modules = self.attach_components(modules)
+        return self._modules
 
     @property
     def components(self) -> SuperglueComponentList:
@@ -72,12 +96,83 @@ class SuperglueProject:
     def pretty_table_fields(self) -> List[str]:
         return ["Component Name", "Component Type", "Local Stats", "s3 Status", "Version Status", "Version Number"]
 
+    def attach_components(self, components: List[SuperglueComponentType]) -> SuperglueComponentList:
+        for component in components:
+            component.hash_cache = self.hash_cache
+            component.vendor_cache = self.vendor_cache
+        return SuperglueComponentList(components)
+
     def is_locked(self) -> bool:
-        return self.jobs.are_locked() and self.modules.are_locked()
+        return self.components.are_locked()
 
     def versions_match(self) -> bool:
+        self.load_remote_state()
         return self.components.versions_match()
 
+    def index_remote_versions(
+        self,
+        components: Optional[List[SuperglueComponentType]] = None,
+        max_workers: Optional[int] = SUPERGLUE_REMOTE_WORKERS,
+    ) -> SuperglueRemoteIndex:
+        """
+        Reads the available versions of the given components (all of them by default) from S3 in one go
+        and hands the latest version number to each component.
+        """
+        components = self.components if components is None else components
+        index = SuperglueRemoteIndex(max_workers=max_workers).build(components)
+
+        for component in components:
+            component.remote_version_number = index.latest_version(component)
+        return index
+
+    def load_remote_state(
+        self, rebuild_manifest: Optional[bool] = False, max_workers: Optional[int] = SUPERGLUE_REMOTE_WORKERS
+    ) -> bool:
+        """
+        Reads the remote project manifest and seeds every component with its remote state.
+        When there is no manifest, it is rebuilt in memory from the .version objects of the components.
+        Components the manifest does not know about fall back to a listing of their versions.
+        Returns False when the manifest had to be rebuilt.
+        """
+        components = self.components
+        loaded = not rebuild_manifest and self.manifest.load()
+
+        if not loaded:
+            self.manifest.max_workers = max(1, max_workers)
+            self.manifest.rebuild(components)
+
+        unknown = [c for c in components if not self.manifest.seed(c)]
+        if unknown:
+            self.index_remote_versions(unknown, max_workers)
+        return loaded
+
+    def pretty_table_rows(
+        self, components: List[SuperglueComponentType], max_workers: Optional[int] = SUPERGLUE_REMOTE_WORKERS
+    ) -> List[List[str]]:
+        """
+        Collects the status rows of the components. Remote lookups which are not answered by the manifest
+        run concurrently, the rows are returned in the order of the components regardless of completion order.
+        """
+        SuperglueComponentList(components).hash_versions()
+        rows = [None] * len(components)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            futures = {pool.submit(lambda c: c.pretty_table_row, c): i for i, c in enumerate(components)}
+            for future in as_completed(futures):
+                rows[futures[future]] = future.result()
+        return rows
+
+    def fetch_glue_state(self, jobs: List[SuperglueJob]) -> SuperglueGlueState:
+        """reads the remote definition of every glue job the given jobs render to, in batches"""
+        names = []
+        for job in jobs:
+            job.render()
+            names.extend(job.job_names)
+        return self.glue_state.fetch(names)
+
+    def save_manifest(self) -> None:
+        self.manifest.save()
+
     def save_project_component(self, component_name: str) -> None:
         component_property = getattr(self, component_name)
         component = component_property.new()
@@ -104,3 +199,6 @@ class SuperglueProject:
             if field != "Version Number":
                 table.align[field] = "l"
         return table
+
+    def close(self) -> None:
+        self.hash_cache.save()
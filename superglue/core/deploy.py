@@ -0,0 +1,120 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from superglue.environment.variables import SUPERGLUE_DEPLOY_PARALLELISM
+
+ComponentKey = Tuple[str, str]
+
+
+class SuperglueDeployScheduler:
+    """
+    Deploys components as a dependency graph. A job depends on the modules named in its superglue_modules config
+    which are part of the same deployment, and is started as soon as those modules are deployed. Everything else
+    starts right away, bounded by parallelism.
+
+    When a component fails, the components depending on it are skipped. Unless continue_on_error is set,
+    no new components are started either, and the deployments already running are allowed to finish.
+    """
+
+    def __init__(
+        self, parallelism: Optional[int] = SUPERGLUE_DEPLOY_PARALLELISM, continue_on_error: Optional[bool] = False
+    ) -> None:
+        self.parallelism = max(1, parallelism)
+        self.continue_on_error = continue_on_error
+        self.results: Dict[ComponentKey, Dict] = {}
+
+    @staticmethod
+    def component_key(component) -> ComponentKey:
+        return component.component_type, component.component_name
+
+    @classmethod
+    def dependencies(cls, components: Iterable) -> Dict[ComponentKey, Set[ComponentKey]]:
+        components = list(components)
+        keys = {cls.component_key(c) for c in components}
+        graph = {}
+
+        for component in components:
+            modules = getattr(component, "superglue_modules", {}) or {}
+            required = {("superglue_module", name) for name in modules}
+            graph[cls.component_key(component)] = required & keys
+        return graph
+
+    @property
+    def failed(self) -> List[Dict]:
+        return [r for r in self.results.values() if r["status"] == "failed"]
+
+    @property
+    def succeeded(self) -> bool:
+        return all(r["status"] == "deployed" for r in self.results.values())
+
+    def record(self, component, status: str, error: Optional[Exception] = None, seconds: float = 0.0) -> Dict:
+        result = {"component": component, "status": status, "error": error, "seconds": seconds}
+        self.results[self.component_key(component)] = result
+        return result
+
+    def run(
+        self,
+        components: Iterable,
+        deploy: Callable,
+        on_complete: Optional[Callable[[Dict], None]] = None,
+    ) -> List[Dict]:
+        """
+        Calls deploy for every component in dependency order and returns one result per component, in the order
+        the components were given. on_complete is called on the calling thread whenever a component finishes.
+        """
+        components = list(components)
+        by_key = {self.component_key(c): c for c in components}
+        waiting_on = self.dependencies(components)
+        dependents: Dict[ComponentKey, Set[ComponentKey]] = {key: set() for key in by_key}
+
+        for key, required in waiting_on.items():
+            for dependency in required:
+                dependents[dependency].add(key)
+
+        on_complete = on_complete or (lambda result: None)
+        ready = [key for key in by_key if not waiting_on[key]]
+        running = {}
+        stopped = False
+
+        def timed_deploy(component) -> float:
+            start = time.monotonic()
+            deploy(component)
+            return time.monotonic() - start
+
+        def skip(key: ComponentKey) -> None:
+            for dependent in dependents[key]:
+                if dependent not in self.results:
+                    on_complete(self.record(by_key[dependent], "skipped"))
+                    skip(dependent)
+
+        with ThreadPoolExecutor(max_workers=self.parallelism) as pool:
+            while ready or running:
+                while ready and not stopped and len(running) < self.parallelism:
+                    key = ready.pop(0)
+                    running[pool.submit(timed_deploy, by_key[key])] = key
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    key = running.pop(future)
+                    error = future.exception()
+
+                    if error is None:
+                        on_complete(self.record(by_key[key], "deployed", seconds=future.result()))
+                        for dependent in dependents[key]:
+                            waiting_on[dependent].discard(key)
+                            if not waiting_on[dependent] and dependent not in self.results:
+                                ready.append(dependent)
+                    else:
+                        on_complete(self.record(by_key[key], "failed", error=error))
+                        skip(key)
+                        stopped = stopped or not self.continue_on_error
+
+        for key, component in by_key.items():
+            if key not in self.results:
+                on_complete(self.record(component, "skipped"))
+
+        return [self.results[key] for key in by_key]
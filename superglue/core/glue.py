@@ -0,0 +1,201 @@
+import threading
+import botocore
+from copy import deepcopy
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from superglue.core.aws import get_client
+from superglue.environment.variables import AWS_REGION, SUPERGLUE_AWS_ACCOUNT
+
+# the keys of a glue job definition which can be set through the JobUpdate parameter of update_job
+JOB_UPDATE_FIELDS = [
+    "Description",
+    "LogUri",
+    "Role",
+    "ExecutionProperty",
+    "Command",
+    "DefaultArguments",
+    "NonOverridableArguments",
+    "Connections",
+    "MaxRetries",
+    "AllocatedCapacity",
+    "Timeout",
+    "MaxCapacity",
+    "WorkerType",
+    "NumberOfWorkers",
+    "SecurityConfiguration",
+    "NotificationProperty",
+    "GlueVersion",
+    "CodeGenConfigurationNodes",
+    "ExecutionClass",
+    "SourceControlDetails",
+    "MaintenanceWindow",
+    "JobMode",
+    "JobRunQueuingEnabled",
+]
+
+# values glue reports for settings which were never set, they are treated as if they were missing
+JOB_UPDATE_DEFAULTS = {
+    "Description": "",
+    "ExecutionProperty": {"MaxConcurrentRuns": 1},
+    "DefaultArguments": {},
+    "NonOverridableArguments": {},
+    "Connections": {"Connections": []},
+    "MaxRetries": 0,
+    "ExecutionClass": "STANDARD",
+    "JobMode": "SCRIPT",
+    "JobRunQueuingEnabled": False,
+}
+
+# error codes of a tagging api call the credentials are not allowed to make
+ACCESS_DENIED_CODES = ["AccessDenied", "AccessDeniedException"]
+
+# settings glue derives from others when they are not given, only compared when set locally. The default
+# timeout depends on the job type and has changed over time, streaming jobs have none at all.
+JOB_DERIVED_FIELDS = ["AllocatedCapacity", "MaxCapacity", "Timeout"]
+COMMAND_DERIVED_FIELDS = ["PythonVersion", "Runtime"]
+
+
+def job_arn(job_name: str) -> str:
+    return f"arn:aws:glue:{AWS_REGION}:{SUPERGLUE_AWS_ACCOUNT}:job/{job_name}"
+
+
+def tag_changes(local_tags: Dict[str, str], remote_tags: Dict[str, str]) -> Tuple[Dict[str, str], List[str]]:
+    """
+    returns the tags to add or overwrite, and the keys of the tags to remove, to bring the remote tags in line.
+    tags with the reserved aws: prefix are managed by AWS and never removed.
+    """
+    to_add = {key: value for key, value in local_tags.items() if remote_tags.get(key) != value}
+    to_remove = sorted(key for key in remote_tags if key not in local_tags and not key.startswith("aws:"))
+    return to_add, to_remove
+
+
+def normalize_job_update(job_update: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Brings a JobUpdate, or the definition of a job returned by glue, into a shape where the two can be compared.
+    Unset and default values are dropped, arguments are compared as strings and roles by their name.
+    """
+    normalized = {}
+
+    for key, value in deepcopy(job_update).items():
+        if key not in JOB_UPDATE_FIELDS or value is None or value == JOB_UPDATE_DEFAULTS.get(key):
+            continue
+
+        if key in ["DefaultArguments", "NonOverridableArguments"]:
+            value = {k: str(v) for k, v in value.items()}
+        elif key == "Role":
+            value = value.split("role/")[-1]
+
+        normalized[key] = value
+    return normalized
+
+
+def job_update_differs(job_update: Dict[str, Any], remote_job: Dict[str, Any]) -> bool:
+    local = normalize_job_update(job_update)
+    remote = normalize_job_update(remote_job)
+
+    for key in JOB_DERIVED_FIELDS:
+        if key not in local:
+            remote.pop(key, None)
+
+    if "Command" in remote:
+        for key in COMMAND_DERIVED_FIELDS:
+            if key not in local.get("Command", {}):
+                remote["Command"].pop(key, None)
+
+    return local != remote
+
+
+class SuperglueGlueState:
+    """
+    Remote definitions and tags of glue jobs. The jobs of a whole deployment are fetched up front in batches, the
+    definitions with batch_get_jobs and the tags of the jobs which exist with the resource groups tagging api.
+    Checking whether a job exists, whether it changed and which tags it has does not cost an API call per job.
+    """
+
+    batch_size = 25
+    tag_batch_size = 100
+
+    def __init__(self) -> None:
+        self.jobs: Dict[str, Optional[Dict]] = {}
+        self.tags: Dict[str, Dict[str, str]] = {}
+        # tags are read one job at a time with glue:GetTags once tag:GetResources is denied
+        self.tagging_denied = False
+
+        # jobs are deployed from several threads at once
+        self._lock = threading.Lock()
+
+    def fetch(self, job_names: Iterable[str]) -> "SuperglueGlueState":
+        with self._lock:
+            missing = sorted({name for name in job_names if name not in self.jobs})
+
+        if not missing:
+            return self
+
+        glue_client = get_client("glue")
+        for i in range(0, len(missing), self.batch_size):
+            batch = missing[i : i + self.batch_size]
+            response = glue_client.batch_get_jobs(JobNames=batch)
+            found = {job["Name"]: job for job in response.get("Jobs", [])}
+
+            with self._lock:
+                for name in batch:
+                    self.jobs[name] = found.get(name)
+
+        self.fetch_tags([name for name in missing if self.jobs[name] is not None])
+        return self
+
+    def fetch_tags(self, job_names: List[str]) -> None:
+        if not job_names:
+            return
+
+        tagging_client = get_client("resourcegroupstaggingapi")
+        for i in range(0, len(job_names), self.tag_batch_size):
+            batch = job_names[i : i + self.tag_batch_size]
+            if self.tagging_denied:
+                self.fetch_glue_tags(batch)
+                continue
+
+            try:
+                response = tagging_client.get_resources(ResourceARNList=[job_arn(name) for name in batch])
+            except botocore.exceptions.ClientError as e:
+                if e.response.get("Error", {}).get("Code") not in ACCESS_DENIED_CODES:
+                    raise e
+                self.tagging_denied = True
+                self.fetch_glue_tags(batch)
+                continue
+
+            found = {
+                mapping["ResourceARN"]: {tag["Key"]: tag["Value"] for tag in mapping.get("Tags", [])}
+                for mapping in response.get("ResourceTagMappingList", [])
+            }
+
+            # resources without any tags are left out of the response
+            with self._lock:
+                for name in batch:
+                    self.tags[name] = found.get(job_arn(name), {})
+
+    def fetch_glue_tags(self, job_names: List[str]) -> None:
+        """reads the tags of each job with glue:GetTags, for credentials without tag:GetResources"""
+        glue_client = get_client("glue")
+        for name in job_names:
+            tags = glue_client.get_tags(ResourceArn=job_arn(name)).get("Tags", {})
+            with self._lock:
+                self.tags[name] = tags
+
+    def get(self, job_name: str) -> Optional[Dict]:
+        if job_name not in self.jobs:
+            self.fetch([job_name])
+        return self.jobs[job_name]
+
+    def get_tags(self, job_name: str) -> Dict[str, str]:
+        if job_name not in self.jobs:
+            self.fetch([job_name])
+        return self.tags.get(job_name, {})
+
+    def record(self, job_name: str, job_update: Dict) -> None:
+        """remember the definition a job was just created or updated with"""
+        with self._lock:
+            self.jobs[job_name] = dict(job_update, Name=job_name)
+
+    def record_tags(self, job_name: str, tags: Dict[str, str]) -> None:
+        with self._lock:
+            self.tags[job_name] = dict(tags)
@@ -0,0 +1,133 @@
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from superglue.environment.config import HASH_CACHE_FILE, SUPERGLUE_CWD
+
+
+class SuperglueHashCache:
+    """
+    On disk cache of file digests. Entries are keyed by the path of the file relative to the project
+    root and are only reused when the size, mtime_ns and inode of the file are unchanged.
+    """
+
+    # bump this whenever the digest algorithm or the layout of the cache file changes
+    cache_version = 1
+
+    # files modified this recently may still be written to within the same mtime tick, so never cache them
+    racy_window_ns = 2_000_000_000
+
+    def __init__(
+        self, cache_file: Path = HASH_CACHE_FILE, root_dir: Path = SUPERGLUE_CWD, enabled: Optional[bool] = True
+    ) -> None:
+        self.cache_file = cache_file
+        self.root_dir = root_dir
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries: Optional[Dict[str, Dict]] = None
+        self._dirty = False
+
+        # digests may be requested from several hashing threads at once
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict:
+        # locks cannot be pickled, which components handed to a process pool need
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def entries(self) -> Dict[str, Dict]:
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    self._entries = self.load()
+        return self._entries
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @staticmethod
+    def signature(stat: os.stat_result) -> List[int]:
+        return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+    def load(self) -> Dict[str, Dict]:
+        try:
+            content = json.loads(self.cache_file.read_text())
+        except (FileNotFoundError, ValueError):
+            # a missing or corrupt cache is simply rebuilt
+            return {}
+
+        if not isinstance(content, dict) or content.get("cache_version") != self.cache_version:
+            return {}
+
+        entries = content.get("entries")
+        return entries if isinstance(entries, dict) else {}
+
+    def cache_key(self, path: Path) -> str:
+        path = path.absolute()
+        try:
+            return path.relative_to(self.root_dir).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def get_digest(self, path: Path, hasher: Callable[[Path], str]) -> str:
+        if not self.enabled:
+            return hasher(path)
+
+        # stat before hashing, so a file written to while it is hashed will not match next time
+        stat = path.stat()
+        signature = self.signature(stat)
+        key = self.cache_key(path)
+        entry = self.entries.get(key)
+
+        if entry and entry.get("signature") == signature:
+            with self._lock:
+                self.hits += 1
+            return entry["digest"]
+
+        digest = hasher(path)
+
+        with self._lock:
+            self.misses += 1
+            self._dirty = True
+
+            if time.time_ns() - stat.st_mtime_ns > self.racy_window_ns:
+                self._entries[key] = {"signature": signature, "digest": digest}
+            else:
+                self._entries.pop(key, None)
+
+        return digest
+
+    def prune(self) -> None:
+        for key in list(self.entries.keys()):
+            if not (self.root_dir / key).exists():
+                del self.entries[key]
+
+    def save(self) -> None:
+        if not self.enabled or not self._dirty:
+            return
+
+        self.prune()
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+
+        # write to a temporary file and swap it in, so an interrupted write never leaves a corrupt cache behind
+        content = {"cache_version": self.cache_version, "entries": self.entries}
+        temp_file = self.cache_file.with_name(f"{self.cache_file.name}.{os.getpid()}.tmp")
+        temp_file.write_text(json.dumps(content))
+        os.replace(temp_file, self.cache_file)
+        self._dirty = False
+
+    def clear(self) -> None:
+        self._entries = {}
+        self._dirty = False
+        if self.cache_file.exists():
+            self.cache_file.unlink()
@@ -0,0 +1,47 @@
+from pathlib import Path
+from hashlib import md5
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from superglue.environment.variables import SUPERGLUE_HASH_BUFFER_SIZE, SUPERGLUE_HASH_WORKERS
+
+
+def file_digest(path: Path, buffer_size: Optional[int] = SUPERGLUE_HASH_BUFFER_SIZE) -> str:
+    md5_hash = md5()
+
+    with path.open("rb") as data:
+        for chunk in iter(lambda: data.read(buffer_size), b""):
+            md5_hash.update(chunk)
+    return md5_hash.hexdigest()
+
+
+class SuperglueHashingEngine:
+    """
+    Hashes the files of many superglue components at once on a bounded thread pool.
+    hashlib releases the GIL while digesting, so threads scale with the available cores.
+    """
+
+    def __init__(self, max_workers: Optional[int] = SUPERGLUE_HASH_WORKERS) -> None:
+        self.max_workers = max(1, max_workers)
+
+    @staticmethod
+    def collect(components: Iterable) -> List[Tuple[object, Path]]:
+        tasks = []
+        for component in components:
+            if component.version_hashes is None:
+                tasks.extend((component, path) for path in component.version_file_paths())
+        return tasks
+
+    def hash_components(self, components: Iterable) -> None:
+        components = [c for c in components if c.version_hashes is None]
+        tasks = self.collect(components)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(pool.map(lambda task: task[0].hash_file(task[1]), tasks))
+
+        version_hashes: Dict[int, Dict[str, str]] = {id(component): {} for component in components}
+
+        for (component, _), (key, digest) in zip(tasks, results):
+            version_hashes[id(component)][key] = digest
+
+        for component in components:
+            component.version_hashes = version_hashes[id(component)]
@@ -0,0 +1,85 @@
+import os
+import json
+import time
+from hashlib import sha256
+from pathlib import Path
+from typing import Dict, Optional
+from superglue.core.aws import get_client, get_session
+from superglue.environment.config import IDENTITY_CACHE_FILE
+from superglue.environment.variables import SUPERGLUE_IDENTITY_CACHE_TTL
+
+
+class SuperglueIdentityCache:
+    """
+    On disk cache of the AWS account the active credentials belong to, so commands run back to back do not each
+    call sts get_caller_identity. Entries are keyed by a fingerprint of the credentials and expire after ttl seconds.
+    Only the fingerprint is stored, never the credentials themselves.
+    """
+
+    cache_version = 1
+
+    def __init__(
+        self, cache_file: Path = IDENTITY_CACHE_FILE, ttl: Optional[int] = SUPERGLUE_IDENTITY_CACHE_TTL
+    ) -> None:
+        self.cache_file = cache_file
+        self.ttl = ttl
+
+    @staticmethod
+    def fingerprint() -> Optional[str]:
+        session = get_session()
+        credentials = session.get_credentials()
+        if credentials is None:
+            return None
+
+        credentials = credentials.get_frozen_credentials()
+        parts = [
+            credentials.access_key,
+            credentials.token or "",
+            session.profile_name or "",
+            os.getenv("AWS_ROLE_ARN", ""),
+            os.getenv("AWS_ROLE_SESSION_NAME", ""),
+        ]
+        return sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+    def load(self) -> Dict[str, Dict]:
+        try:
+            content = json.loads(self.cache_file.read_text())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+        if not isinstance(content, dict) or content.get("cache_version") != self.cache_version:
+            return {}
+
+        entries = content.get("entries")
+        return entries if isinstance(entries, dict) else {}
+
+    def get(self, fingerprint: str) -> Optional[str]:
+        entry = self.load().get(fingerprint)
+        if entry and entry.get("expires", 0) > time.time():
+            return entry["account"]
+        return None
+
+    def put(self, fingerprint: str, account: str) -> None:
+        now = time.time()
+        entries = {k: v for k, v in self.load().items() if v.get("expires", 0) > now}
+        entries[fingerprint] = {"account": account, "expires": now + self.ttl}
+
+        # write to a temporary file and swap it in, so concurrent commands never read a partial file
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.cache_file.with_name(f"{self.cache_file.name}.{os.getpid()}.tmp")
+        temp_file.write_text(json.dumps({"cache_version": self.cache_version, "entries": entries}))
+        os.replace(temp_file, self.cache_file)
+
+    def account_id(self, revalidate: Optional[bool] = False) -> str:
+        fingerprint = self.fingerprint() if self.ttl > 0 else None
+
+        if fingerprint and not revalidate:
+            account = self.get(fingerprint)
+            if account:
+                return account
+
+        account = get_client("sts").get_caller_identity()["Account"]
+
+        if fingerprint:
+            self.put(fingerprint, account)
+        return account
@@ -0,0 +1,129 @@
+import ast
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+# calls which import modules by a name only known at runtime
+DYNAMIC_IMPORT_CALLS = {"import_module", "__import__"}
+
+
+def module_name(arcname: str) -> Optional[str]:
+    """the dotted name a python file is imported by from the root of a zip file, None for other files"""
+    if not arcname.endswith(".py"):
+        return None
+    parts = arcname[: -len(".py")].split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts) or None
+
+
+def resolve_relative(name: str, is_package: bool, level: int, target: Optional[str]) -> Optional[str]:
+    """the absolute name of a relative import made in the module called name"""
+    parts = name.split(".") if is_package else name.split(".")[:-1]
+    if level - 1 > len(parts) or (level - 1 == len(parts) and not target):
+        return None
+
+    parts = parts[: len(parts) - (level - 1)]
+    if target:
+        parts.append(target)
+    return ".".join(parts) or None
+
+
+def imported_names(
+    source: bytes, name: str, is_package: bool, filename: Optional[str] = "<unknown>"
+) -> Tuple[Set[str], bool]:
+    """
+    Every name the source may import, anywhere in the file, including imports inside functions and try blocks.
+    For "from a import b" both a and a.b are returned, as b may be a submodule, and "from a import *" is returned
+    as a.*, standing for every direct submodule of a. Also returns whether the source imports modules by names
+    computed at runtime, which static analysis cannot follow.
+    """
+    names = set()
+    dynamic = False
+
+    for node in ast.walk(ast.parse(source, filename=filename)):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module
+            if node.level:
+                base = resolve_relative(name, is_package, node.level, node.module)
+            if base is None:
+                continue
+
+            names.add(base)
+            for alias in node.names:
+                names.add(f"{base}.{alias.name}")
+
+        elif isinstance(node, ast.Call):
+            func = node.func
+            func_name = getattr(func, "id", None) or getattr(func, "attr", None)
+            dynamic = dynamic or func_name in DYNAMIC_IMPORT_CALLS
+
+    return names, dynamic
+
+
+class SuperglueImportGraph:
+    """
+    Follows the imports of a set of entry scripts through the python files of a zip file to find the files
+    they can reach. Importing a.b.c runs a/__init__.py and a/b/__init__.py as well, so those are always reached
+    with it. Files of a top level package which imports by runtime computed names are all kept, and everything
+    is kept when an entry script does. Non python files of any top level package which is reached at all are
+    kept too, since package data is loaded by path.
+    """
+
+    def __init__(self, files: Dict[str, Path]) -> None:
+        # arcname -> local path of every file which may go into the zip file
+        self.files = files
+        self.modules = {module_name(a): a for a in files if module_name(a)}
+        self.dynamic: Set[str] = set()
+
+    @staticmethod
+    def top_level(arcname: str) -> str:
+        name = arcname.split("/")[0]
+        return name[: -len(".py")] if name.endswith(".py") else name
+
+    def parents(self, name: str) -> List[str]:
+        parts = name.split(".")
+        return [".".join(parts[:i]) for i in range(1, len(parts))]
+
+    def visit(self, path: Path, name: str, is_package: bool) -> Set[str]:
+        names, dynamic = imported_names(path.read_bytes(), name, is_package, path.as_posix())
+        if dynamic:
+            self.dynamic.add(name.split(".")[0])
+        return names
+
+    def expand(self, name: str) -> List[str]:
+        if not name.endswith(".*"):
+            return [name]
+        package = name[: -len(".*")]
+        return [m for m in self.modules if m.rpartition(".")[0] == package]
+
+    def reachable(self, entries: Dict[str, Path]) -> Set[str]:
+        """the arcnames of the files reachable from the entry scripts, given by the names they are imported by"""
+        queue = []
+        for name, path in entries.items():
+            queue.extend(self.visit(path, name, False))
+
+        if self.dynamic & set(entries):
+            # an entry script importing by computed names may import anything
+            self.dynamic = {self.top_level(arcname) for arcname in self.files}
+            return set(self.files)
+
+        seen: Set[str] = set()
+        while queue:
+            name = queue.pop()
+            for candidate in self.parents(name) + self.expand(name):
+                arcname = self.modules.get(candidate)
+                if arcname is None or candidate in seen:
+                    continue
+                seen.add(candidate)
+                queue.extend(self.visit(self.files[arcname], candidate, arcname.endswith("__init__.py")))
+
+        reached = {self.modules[name] for name in seen}
+        packages = {self.top_level(arcname) for arcname in reached}
+        for arcname in self.files:
+            top_level = self.top_level(arcname)
+            if top_level in self.dynamic or (top_level in packages and module_name(arcname) is None):
+                reached.add(arcname)
+        return reached
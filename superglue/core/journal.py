@@ -0,0 +1,102 @@
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+from superglue.environment.config import DEPLOY_JOURNAL_FILE
+
+
+class SuperglueDeployJournal:
+    """
+    Local, append only record of a deployment in progress. Every completed step is written as one json line as soon
+    as it is done: the version numbers assigned to components, the objects transferred to S3, the glue jobs created
+    or updated, and the components which finished deploying. When a deployment dies part way through, the journal
+    lets the next run pick up where it stopped. The journal is removed once a deployment succeeds.
+    """
+
+    journal_version = 1
+
+    def __init__(self, journal_file: Path = DEPLOY_JOURNAL_FILE) -> None:
+        self.journal_file = journal_file
+        self.records: List[Dict] = []
+        self.resumed = False
+        self._lock = threading.Lock()
+
+    @property
+    def exists(self) -> bool:
+        return self.journal_file.exists()
+
+    def load(self) -> List[Dict]:
+        records = []
+        try:
+            with self.journal_file.open() as journal:
+                for line in journal:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # the last line may be cut short when the previous run was killed while writing it
+                        break
+        except FileNotFoundError:
+            return []
+
+        if not records or records[0].get("journal_version") != self.journal_version:
+            return []
+        return records
+
+    def start(self, resume: Optional[bool] = False) -> "SuperglueDeployJournal":
+        self.records = self.load() if resume else []
+        self.resumed = bool(self.records)
+
+        if not self.resumed:
+            self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+            self.journal_file.write_text("")
+            self.record("start", journal_version=self.journal_version)
+        return self
+
+    def record(self, event: str, **fields) -> None:
+        entry = {"event": event, "time": time.time(), **fields}
+        with self._lock:
+            self.records.append(entry)
+            with self.journal_file.open("a") as journal:
+                journal.write(json.dumps(entry) + "\n")
+
+    def find(self, event: str, **fields) -> Optional[Dict]:
+        """the most recent record of the event matching all of the given fields"""
+        with self._lock:
+            for entry in reversed(self.records):
+                if entry["event"] == event and all(entry.get(k) == v for k, v in fields.items()):
+                    return entry
+        return None
+
+    def version_number(self, component) -> Optional[int]:
+        entry = self.find("version", component_type=component.component_type, component_name=component.component_name)
+        return entry["version_number"] if entry else None
+
+    def record_version(self, component) -> None:
+        self.record(
+            "version",
+            component_type=component.component_type,
+            component_name=component.component_name,
+            version_number=component.version_number,
+        )
+
+    def is_deployed(self, component) -> bool:
+        entry = self.find("deployed", component_type=component.component_type, component_name=component.component_name)
+        return entry is not None and entry["version_number"] == component.version_number
+
+    def record_deployed(self, component) -> None:
+        self.record(
+            "deployed",
+            component_type=component.component_type,
+            component_name=component.component_name,
+            version_number=component.version_number,
+        )
+
+    def started(self, component) -> bool:
+        """True when an earlier run assigned a version to the component or transferred any of its files"""
+        keys = {"component_type": component.component_type, "component_name": component.component_name}
+        return self.find("version", **keys) is not None or self.find("transfer", **keys) is not None
+
+    def close(self, succeeded: bool) -> None:
+        if succeeded and self.exists:
+            self.journal_file.unlink()
@@ -0,0 +1,125 @@
+import json
+import uuid
+import botocore
+from hashlib import md5
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+from superglue.core.aws import get_client
+from superglue.core.remote import SuperglueRemoteIndex, s3_prefix_root
+from superglue.environment.variables import SUPERGLUE_S3_BUCKET, SUPERGLUE_REMOTE_WORKERS
+
+
+def version_digest(version: Dict) -> str:
+    """digest of the content of a .version file, independent of key order"""
+    return md5(json.dumps(version, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class SuperglueManifest:
+    """
+    Project level manifest kept in S3 next to the deployed components. For every job and module it records the
+    latest deployed version number, and the digest of the .version file of each deployed version it knows about.
+    Reading this one object replaces listing and downloading the remote state of every component.
+    """
+
+    manifest_version = 1
+    manifest_name = "_manifest.json"
+
+    def __init__(
+        self,
+        bucket: Optional[str] = SUPERGLUE_S3_BUCKET,
+        prefix_root: Optional[str] = None,
+        max_workers: Optional[int] = SUPERGLUE_REMOTE_WORKERS,
+    ) -> None:
+        self.bucket = bucket
+        self.prefix_root = prefix_root or s3_prefix_root()
+        self.max_workers = max(1, max_workers)
+        self.components: Dict[str, Dict[str, Dict]] = {}
+
+    @property
+    def key(self) -> str:
+        return f"{self.prefix_root}/{self.manifest_name}"
+
+    @property
+    def content(self) -> Dict:
+        return {"manifest_version": self.manifest_version, "components": self.components}
+
+    def get(self, component) -> Optional[Dict]:
+        return self.components.get(component.component_type, {}).get(component.component_name)
+
+    def record(self, component, version_number: int, digest: str) -> None:
+        entry = self.components.setdefault(component.component_type, {}).setdefault(
+            component.component_name, {"latest_version": 0, "versions": {}}
+        )
+        entry["latest_version"] = max(entry["latest_version"], version_number)
+        entry["versions"][str(version_number)] = digest
+
+    def update(self, component) -> None:
+        """record the local state of a component which has just been deployed"""
+        self.record(component, component.version_number, component.version_digest)
+
+    def load(self) -> bool:
+        s3_client = get_client("s3")
+        try:
+            response = s3_client.get_object(Bucket=self.bucket, Key=self.key)
+        except botocore.exceptions.ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ["NoSuchKey", "404", "AccessDenied", "403"]:
+                return False
+            raise e
+
+        content = json.load(response["Body"])
+        if content.get("manifest_version") != self.manifest_version:
+            return False
+
+        self.components = content.get("components", {})
+        return True
+
+    def rebuild(self, components: Iterable, index: Optional[SuperglueRemoteIndex] = None) -> None:
+        """
+        Recreates the manifest from the .version objects of the components. The latest version of each
+        component is read, as well as the version matching the local version number.
+        """
+        components = list(components)
+        index = index or SuperglueRemoteIndex(max_workers=self.max_workers).build(components)
+
+        def read_versions(component) -> Dict[int, Dict]:
+            available = index.available_versions(component)
+            wanted = {max(available, default=0), component.version_number}
+            return {n: component.download_s3_version(n) for n in wanted if n in available}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for component, versions in zip(components, pool.map(read_versions, components)):
+                for version_number, version in versions.items():
+                    if version:
+                        self.record(component, version_number, version_digest(version))
+
+    def seed(self, component) -> bool:
+        """
+        hands the remote state known to the manifest to the component.
+        returns False when the manifest knows nothing about the component.
+        """
+        entry = self.get(component)
+        if entry is None:
+            return False
+
+        component.remote_version_number = entry["latest_version"]
+        component.remote_version_digest = entry["versions"].get(str(component.version_number))
+        return True
+
+    def save(self) -> None:
+        """
+        Writes the manifest as it is in memory, replacing whatever is in S3. Together with load this is a
+        read-modify-write without a conditional put, which the pinned boto3 does not support, so deployments of the
+        same project must be serialized. Entries of a deployment saved in between are lost until the manifest is
+        rebuilt with refresh --rebuild-manifest.
+        """
+        # write the new manifest under a temporary key first, then swap it in with a server side copy.
+        # readers therefore only ever see a complete manifest.
+        s3_client = get_client("s3")
+        temp_key = f"{self.key}.{uuid.uuid4().hex}.tmp"
+        body = json.dumps(self.content, indent=4, sort_keys=True).encode("utf-8")
+
+        s3_client.put_object(Bucket=self.bucket, Key=temp_key, Body=body, ContentType="application/json")
+        try:
+            s3_client.copy_object(Bucket=self.bucket, Key=self.key, CopySource={"Bucket": self.bucket, "Key": temp_key})
+        finally:
+            s3_client.delete_object(Bucket=self.bucket, Key=temp_key)
@@ -0,0 +1,188 @@
+import os
+import json
+import shutil
+import zipfile
+import tempfile
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+from superglue.core.bytecode import compile_bytecode, import_time
+from superglue.environment.variables import SUPERGLUE_PACKAGE_WORKERS
+
+# zipimport, which glue uses to import modules from --extra-py-files, only reads these two methods
+COMPRESSION_METHODS = {"stored": zipfile.ZIP_STORED, "deflated": zipfile.ZIP_DEFLATED}
+
+# every entry gets the same timestamp and permissions, so the same files always produce the same bytes
+ZIP_TIMESTAMP = (1980, 1, 1, 0, 0, 0)
+ZIP_FILE_MODE = 0o100644
+
+
+# entry of every zip file recording the digests of the files it was packaged from
+ZIP_MANIFEST_NAME = ".superglue-manifest"
+ZIP_MANIFEST_VERSION = 1
+
+# files are streamed into the archive in chunks of this size, so memory use does not grow with the file size
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# ZipFile.open in write mode takes the compression level from the entry alone, never from the archive. The
+# attribute holding it is public from python 3.13, earlier versions only have the private name.
+ZIPINFO_LEVEL_ATTRIBUTE = "compress_level" if hasattr(zipfile.ZipInfo, "compress_level") else "_compresslevel"
+
+
+def zip_entry(arcname: str, compression: str, level: Optional[int] = None, size: Optional[int] = 0) -> zipfile.ZipInfo:
+    entry = zipfile.ZipInfo(arcname, date_time=ZIP_TIMESTAMP)
+    entry.compress_type = COMPRESSION_METHODS[compression]
+    entry.create_system = 3
+    entry.external_attr = ZIP_FILE_MODE << 16
+    setattr(entry, ZIPINFO_LEVEL_ATTRIBUTE, level)
+    # the size lets ZipFile.open decide up front whether the entry needs zip64 extensions
+    entry.file_size = size
+    return entry
+
+
+def zip_manifest(
+    files: Dict[str, str], compression: str, compression_level: Optional[int], bytecode: Optional[Dict]
+) -> Dict:
+    """
+    the digests of the files a zip file is built from, by their name in the zip file, and the compression and
+    bytecode settings, which change the bytes of the zip file as much as the files do.
+    """
+    return {
+        "manifest_version": ZIP_MANIFEST_VERSION,
+        "files": files,
+        "compression": {"method": compression, "level": compression_level if compression != "stored" else None},
+        "bytecode": bytecode,
+    }
+
+
+def read_zip_manifest(path: Path) -> Optional[Dict]:
+    """the manifest stored in an existing zip file, None when there is no readable one"""
+    try:
+        with zipfile.ZipFile(path) as zip_file:
+            return json.loads(zip_file.read(ZIP_MANIFEST_NAME))
+    except (FileNotFoundError, KeyError, ValueError, zipfile.BadZipFile):
+        return None
+
+
+def build_zipfile(task: Dict) -> Dict:
+    """
+    Writes the zip file described by a packaging task. Tasks and results are plain dicts of paths and sizes,
+    so they are cheap to send to and from worker processes. The zip file is written under a temporary name
+    and swapped in at the end, so a failed build never leaves a partial zip file behind.
+
+    Entries are written sorted by name with fixed timestamps and permissions, which makes the zip file
+    byte for byte reproducible from the same files and compression settings.
+
+    When the task asks for bytecode, the python files are compiled by the interpreter of the glue runtime and
+    the .pyc files are added, next to their sources or in place of them.
+    """
+    target = Path(task["zipfile"])
+    temp_file = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    compression = task["compression"]
+    level = task["compression_level"] if compression != "stored" else None
+    bytecode = task.get("bytecode")
+    files = task["files"]
+    runtime = {}
+
+    try:
+        with (
+            tempfile.TemporaryDirectory() as bytecode_dir,
+            zipfile.ZipFile(
+                temp_file, mode="w", compression=COMPRESSION_METHODS[compression], compresslevel=level
+            ) as zip_file,
+        ):
+            if bytecode:
+                runtime = compile_bytecode(bytecode["python"], files, Path(bytecode_dir))
+                if not bytecode["sources"]:
+                    files = [f for f in files if not f[1].endswith(".py")]
+                files = files + runtime.pop("files")
+
+            for source, arcname in sorted(files, key=lambda f: f[1]):
+                # raw bytes are copied from disk into the archive, nothing is decoded
+                entry = zip_entry(arcname, compression, level, os.path.getsize(source))
+                with open(source, "rb") as source_file, zip_file.open(entry, mode="w") as zip_entry_file:
+                    shutil.copyfileobj(source_file, zip_entry_file, COPY_BUFFER_SIZE)
+
+            manifest = json.dumps(task["manifest"], indent=4, sort_keys=True)
+            zip_file.writestr(zip_entry(task["manifest_name"], compression), manifest, compresslevel=level)
+        os.replace(temp_file, target)
+    finally:
+        if temp_file.exists():
+            temp_file.unlink()
+
+    return {
+        "name": task["name"],
+        "component_type": task.get("component_type", "superglue_module"),
+        "zipfile": task["zipfile"],
+        "files": len(files),
+        "bytes": target.stat().st_size,
+        "bytecode": runtime.get("version"),
+    }
+
+
+def compare_import_times(task: Dict) -> Dict:
+    """
+    Times importing the module from its zip file against importing it from a zip file of its sources only,
+    both with the interpreter the bytecode was compiled by.
+    """
+    python = task["bytecode"]["python"]
+    try:
+        with tempfile.TemporaryDirectory() as source_dir:
+            source_zipfile = (Path(source_dir) / Path(task["zipfile"]).name).as_posix()
+            build_zipfile(dict(task, zipfile=source_zipfile, bytecode=None))
+            return {
+                "source": import_time(python, source_zipfile, task["name"]),
+                "bytecode": import_time(python, task["zipfile"], task["name"]),
+            }
+    except RuntimeError as e:
+        # modules which only import inside glue, e.g. those using awsglue, cannot be timed locally
+        return {"error": str(e)}
+
+
+def package_module(task: Dict) -> Dict:
+    result = build_zipfile(task)
+    if task.get("bytecode") and task.get("compare_imports"):
+        result["import_times"] = compare_import_times(task)
+    return result
+
+
+class SuperglueModulePackager:
+    """Builds the zip files of many modules at the same time on a pool of worker processes."""
+
+    def __init__(self, workers: Optional[int] = SUPERGLUE_PACKAGE_WORKERS) -> None:
+        self.workers = max(1, workers)
+
+    @staticmethod
+    def failed(task: Dict, error: Exception) -> Dict:
+        return {"name": task["name"], "zipfile": task["zipfile"], "status": "failed", "error": error}
+
+    def run(self, tasks: List[Dict], on_complete: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """
+        Builds every task and returns one result per task, in the order of the tasks. on_complete is called
+        in this process as soon as each module is done.
+        """
+        on_complete = on_complete or (lambda result: None)
+        results: List[Optional[Dict]] = [None] * len(tasks)
+
+        def complete(i: int, result: Dict) -> None:
+            results[i] = result
+            on_complete(result)
+
+        if self.workers == 1 or len(tasks) < 2:
+            # not worth starting processes for
+            for i, task in enumerate(tasks):
+                try:
+                    complete(i, dict(package_module(task), status="packaged"))
+                except Exception as e:
+                    complete(i, self.failed(task, e))
+            return results
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks))) as pool:
+            futures = {pool.submit(package_module, task): i for i, task in enumerate(tasks)}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    complete(i, dict(future.result(), status="packaged"))
+                except Exception as e:
+                    complete(i, self.failed(tasks[i], e))
+        return results
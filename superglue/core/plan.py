@@ -0,0 +1,128 @@
+import json
+import math
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from superglue.environment.variables import (
+    SUPERGLUE_S3_BUCKET,
+    SUPERGLUE_STORAGE_MODE,
+    SUPERGLUE_MULTIPART_THRESHOLD,
+    SUPERGLUE_MULTIPART_CHUNKSIZE,
+)
+
+
+class SuperglueDeployPlan:
+    """
+    Everything a deployment would do, computed from local hashes and the remote state fetched in bulk up front.
+    For every component it lists the files which are uploaded, copied server side or skipped, and for every job
+    whether each of its glue jobs is created, updated or left unchanged. A plan can be saved as json and executed
+    later as it is, provided the locked versions of its components did not change in the meantime.
+    """
+
+    plan_version = 1
+
+    def __init__(
+        self,
+        components: Optional[List[Dict]] = None,
+        bucket: Optional[str] = SUPERGLUE_S3_BUCKET,
+        storage_mode: Optional[str] = SUPERGLUE_STORAGE_MODE,
+        created: Optional[float] = None,
+    ) -> None:
+        self.components = components or []
+        self.bucket = bucket
+        self.storage_mode = storage_mode
+        self.created = created or time.time()
+
+    @classmethod
+    def build(cls, components: Iterable) -> "SuperglueDeployPlan":
+        return cls([component.plan() for component in components])
+
+    @staticmethod
+    def component_key(entry) -> Tuple[str, str]:
+        if isinstance(entry, dict):
+            return entry["component_type"], entry["component_name"]
+        return entry.component_type, entry.component_name
+
+    @staticmethod
+    def transfer_calls(size: int) -> int:
+        """requests needed to upload or copy one object, large objects are transferred in parts"""
+        if size < SUPERGLUE_MULTIPART_THRESHOLD:
+            return 1
+        return 2 + math.ceil(size / SUPERGLUE_MULTIPART_CHUNKSIZE)
+
+    @classmethod
+    def component_summary(cls, entry: Dict) -> Dict:
+        summary = {"upload_files": 0, "upload_bytes": 0, "copy_files": 0, "copy_bytes": 0, "skip_files": 0}
+        for action in entry["files"]:
+            summary[f"{action['action']}_files"] += 1
+            if action["action"] != "skip":
+                summary[f"{action['action']}_bytes"] += action["bytes"]
+
+        for action in ["create", "update", "unchanged"]:
+            summary[f"glue_{action}"] = len([g for g in entry.get("glue_jobs", []) if g["action"] == action])
+        return summary
+
+    def api_calls(self) -> Dict[str, int]:
+        """an estimate of the requests executing the plan takes, reads done while planning are not included"""
+        calls = {"s3": 0, "glue": 0}
+
+        for entry in self.components:
+            calls["s3"] += sum(self.transfer_calls(a["bytes"]) for a in entry["files"] if a["action"] != "skip")
+            if self.storage_mode == "content":
+                # the files manifest of the version
+                calls["s3"] += 1
+
+            for glue_job in entry.get("glue_jobs", []):
+                calls["glue"] += 0 if glue_job["action"] == "unchanged" else 1
+                calls["glue"] += bool(glue_job["tags_to_add"]) + bool(glue_job["tags_to_remove"])
+
+        if self.components:
+            # the project manifest is written once at the end
+            calls["s3"] += 3
+        calls["total"] = calls["s3"] + calls["glue"]
+        return calls
+
+    def entry(self, component) -> Optional[Dict]:
+        key = self.component_key(component)
+        for entry in self.components:
+            if self.component_key(entry) == key:
+                return entry
+        return None
+
+    def stale(self, components: Iterable) -> List[str]:
+        """names of the planned components whose local state no longer matches the plan"""
+        components = {self.component_key(c): c for c in components}
+        stale = []
+
+        for entry in self.components:
+            component = components.get(self.component_key(entry))
+            if (
+                component is None
+                or component.version_number != entry["version_number"]
+                or component.version_digest != entry["version_digest"]
+            ):
+                stale.append(entry["component_name"])
+        return stale
+
+    def to_dict(self) -> Dict:
+        components = [dict(entry, summary=self.component_summary(entry)) for entry in self.components]
+        return {
+            "plan_version": self.plan_version,
+            "created": self.created,
+            "bucket": self.bucket,
+            "storage_mode": self.storage_mode,
+            "api_calls": self.api_calls(),
+            "components": components,
+        }
+
+    def save(self, path: Path) -> None:
+        path.write_text(json.dumps(self.to_dict(), indent=4))
+
+    @classmethod
+    def load(cls, path: Path) -> "SuperglueDeployPlan":
+        content = json.loads(path.read_text())
+        if content.get("plan_version") != cls.plan_version:
+            raise ValueError(f"{path} was written by an incompatible version of superglue")
+
+        components = [{k: v for k, v in entry.items() if k != "summary"} for entry in content["components"]]
+        return cls(components, content["bucket"], content["storage_mode"], content["created"])
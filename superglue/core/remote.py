@@ -0,0 +1,87 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from superglue.core.aws import get_client
+from superglue.environment.variables import SUPERGLUE_REMOTE_WORKERS, SUPERGLUE_S3_PREFIX
+
+
+def s3_prefix_root() -> str:
+    if SUPERGLUE_S3_PREFIX:
+        return f"{SUPERGLUE_S3_PREFIX}/superglue"
+    return "superglue"
+
+
+def list_common_prefixes(bucket: str, prefix: str) -> List[str]:
+    """
+    Lists the "directories" directly below a prefix. Every page of the listing is followed,
+    so prefixes with more than 1000 entries are read completely.
+    """
+    s3_client = get_client("s3")
+    paginator = s3_client.get_paginator("list_objects_v2")
+    common_prefixes = []
+
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter="/"):
+        for common_prefix in page.get("CommonPrefixes", []):
+            common_prefixes.append(common_prefix["Prefix"])
+    return common_prefixes
+
+
+def list_version_numbers(bucket: str, component_prefix: str) -> List[int]:
+    version_numbers = []
+    for prefix in list_common_prefixes(bucket, f"{component_prefix}/"):
+        match = re.search(SuperglueRemoteIndex.version_prefix_pattern, prefix)
+        if match:
+            version_numbers.append(int(match.group(1)))
+    return sorted(version_numbers)
+
+
+class SuperglueRemoteIndex:
+    """
+    In memory index of the versions of every superglue component stored in S3.
+
+    Components of one type are discovered with a single delimited listing of the type prefix, then the
+    version=N folders of each component found remotely are listed concurrently. Only folder names are read,
+    so the cost of building the index does not grow with the number of files in each version.
+    """
+
+    version_prefix_pattern = r"/version=([0-9]+)/$"
+
+    def __init__(self, max_workers: Optional[int] = SUPERGLUE_REMOTE_WORKERS) -> None:
+        self.max_workers = max(1, max_workers)
+        self.versions: Dict[Tuple[str, str], List[int]] = {}
+
+    @staticmethod
+    def component_key(component) -> Tuple[str, str]:
+        return component.component_type, component.component_name
+
+    def discover(self, bucket: str, type_prefix: str) -> Set[str]:
+        return {
+            prefix[len(type_prefix) + 1 :].rstrip("/") for prefix in list_common_prefixes(bucket, f"{type_prefix}/")
+        }
+
+    def build(self, components: Iterable) -> "SuperglueRemoteIndex":
+        components = list(components)
+        remote_names: Dict[Tuple[str, str], Set[str]] = {}
+
+        for component in components:
+            location = component.bucket, component.s3_type_prefix
+            if location not in remote_names:
+                remote_names[location] = self.discover(*location)
+
+        remote_components = [c for c in components if c.component_name in remote_names[(c.bucket, c.s3_type_prefix)]]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = pool.map(lambda c: list_version_numbers(c.bucket, c.s3_filter), remote_components)
+
+            for component, version_numbers in zip(remote_components, results):
+                self.versions[self.component_key(component)] = version_numbers
+
+        for component in components:
+            self.versions.setdefault(self.component_key(component), [])
+        return self
+
+    def available_versions(self, component) -> List[int]:
+        return self.versions.get(self.component_key(component), [])
+
+    def latest_version(self, component) -> int:
+        return max(self.available_versions(component), default=0)
@@ -0,0 +1,214 @@
+import time
+import random
+import threading
+from typing import Dict, Optional
+from superglue.environment.variables import SUPERGLUE_RATE_LIMITS, SUPERGLUE_RETRY_BUDGET
+
+# requests per second superglue starts out with, the AWS defaults for an account are a little higher
+DEFAULT_RATE_LIMITS = {"glue": 20.0, "resourcegroupstaggingapi": 10.0, "sts": 10.0, "s3": 1000.0}
+
+THROTTLING_ERROR_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestThrottled",
+    "RequestThrottledException",
+    "RequestLimitExceeded",
+    "TooManyRequestsException",
+    "SlowDown",
+}
+
+TRANSIENT_ERROR_CODES = {"ConcurrentModificationException", "RequestTimeout", "InternalError", "InternalFailure"}
+TRANSIENT_STATUS_CODES = {500, 502, 503, 504}
+
+
+def parse_rate_limits(value: str) -> Dict[str, float]:
+    """parses "glue=20,glue.UpdateJob=5" into a dict of requests per second"""
+    limits = {}
+    for item in filter(None, [i.strip() for i in value.split(",")]):
+        try:
+            api, rate = item.split("=")
+            limits[api.strip()] = float(rate)
+        except ValueError:
+            raise ValueError(f"Invalid rate limit {item}, expected <service>[.<Operation>]=<requests per second>")
+    return limits
+
+
+class TokenBucket:
+    """
+    Hands out one token per request at a rate which adapts to throttling. The rate is halved when a request is
+    throttled, at most once per second, and climbs back towards the configured rate with every successful request.
+    """
+
+    def __init__(self, rate: float, min_rate: Optional[float] = 0.5) -> None:
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.timestamp = time.monotonic()
+        self.last_throttle = 0.0
+        self._lock = threading.Lock()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.timestamp) * self.rate)
+        self.timestamp = now
+
+    def acquire(self) -> float:
+        # tokens may go negative, which queues callers in the order they arrived
+        with self._lock:
+            self.refill(time.monotonic())
+            self.tokens -= 1
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def throttled(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if now - self.last_throttle < 1.0:
+                return
+
+            self.refill(now)
+            self.last_throttle = now
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+
+    def succeeded(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class RetryBudget:
+    """retries draw from a shared budget, so a struggling service is not hammered with retries from every thread"""
+
+    retry_cost = 5
+    success_refund = 1
+
+    def __init__(self, capacity: Optional[int] = SUPERGLUE_RETRY_BUDGET) -> None:
+        self.capacity = capacity
+        self.available = capacity
+        self._lock = threading.Lock()
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.available < self.retry_cost:
+                return False
+            self.available -= self.retry_cost
+            return True
+
+    def deposit(self) -> None:
+        with self._lock:
+            self.available = min(self.capacity, self.available + self.success_refund)
+
+
+class SuperglueRateLimiter:
+    """
+    Rate limits and retries the requests of every AWS client superglue creates. It hooks into the botocore events
+    of a client, so the calls made by S3 paginators and transfers are covered as well as direct API calls.
+    Retries back off exponentially with full jitter and are paid for from a shared retry budget.
+    """
+
+    base_delay = 0.5
+    max_delay = 20.0
+
+    def __init__(
+        self,
+        rate_limits: Optional[Dict[str, float]] = None,
+        max_attempts: Optional[int] = 5,
+        budget: Optional[RetryBudget] = None,
+    ) -> None:
+        limits = dict(DEFAULT_RATE_LIMITS, **parse_rate_limits(SUPERGLUE_RATE_LIMITS))
+        limits.update(rate_limits or {})
+
+        self.buckets = {api: TokenBucket(rate) for api, rate in limits.items() if rate > 0}
+        self.max_attempts = max_attempts
+        self.budget = budget or RetryBudget()
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, service: str, operation: str) -> Optional[TokenBucket]:
+        return self.buckets.get(f"{service}.{operation}") or self.buckets.get(service)
+
+    def count(self, service: str, stat: str) -> None:
+        with self._lock:
+            stats = self.stats.setdefault(service, {"requests": 0, "retries": 0, "throttles": 0})
+            stats[stat] += 1
+
+    @property
+    def totals(self) -> Dict[str, int]:
+        totals = {"requests": 0, "retries": 0, "throttles": 0}
+        with self._lock:
+            for stats in self.stats.values():
+                for stat, value in stats.items():
+                    totals[stat] += value
+        return totals
+
+    @staticmethod
+    def operation_name(event_name: str) -> str:
+        return event_name.split(".")[-1]
+
+    @staticmethod
+    def classify(response, caught_exception) -> Optional[str]:
+        """returns "throttle" or "transient" for errors worth retrying, None otherwise"""
+        if caught_exception is not None:
+            return "transient"
+
+        if response is None:
+            return None
+
+        http_response, parsed = response
+        code = (parsed or {}).get("Error", {}).get("Code")
+
+        if code in THROTTLING_ERROR_CODES or http_response.status_code == 429:
+            return "throttle"
+        if code in TRANSIENT_ERROR_CODES or http_response.status_code in TRANSIENT_STATUS_CODES:
+            return "transient"
+        return None
+
+    def delay(self, attempts: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempts - 1)))
+
+    def before_send(self, service: str, event_name: str, **kwargs) -> None:
+        bucket = self.bucket(service, self.operation_name(event_name))
+        if bucket:
+            bucket.acquire()
+        self.count(service, "requests")
+
+    def after_call(self, service: str, event_name: str, http_response, **kwargs) -> None:
+        if http_response.status_code < 300:
+            bucket = self.bucket(service, self.operation_name(event_name))
+            if bucket:
+                bucket.succeeded()
+            self.budget.deposit()
+
+    def needs_retry(
+        self, service: str, event_name: str, attempts: int, response=None, caught_exception=None, **kwargs
+    ) -> Optional[float]:
+        reason = self.classify(response, caught_exception)
+        if reason is None:
+            return None
+
+        if reason == "throttle":
+            self.count(service, "throttles")
+            bucket = self.bucket(service, self.operation_name(event_name))
+            if bucket:
+                bucket.throttled()
+
+        if attempts >= self.max_attempts or not self.budget.withdraw():
+            return None
+
+        self.count(service, "retries")
+        return self.delay(attempts)
+
+    def register(self, client, service: str, retries: Optional[bool] = True) -> None:
+        events = client.meta.events
+        service_id = client.meta.service_model.service_id.hyphenize()
+
+        events.register(f"before-send.{service_id}", lambda **kwargs: self.before_send(service, **kwargs))
+        events.register(f"after-call.{service_id}", lambda **kwargs: self.after_call(service, **kwargs))
+
+        if retries:
+            events.register(f"needs-retry.{service_id}", lambda **kwargs: self.needs_retry(service, **kwargs))
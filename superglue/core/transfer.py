@@ -0,0 +1,66 @@
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from boto3.s3.transfer import TransferConfig, create_transfer_manager
+from typing import Any, Callable, Iterable, List, Optional, TypeVar
+from superglue.core.aws import get_client
+from superglue.environment.variables import (
+    SUPERGLUE_MAX_CONCURRENCY,
+    SUPERGLUE_MULTIPART_THRESHOLD,
+    SUPERGLUE_MULTIPART_CHUNKSIZE,
+)
+
+SuperglueUploadSchedulerType = TypeVar("SuperglueUploadSchedulerType", bound="SuperglueUploadScheduler")
+
+
+class SuperglueUploadScheduler:
+    """
+    Moves files to S3 for a whole command. One thread pool and one transfer manager on top of the shared S3 client are
+    used by every component, so the number of requests in flight is bounded by max_concurrency across the whole
+    deployment. Large files are sent as multipart uploads with their parts transferred concurrently.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = SUPERGLUE_MAX_CONCURRENCY,
+        multipart_threshold: Optional[int] = SUPERGLUE_MULTIPART_THRESHOLD,
+        multipart_chunksize: Optional[int] = SUPERGLUE_MULTIPART_CHUNKSIZE,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+
+        self.s3_client = get_client("s3")
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            max_concurrency=self.max_concurrency,
+            use_threads=True,
+        )
+        self.transfer_manager = create_transfer_manager(self.s3_client, self.transfer_config)
+        self.pool = ThreadPoolExecutor(max_workers=self.max_concurrency)
+
+    def __enter__(self) -> SuperglueUploadSchedulerType:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def upload_file(self, path: Path, bucket: str, key: str) -> None:
+        self.transfer_manager.upload(path.as_posix(), bucket, key).result()
+
+    def copy_object(self, bucket: str, source_key: str, key: str) -> None:
+        self.transfer_manager.copy({"Bucket": bucket, "Key": source_key}, bucket, key).result()
+
+    def map(self, func: Callable, items: Iterable) -> List[Any]:
+        """
+        Runs func for every item on the shared pool and waits for all of them.
+        The first error raised by any of the calls is re-raised once they have all finished.
+        """
+        futures = [self.pool.submit(func, item) for item in items]
+        errors = [f.exception() for f in futures if f.exception() is not None]
+
+        if errors:
+            raise errors[0]
+        return [f.result() for f in futures]
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True)
+        self.transfer_manager.shutdown()
@@ -0,0 +1,132 @@
+import os
+import sys
+import json
+import shutil
+import subprocess
+from hashlib import sha256
+from pathlib import Path
+from typing import Dict, List, Optional
+from superglue.environment.config import VENDOR_CACHE_PATH
+from superglue.environment.variables import (
+    SUPERGLUE_WHEELHOUSE,
+    SUPERGLUE_VENDOR_PYTHON_VERSION,
+    SUPERGLUE_VENDOR_PLATFORMS,
+)
+
+# parts of an installed package tree which are never vendored, console scripts cannot run from a zip file
+VENDOR_FILTERS = ["__pycache__", ".pyc"]
+VENDOR_TOP_LEVEL_FILTERS = ["bin"]
+
+# zipimport only loads python source and bytecode, so only wheels tagged for any platform can be vendored
+PURE_WHEEL_TAGS = {"none-any"}
+
+
+class SuperglueVendorCache:
+    """
+    Installs the third party requirements of modules and jobs from local wheelhouse directories, for the python
+    version and platform of the glue runtime, and keeps every installed tree on disk. Trees are keyed by a hash
+    of the requirements, the target runtime and the wheels available, so building the same requirements again
+    costs nothing but a directory listing. pip is always run with --no-index and never uses the network.
+    """
+
+    cache_version = 1
+
+    def __init__(
+        self,
+        cache_path: Path = VENDOR_CACHE_PATH,
+        wheelhouse: Optional[str] = SUPERGLUE_WHEELHOUSE,
+        python_version: Optional[str] = SUPERGLUE_VENDOR_PYTHON_VERSION,
+        platforms: Optional[str] = SUPERGLUE_VENDOR_PLATFORMS,
+    ) -> None:
+        self.cache_path = cache_path
+        self.wheelhouses = [Path(w.strip()) for w in wheelhouse.split(",") if w.strip()]
+        self.python_version = python_version
+        self.platforms = [p.strip() for p in platforms.split(",") if p.strip()]
+
+    def wheels(self) -> List[List]:
+        wheels = []
+        for wheelhouse in self.wheelhouses:
+            if wheelhouse.is_dir():
+                wheels.extend([w.name, w.stat().st_size] for w in wheelhouse.iterdir() if w.is_file())
+        return sorted(wheels)
+
+    def key(self, requirements: List[str]) -> str:
+        key = {
+            "cache_version": self.cache_version,
+            "requirements": sorted(r.strip() for r in requirements),
+            "python_version": self.python_version,
+            "platforms": self.platforms,
+            "wheels": self.wheels(),
+        }
+        return sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def pip_command(self, requirements: List[str], target: Path) -> List[str]:
+        command = [sys.executable, "-m", "pip", "install", "--no-index", "--no-compile", "--quiet"]
+        command.append("--disable-pip-version-check")
+        for wheelhouse in self.wheelhouses:
+            command.extend(["--find-links", wheelhouse.as_posix()])
+        for platform in self.platforms:
+            command.extend(["--platform", platform])
+        command.extend(["--python-version", self.python_version, "--only-binary=:all:"])
+        return command + ["--target", target.as_posix(), *requirements]
+
+    def install(self, requirements: List[str], key: Optional[str] = None) -> Path:
+        """the installed tree of the requirements, installed into the cache first when it is not there yet"""
+        path = self.cache_path / (key or self.key(requirements))
+        if path.is_dir():
+            return path
+
+        # install next to the cache entry and swap it in, so a failed or concurrent install never leaves half a tree
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        self.cache_path.mkdir(parents=True, exist_ok=True)
+        try:
+            process = subprocess.run(self.pip_command(requirements, temp_path), capture_output=True, text=True)
+            if process.returncode != 0:
+                lines = process.stderr.strip().splitlines() or ["no output"]
+                raise RuntimeError(f"Installing {', '.join(requirements)} from the wheelhouse failed :: {lines[-1]}")
+            self.check_pure(temp_path)
+            try:
+                os.replace(temp_path, path)
+            except OSError:
+                # another process installed the same requirements first
+                if not path.is_dir():
+                    raise
+        finally:
+            if temp_path.exists():
+                shutil.rmtree(temp_path)
+        return path
+
+    @staticmethod
+    def check_pure(path: Path) -> None:
+        """raises when an installed tree holds a wheel with compiled extensions, which zipimport cannot load"""
+        for wheel in sorted(path.glob("*.dist-info/WHEEL")):
+            lines = wheel.read_text().splitlines()
+            tags = [line.split(":", 1)[1].strip() for line in lines if line.startswith("Tag:")]
+            purelib = "Root-Is-Purelib: true" in lines
+            if not purelib or any(tag.split("-", 1)[-1] not in PURE_WHEEL_TAGS for tag in tags):
+                name = wheel.parent.name[: -len(".dist-info")]
+                raise RuntimeError(
+                    f"{name} is not a pure python wheel ({', '.join(tags)}) and cannot be imported from a zip file, "
+                    "install it with --additional-python-modules instead"
+                )
+
+    def files(self, requirements: List[str]) -> Dict[str, Dict]:
+        """
+        every vendored file of the requirements by its name at the root of a zip file. Installed trees never
+        change, so the key of the tree stands in for the digest of each of its files.
+        """
+        if not requirements:
+            return {}
+
+        key = self.key(requirements)
+        path = self.install(requirements, key)
+        files = {}
+        for file in sorted(path.glob("**/*")):
+            arcname = file.relative_to(path).as_posix()
+            parts = file.relative_to(path).parts
+            filtered = parts[0] in VENDOR_TOP_LEVEL_FILTERS or any(
+                f in parts or file.name.endswith(f) for f in VENDOR_FILTERS
+            )
+            if file.is_file() and not filtered:
+                files[arcname] = {"path": file, "digest": f"vendor:{key}"}
+        return files
@@ -7,3 +7,11 @@ MODULES_PATH = SUPERGLUE_CWD / "modules"
 NOTEBOOKS_PATH = SUPERGLUE_CWD / "notebooks"
 TOOLS_PATH = SUPERGLUE_CWD / "tools"
 TESTS_PATH = SUPERGLUE_CWD / "tests"
+
+# local state superglue keeps between invocations. Safe to delete at any time.
+SUPERGLUE_STATE_PATH = SUPERGLUE_CWD / ".superglue"
+CACHE_PATH = SUPERGLUE_STATE_PATH / "cache"
+HASH_CACHE_FILE = CACHE_PATH / "hashes"
+IDENTITY_CACHE_FILE = CACHE_PATH / "identity"
+DEPLOY_JOURNAL_FILE = SUPERGLUE_STATE_PATH / "deploy.journal"
+VENDOR_CACHE_PATH = CACHE_PATH / "vendor"
@@ -26,6 +26,65 @@ try:
 except ValueError:
     SUPERGLUE_AWS_ACCOUNT = None
 
+# tuning for hashing component files
+SUPERGLUE_HASH_BUFFER_SIZE = int(os.getenv("SUPERGLUE_HASH_BUFFER_SIZE", 1024 * 1024))
+SUPERGLUE_HASH_WORKERS = int(os.getenv("SUPERGLUE_HASH_WORKERS", min(32, (os.cpu_count() or 1) + 4)))
+
+# number of processes building module zip files at the same time
+SUPERGLUE_PACKAGE_WORKERS = int(os.getenv("SUPERGLUE_PACKAGE_WORKERS", os.cpu_count() or 1))
+
+# how module zip files are compressed, "stored" or "deflated" (the methods python can import from)
+SUPERGLUE_ZIP_COMPRESSION = os.getenv("SUPERGLUE_ZIP_COMPRESSION", "deflated")
+SUPERGLUE_ZIP_COMPRESSION_LEVEL = int(os.getenv("SUPERGLUE_ZIP_COMPRESSION_LEVEL", 9))
+
+# precompiled bytecode in module zip files, "off", "with-sources" or "only", compiled by the python of the glue runtime
+SUPERGLUE_BYTECODE = os.getenv("SUPERGLUE_BYTECODE", "off")
+SUPERGLUE_BYTECODE_PYTHON = os.getenv("SUPERGLUE_BYTECODE_PYTHON", "python3.10")
+
+# third party requirements of modules and jobs are installed from wheels in these directories, comma separated,
+# for the python version and platforms of the glue runtime. pip never goes to the network for them.
+SUPERGLUE_WHEELHOUSE = os.getenv("SUPERGLUE_WHEELHOUSE", "wheelhouse")
+SUPERGLUE_VENDOR_PYTHON_VERSION = os.getenv("SUPERGLUE_VENDOR_PYTHON_VERSION", "3.10")
+SUPERGLUE_VENDOR_PLATFORMS = os.getenv("SUPERGLUE_VENDOR_PLATFORMS", "manylinux2014_x86_64")
+
+# number of concurrent requests used when reading the state of many components from S3
+SUPERGLUE_REMOTE_WORKERS = int(os.getenv("SUPERGLUE_REMOTE_WORKERS", 16))
+
+# limits for transferring files to S3 during a deployment
+SUPERGLUE_MAX_CONCURRENCY = int(os.getenv("SUPERGLUE_MAX_CONCURRENCY", 10))
+SUPERGLUE_MULTIPART_THRESHOLD = int(os.getenv("SUPERGLUE_MULTIPART_THRESHOLD", 8 * 1024 * 1024))
+SUPERGLUE_MULTIPART_CHUNKSIZE = int(os.getenv("SUPERGLUE_MULTIPART_CHUNKSIZE", 8 * 1024 * 1024))
+
+# how many components are deployed at the same time. jobs still wait for the modules they use.
+SUPERGLUE_DEPLOY_PARALLELISM = int(os.getenv("SUPERGLUE_DEPLOY_PARALLELISM", 8))
+
+# settings shared by every AWS client superglue creates.
+# the endpoint urls allow pointing superglue at local stand-ins for S3, Glue and STS.
+SUPERGLUE_AWS_MAX_POOL_CONNECTIONS = int(
+    os.getenv("SUPERGLUE_AWS_MAX_POOL_CONNECTIONS", max(10, SUPERGLUE_MAX_CONCURRENCY))
+)
+SUPERGLUE_AWS_RETRY_MODE = os.getenv("SUPERGLUE_AWS_RETRY_MODE", "superglue")
+SUPERGLUE_AWS_MAX_ATTEMPTS = int(os.getenv("SUPERGLUE_AWS_MAX_ATTEMPTS", 5))
+SUPERGLUE_AWS_CONNECT_TIMEOUT = float(os.getenv("SUPERGLUE_AWS_CONNECT_TIMEOUT", 10))
+SUPERGLUE_AWS_READ_TIMEOUT = float(os.getenv("SUPERGLUE_AWS_READ_TIMEOUT", 60))
+SUPERGLUE_AWS_ENDPOINT_URL = os.getenv("SUPERGLUE_AWS_ENDPOINT_URL")
+SUPERGLUE_S3_ENDPOINT_URL = os.getenv("SUPERGLUE_S3_ENDPOINT_URL")
+SUPERGLUE_GLUE_ENDPOINT_URL = os.getenv("SUPERGLUE_GLUE_ENDPOINT_URL")
+SUPERGLUE_STS_ENDPOINT_URL = os.getenv("SUPERGLUE_STS_ENDPOINT_URL")
+
+# client side request rates per AWS api, as requests per second. e.g. "glue=20,glue.UpdateJob=5,s3=500".
+# limits of an operation take precedence over the limit of its service, services without a limit are not limited.
+SUPERGLUE_RATE_LIMITS = os.getenv("SUPERGLUE_RATE_LIMITS", "")
+# how many retries a command may spend in total, a retry costs 5 and every successful request earns 1 back
+SUPERGLUE_RETRY_BUDGET = int(os.getenv("SUPERGLUE_RETRY_BUDGET", 500))
+
+# how deployed files are laid out in S3. "versioned" keeps a full copy of every file under each version=N prefix,
+# "content" stores every distinct file once under superglue/blobs and writes a small manifest per version.
+SUPERGLUE_STORAGE_MODE = os.getenv("SUPERGLUE_STORAGE_MODE", "versioned")
+
+# seconds the account resolved for a set of credentials is reused for, 0 always asks STS
+SUPERGLUE_IDENTITY_CACHE_TTL = int(os.getenv("SUPERGLUE_IDENTITY_CACHE_TTL", 900))
+
 # keep this as we may want logging
 SUPERGLUE_LOGGER_DIR = Path(os.getenv("SUPERGLUE_LOGGER_FILE", "./logs"))
 
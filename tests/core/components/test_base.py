@@ -1,7 +1,11 @@
+import json
 import pytest
+import botocore
 from pathlib import Path
+from unittest.mock import patch, MagicMock
 from jinja2 import Environment, PackageLoader
 from superglue.core.components.base import BaseSuperglueComponent, SuperglueComponent
+from superglue.core.journal import SuperglueDeployJournal
 
 
 class _BaseSuperglueComponent(BaseSuperglueComponent):
@@ -151,3 +155,200 @@ def test_superglue_component_s3_prefix(superglue_component: SuperglueComponent)
 def test_superglue_component_s3_version_path(superglue_component: SuperglueComponent) -> None:
     version_path = "superglue/eggs/spam/version=0/spam/.version"
     assert superglue_component.s3_version_path == version_path
+
+
+def test_superglue_component_get_version_hashes_memoized() -> None:
+    component = _SuperglueComponent(root_dir=Path.cwd(), component_type="eggs", component_name="spam")
+
+    with patch.object(_SuperglueComponent, "version_file_paths", return_value=[]) as version_file_paths:
+        assert component.get_version_hashes() == {}
+        assert component.get_version_hashes() == {}
+        version_file_paths.assert_called_once()
+
+
+def test_superglue_component_fetch_s3_version_memoized() -> None:
+    component = _SuperglueComponent(root_dir=Path.cwd(), component_type="eggs", component_name="spam")
+
+    with patch.object(_SuperglueComponent, "download_s3_version", return_value={"a": "b"}) as download_s3_version:
+        assert component.fetch_s3_version() == {"a": "b"}
+        assert component.fetch_s3_version() == {"a": "b"}
+        download_s3_version.assert_called_once()
+
+        component.invalidate_remote()
+        component.fetch_s3_version()
+        assert download_s3_version.call_count == 2
+
+
+@pytest.mark.parametrize("code", ["404", "403"])
+def test_superglue_component_download_missing_s3_version(code: str) -> None:
+    component = _SuperglueComponent(root_dir=Path.cwd(), component_type="eggs", component_name="spam")
+    response = {"Error": {"Code": code}, "ResponseMetadata": {"MaxAttemptsReached": True, "RetryAttempts": 0}}
+    error = botocore.exceptions.ClientError(response, "HeadObject")
+    assert "(reached max retries: 0)" in str(error)
+
+    with patch("superglue.core.components.base.get_client") as get_client:
+        get_client.return_value.download_fileobj.side_effect = error
+        assert component.download_s3_version(0) == {}
+
+        get_client.return_value.download_fileobj.side_effect = botocore.exceptions.ClientError(
+            {"Error": {"Code": "500"}, "ResponseMetadata": {"MaxAttemptsReached": True}}, "HeadObject"
+        )
+        with pytest.raises(botocore.exceptions.ClientError):
+            component.download_s3_version(0)
+
+
+def test_superglue_component_save_version_file_updates_state(tmp_path: Path) -> None:
+    component = _SuperglueComponent(root_dir=tmp_path, component_type="eggs", component_name="spam")
+    component.component_path.mkdir()
+    component.remote_version = {"version_number": 1}
+    component.version_hashes = {"spam/main.py": "abc"}
+
+    component.save_version_file(version_number=3)
+
+    assert component.version_number == 3
+    assert component.version == {"spam/main.py": "abc"}
+    assert component.remote_version is None
+    assert json.loads(component.version_file.read_text()) == {"spam/main.py": "abc", "version_number": 3}
+
+
+@pytest.fixture()
+def synced_component(tmp_path: Path) -> SuperglueComponent:
+    component = _SuperglueComponent(
+        root_dir=tmp_path, component_type="eggs", component_name="spam", bucket="spam-eggs-sausage-and-spam"
+    )
+    component.component_path.mkdir()
+    (component.component_path / "main.py").write_text("print('spam')")
+    (component.component_path / "big.jar").write_bytes(b"0" * 100)
+    component.version_hashes = {"spam/main.py": "new-main", "spam/big.jar": "jar"}
+    component.save_version_file(version_number=2)
+    # every remote version was deployed in versioned mode, none has a files manifest
+    component.remote_files = {0: {}, 1: {}, 2: {}}
+    return component
+
+
+def test_superglue_component_plan_sync_copies_unchanged(synced_component: SuperglueComponent) -> None:
+    previous = {"spam/main.py": "old-main", "spam/big.jar": "jar", "version_number": 1}
+
+    with patch.object(_SuperglueComponent, "fetch_s3_version_number", return_value=1):
+        with patch.object(_SuperglueComponent, "download_s3_version", return_value=previous) as download:
+            actions = {a["path"]: a for a in synced_component.plan_sync()}
+            download.assert_called_once_with(1)
+
+    assert actions["spam/main.py"]["action"] == "upload"
+    assert actions["spam/.version"]["action"] == "upload"
+    assert actions["spam/big.jar"]["action"] == "copy"
+    assert actions["spam/big.jar"]["source_key"] == "superglue/eggs/spam/version=1/spam/big.jar"
+    assert actions["spam/big.jar"]["key"] == "superglue/eggs/spam/version=2/spam/big.jar"
+    assert actions["spam/big.jar"]["bytes"] == 100
+
+
+def test_superglue_component_plan_sync_skips_same_version(synced_component: SuperglueComponent) -> None:
+    previous = {"spam/main.py": "old-main", "spam/big.jar": "jar", "version_number": 2}
+
+    with patch.object(_SuperglueComponent, "fetch_s3_version_number", return_value=2):
+        with patch.object(_SuperglueComponent, "download_s3_version", return_value=previous):
+            actions = {a["path"]: a["action"] for a in synced_component.plan_sync()}
+
+    assert actions == {"spam/main.py": "upload", "spam/big.jar": "skip", "spam/.version": "upload"}
+
+
+def test_superglue_component_plan_sync_copies_from_content_addressed_version(
+    synced_component: SuperglueComponent,
+) -> None:
+    previous = {"spam/main.py": "old-main", "spam/big.jar": "jar", "version_number": 1}
+    synced_component.remote_files = {1: {"spam/big.jar": "superglue/blobs/jar/big.jar", "spam/main.py": "x"}}
+
+    with patch.object(_SuperglueComponent, "fetch_s3_version_number", return_value=1):
+        with patch.object(_SuperglueComponent, "download_s3_version", return_value=previous):
+            actions = {a["path"]: a for a in synced_component.plan_sync()}
+
+    assert actions["spam/main.py"]["action"] == "upload"
+    assert actions["spam/big.jar"]["action"] == "copy"
+    assert actions["spam/big.jar"]["source_key"] == "superglue/blobs/jar/big.jar"
+    assert actions["spam/big.jar"]["key"] == "superglue/eggs/spam/version=2/spam/big.jar"
+
+    # redeploying a version deployed in content mode copies its files out of the blobs as well
+    synced_component.remote_files = {2: {"spam/big.jar": "superglue/blobs/jar/big.jar"}}
+    with patch.object(_SuperglueComponent, "fetch_s3_version_number", return_value=2):
+        with patch.object(_SuperglueComponent, "download_s3_version", return_value=dict(previous, version_number=2)):
+            actions = {a["path"]: a["action"] for a in synced_component.plan_sync()}
+
+    assert actions == {"spam/main.py": "upload", "spam/big.jar": "copy", "spam/.version": "upload"}
+
+
+def test_superglue_component_sync_uploads_version_last(synced_component: SuperglueComponent) -> None:
+    scheduler = MagicMock()
+    scheduler.map.side_effect = lambda func, items: [func(item) for item in items]
+
+    with patch.object(_SuperglueComponent, "fetch_s3_version_number", return_value=0):
+        with patch.object(_SuperglueComponent, "download_s3_version", return_value={}):
+            synced_component.sync(scheduler)
+
+    uploaded = [c.args[2] for c in scheduler.upload_file.call_args_list]
+    assert len(uploaded) == 3
+    assert uploaded[-1] == "superglue/eggs/spam/version=2/spam/.version"
+    assert synced_component.sync_stats["uploaded_files"] == 3
+    assert synced_component.sync_stats["copied_files"] == 0
+
+
+def test_superglue_component_s3_object_path(synced_component: SuperglueComponent) -> None:
+    path = synced_component.component_path / "big.jar"
+    assert synced_component.s3_object_path(path) == f"{synced_component.s3_path}/big.jar"
+
+    synced_component.storage_mode = "content"
+    assert synced_component.s3_object_path(path) == "s3://spam-eggs-sausage-and-spam/superglue/blobs/jar/big.jar"
+
+
+def test_superglue_component_plan_content_sync(synced_component: SuperglueComponent) -> None:
+    synced_component.storage_mode = "content"
+    known = {"spam/big.jar": "superglue/blobs/jar/big.jar"}
+
+    with patch.object(_SuperglueComponent, "fetch_s3_version_number", return_value=1):
+        with patch.object(_SuperglueComponent, "fetch_files_manifest", return_value=known) as fetch_files_manifest:
+            with patch.object(_SuperglueComponent, "blob_exists", return_value=False) as blob_exists:
+                actions = {a["path"]: a for a in synced_component.plan_sync()}
+
+    fetch_files_manifest.assert_called_once_with(1)
+    blob_exists.assert_called_once_with("superglue/blobs/new-main/main.py")
+
+    assert actions["spam/big.jar"]["action"] == "skip"
+    assert actions["spam/main.py"]["action"] == "upload"
+    assert actions["spam/main.py"]["key"] == "superglue/blobs/new-main/main.py"
+    assert actions["spam/.version"]["key"] == "superglue/eggs/spam/version=2/spam/.version"
+    assert "digest" not in actions["spam/.version"]
+
+
+def test_superglue_component_upload_files_manifest(synced_component: SuperglueComponent) -> None:
+    actions = [
+        {"path": "spam/main.py", "key": "superglue/blobs/new-main/main.py", "digest": "new-main"},
+        {"path": "spam/.version", "key": "superglue/eggs/spam/version=2/spam/.version"},
+    ]
+
+    with patch("superglue.core.components.base.get_client") as get_client:
+        synced_component.upload_files_manifest(actions)
+
+    kwargs = get_client.return_value.put_object.call_args.kwargs
+    assert kwargs["Key"] == "superglue/eggs/spam/version=2/manifest.json"
+    assert json.loads(kwargs["Body"]) == {"files": {"spam/main.py": "superglue/blobs/new-main/main.py"}}
+
+
+def test_superglue_component_sync_resumes_from_journal(synced_component: SuperglueComponent, tmp_path: Path) -> None:
+    scheduler = MagicMock()
+    scheduler.map.side_effect = lambda func, items: [func(item) for item in items]
+    synced_component.journal = SuperglueDeployJournal(tmp_path / "deploy.journal").start()
+
+    with patch.object(_SuperglueComponent, "fetch_s3_version_number", return_value=0):
+        with patch.object(_SuperglueComponent, "download_s3_version", return_value={}):
+            synced_component.sync(scheduler)
+
+            scheduler.reset_mock()
+            synced_component.journal = SuperglueDeployJournal(tmp_path / "deploy.journal").start(resume=True)
+
+            # the remote state is dropped after a sync
+            synced_component.remote_files = {0: {}}
+            sizes = {"superglue/eggs/spam/version=2/spam/big.jar": 100}
+            with patch.object(_SuperglueComponent, "object_size", side_effect=lambda key: sizes.get(key)):
+                synced_component.sync(scheduler)
+
+    uploaded = [c.args[2] for c in scheduler.upload_file.call_args_list]
+    assert uploaded == ["superglue/eggs/spam/version=2/spam/main.py", "superglue/eggs/spam/version=2/spam/.version"]
@@ -1,7 +1,12 @@
 import pytest
 from unittest.mock import patch, MagicMock
+from superglue.core.components.base import SuperglueComponent
 from superglue.core.components.job import SuperglueJob
+from superglue.core.components.module import SuperglueModule
 from superglue.core.components.tests import SuperglueTests
+from superglue.core.glue import SuperglueGlueState
+from superglue.core.hashing import file_digest
+from superglue.core.packaging import build_zipfile
 from superglue.environment.config import MODULES_PATH, TESTS_PATH
 
 TEST_JOB_NAME = "a_link_to_the_past"
@@ -52,3 +57,250 @@ def test_job_superglue_modules_property() -> None:
     _ = job.superglue_modules
 
     mock.get.assert_called_once_with("superglue_modules", {})
+
+
+def test_job_create_or_update_skips_unchanged_jobs() -> None:
+    job = SuperglueJob(job_name="foo")
+    job.deployment_config = {
+        "job_configs": [
+            {"Name": "unchanged", "Role": "GlueRole"},
+            {"Name": "changed", "Role": "OtherRole"},
+            {"Name": "missing", "Role": "GlueRole"},
+        ]
+    }
+    job.glue_state = SuperglueGlueState()
+    job.glue_state.jobs = {
+        "unchanged": {"Name": "unchanged", "Role": "GlueRole"},
+        "changed": {"Name": "changed", "Role": "GlueRole"},
+        "missing": None,
+    }
+
+    with patch("superglue.core.components.job.get_client") as get_client:
+        glue_client = get_client.return_value
+        job.create_or_update()
+
+    glue_client.get_job.assert_not_called()
+    glue_client.update_job.assert_called_once_with(JobName="changed", JobUpdate={"Role": "OtherRole"})
+    glue_client.create_job.assert_called_once_with(Name="missing", Role="GlueRole")
+
+
+def test_job_create_or_update_reconciles_tags() -> None:
+    job = SuperglueJob(job_name="foo")
+    tags = {"team": "data", "env": "prd"}
+    job.deployment_config = {"job_configs": [{"Name": "spam", "Role": "GlueRole", "Tags": tags}]}
+    job.glue_state = SuperglueGlueState()
+    job.glue_state.jobs = {"spam": {"Name": "spam", "Role": "GlueRole"}}
+    job.glue_state.tags = {"spam": {"team": "data", "env": "dev", "owner": "me"}}
+
+    with patch("superglue.core.components.job.get_client") as get_client:
+        glue_client = get_client.return_value
+        job.create_or_update()
+
+        glue_client.get_tags.assert_not_called()
+        glue_client.untag_resource.assert_called_once_with(ResourceArn=job.job_arn("spam"), TagsToRemove=["owner"])
+        glue_client.tag_resource.assert_called_once_with(ResourceArn=job.job_arn("spam"), TagsToAdd={"env": "prd"})
+
+        glue_client.reset_mock()
+        job.create_or_update()
+
+        glue_client.untag_resource.assert_not_called()
+        glue_client.tag_resource.assert_not_called()
+
+
+def test_job_plan_glue() -> None:
+    job = SuperglueJob(job_name="foo")
+    job.deployment_config = {
+        "job_configs": [
+            {"Name": "unchanged", "Role": "GlueRole", "Tags": {"team": "data"}},
+            {"Name": "changed", "Role": "OtherRole"},
+            {"Name": "missing", "Role": "GlueRole"},
+        ]
+    }
+    job.glue_state = SuperglueGlueState()
+    job.glue_state.jobs = {
+        "unchanged": {"Name": "unchanged", "Role": "GlueRole"},
+        "changed": {"Name": "changed", "Role": "GlueRole"},
+        "missing": None,
+    }
+    job.glue_state.tags = {"unchanged": {"team": "data"}, "changed": {"team": "data"}}
+
+    actions = job.plan_glue()
+    assert actions == [
+        {"name": "unchanged", "action": "unchanged", "tags_to_add": {}, "tags_to_remove": []},
+        {"name": "changed", "action": "update", "tags_to_add": {}, "tags_to_remove": ["team"]},
+        {"name": "missing", "action": "create", "tags_to_add": {}, "tags_to_remove": []},
+    ]
+
+
+def test_job_plan_writes_deployment_config(tmp_path) -> None:
+    job = SuperglueJob(job_name="foo")
+    job.root_dir = tmp_path
+    job.job_path.mkdir(parents=True)
+    job.config = {"job_config": {"Name": "foo", "Command": {}, "DefaultArguments": {}}}
+
+    with (
+        patch.object(SuperglueComponent, "plan", return_value={"files": []}),
+        patch.object(SuperglueJob, "plan_glue", return_value=[]),
+        patch.object(SuperglueJob, "sync") as sync,
+        patch.object(SuperglueJob, "apply_glue_plan"),
+    ):
+        plan = job.plan()
+        assert job.deployment_config_file.exists()
+        assert plan["deployment_config_digest"] == file_digest(job.deployment_config_file)
+
+        job.deploy(False, plan=plan)
+        sync.assert_called_once_with(None, [])
+
+        job.config["job_config"]["Name"] = "bar"
+        with pytest.raises(ValueError):
+            job.deploy(False, plan=plan)
+        sync.assert_called_once()
+
+
+def test_job_plan_with_undeployed_module_content_addressed(tmp_path) -> None:
+    module_path = tmp_path / "modules" / "spam"
+    module_path.mkdir(parents=True)
+    (module_path / ".version").write_text('{"version_number": 2}')
+    (module_path / "spam.zip").write_bytes(b"zip")
+
+    job = SuperglueJob(job_name="foo")
+    job.root_dir = tmp_path / "jobs"
+    job.job_path.mkdir(parents=True)
+    job.config = {
+        "job_config": {"Name": "foo", "Command": {}, "DefaultArguments": {}},
+        "superglue_modules": {"spam": {"version_number": 2}},
+    }
+    manifest = {}
+
+    with (
+        patch("superglue.core.components.module.MODULES_PATH", tmp_path / "modules"),
+        patch.object(SuperglueComponent, "storage_mode", "content"),
+        patch.object(SuperglueComponent, "plan", return_value={"files": []}),
+        patch.object(SuperglueModule, "fetch_files_manifest", side_effect=lambda: dict(manifest)),
+        patch.object(SuperglueModule, "download_s3_version", side_effect=lambda: dict(manifest)),
+        patch.object(SuperglueJob, "plan_glue", return_value=[]),
+        patch.object(SuperglueJob, "sync"),
+        patch.object(SuperglueJob, "apply_glue_plan"),
+    ):
+        plan = job.plan()
+        blob = SuperglueModule("spam").blob_key(module_path / "spam.zip")
+        extra_py_files = job.deployment_config["job_configs"][0]["DefaultArguments"]["--extra-py-files"]
+        assert extra_py_files == f"s3://{job.bucket}/{blob}"
+
+        # the module is deployed first, its version now records the blob
+        manifest["spam/spam.zip"] = blob
+        job.deploy(False, plan=plan)
+
+
+def make_bundled_job(tmp_path) -> SuperglueJob:
+    inner_path = tmp_path / "modules" / "spam" / "spam"
+    inner_path.mkdir(parents=True)
+    (inner_path / "__init__.py").write_text("")
+    (inner_path / "eggs.py").write_text("")
+    (inner_path / "unused.py").write_text("x = 1\n" * 100)
+
+    job = SuperglueJob(job_name="foo")
+    job.root_dir = tmp_path / "jobs"
+    job.job_path.mkdir(parents=True)
+    job.main_script_file.write_text("from spam import eggs\n")
+    job.config = {"superglue_modules": {"spam": {"version_number": 1}}, "superglue_bundle": {"tree_shake": True}}
+    return job
+
+
+def test_job_bundle_task(tmp_path) -> None:
+    job = make_bundled_job(tmp_path)
+
+    with patch("superglue.core.components.module.MODULES_PATH", tmp_path / "modules"):
+        (tmp_path / "modules" / "spam" / ".version").write_text('{"version_number": 1}')
+        task = job.bundle_task(bytecode=None)
+
+    assert job.tree_shake
+    assert not job.is_packaged
+    assert task["zipfile"] == job.bundle_file.as_posix()
+    assert [arcname for _, arcname in task["files"]] == ["spam/__init__.py", "spam/eggs.py"]
+    assert task["report"]["files"] == 3
+    assert task["report"]["kept_files"] == 2
+    assert task["report"]["bytes"] - task["report"]["kept_bytes"] == 600
+
+
+def test_job_bundle_task_version_mismatch(tmp_path) -> None:
+    job = make_bundled_job(tmp_path)
+
+    with patch("superglue.core.components.module.MODULES_PATH", tmp_path / "modules"):
+        (tmp_path / "modules" / "spam" / ".version").write_text('{"version_number": 2}')
+        with pytest.raises(ValueError):
+            job.bundle_task(bytecode=None)
+
+
+@patch.object(SuperglueJob, "modules")
+def test_job_render_uses_bundle(modules: MagicMock, tmp_path) -> None:
+    job = make_bundled_job(tmp_path)
+    job.config["job_config"] = {"DefaultArguments": {}, "Command": {}}
+
+    job.render()
+
+    modules.assert_not_called()
+    extra_py_files = job.deployment_config["job_configs"][0]["DefaultArguments"]["--extra-py-files"]
+    assert extra_py_files == f"{job.s3_path}/superglue_bundle.zip"
+
+
+def test_job_consolidated_bundle(tmp_path) -> None:
+    job = make_bundled_job(tmp_path)
+    job.config["superglue_bundle"] = {"consolidate": True}
+    job.config["job_config"] = {"DefaultArguments": {}, "Command": {}}
+    (job.pys_path / "utils").mkdir(parents=True)
+    (job.pys_path / "utils" / "helpers.py").write_text("")
+    (job.pys_path / "udfs.jar").write_text("")
+
+    with patch("superglue.core.components.module.MODULES_PATH", tmp_path / "modules"):
+        (tmp_path / "modules" / "spam" / ".version").write_text('{"version_number": 1}')
+        task = job.bundle_task(bytecode=None)
+        job.render()
+
+        assert [arcname for _, arcname in task["files"]] == [
+            "helpers.py",
+            "spam/__init__.py",
+            "spam/eggs.py",
+            "spam/unused.py",
+        ]
+        assert task["report"]["entries"] == 2
+        extra_py_files = job.deployment_config["job_configs"][0]["DefaultArguments"]["--extra-py-files"]
+        assert extra_py_files == f"{job.s3_object_path(job.pys_path / 'udfs.jar')},{job.s3_path}/superglue_bundle.zip"
+
+        assert not job.is_packaged
+        build_zipfile(task)
+        assert job.is_packaged
+
+        (job.pys_path / "helpers.py").write_text("")
+        with pytest.raises(ValueError):
+            job.bundle_task(bytecode=None)
+        assert not job.is_packaged
+
+
+def test_job_consolidated_bundle_name_clash(tmp_path) -> None:
+    job = make_bundled_job(tmp_path)
+    job.config["superglue_bundle"] = {"consolidate": True}
+    job.pys_path.mkdir()
+    (job.pys_path / "spam.py").write_text("")
+
+    with patch("superglue.core.components.module.MODULES_PATH", tmp_path / "modules"):
+        (tmp_path / "modules" / "spam" / ".version").write_text('{"version_number": 1}')
+        with pytest.raises(ValueError):
+            job.bundle_task(bytecode=None)
+
+
+def test_job_requirements_are_bundled(tmp_path) -> None:
+    cache = MagicMock()
+    cache.files.return_value = {"tinydep/__init__.py": {"path": tmp_path / "tinydep.py", "digest": "vendor:abc"}}
+    (tmp_path / "tinydep.py").write_text("VALUE = 42\n")
+
+    job = make_bundled_job(tmp_path)
+    job.config = {"requirements": ["tinydep==1.0"]}
+
+    job.vendor_cache = cache
+    assert job.bundled
+    files, report = job.bundle_contents()
+
+    assert list(files) == ["tinydep/__init__.py"]
+    assert report["requirements"] == 1
+    assert report["vendored_files"] == 1
@@ -37,8 +37,20 @@ def test_module_test_file_property(module: SuperglueModule) -> None:
     assert module.module_tests_file == module.module_test_path / f"test_{TEST_MODULE_NAME}.py"
 
 
-def test_module_is_packaged_property(module: SuperglueModule) -> None:
-    assert module.is_packaged == module.zipfile.exists()
+def test_module_is_packaged_property(tmp_path) -> None:
+    module = SuperglueModule("beans")
+    module.root_dir = tmp_path
+    module.module_inner_path.mkdir(parents=True)
+    (module.module_inner_path / "__init__.py").write_text("spam = 1\n")
+    assert not module.is_packaged
+
+    module.package(compression="stored")
+    assert module.is_packaged
+
+    (module.module_inner_path / "__init__.py").write_text("spam = 2\n")
+    module.version_hashes = None
+    assert module.zipfile.exists()
+    assert not module.is_packaged
 
 
 def test_module_tests_property(module: SuperglueModule) -> None:
@@ -118,36 +130,88 @@ def test_module_zipfile_relative_path_method(module: SuperglueModule) -> None:
     relative_to.as_posix.assert_called_once()
 
 
-def test_module_zipfile_content_method(module: SuperglueModule) -> None:
-    path = MagicMock()
-    _ = module.zipfile_content(path)
-    path.read_text.assert_called_once_with(encoding="utf-8")
-
-
+def test_module_files_include_package_data(tmp_path) -> None:
+    module = SuperglueModule("beans")
+    module.root_dir = tmp_path
+    (module.module_inner_path / "sql").mkdir(parents=True)
+    (module.module_inner_path / "__pycache__").mkdir()
+    (module.module_inner_path / "__init__.py").write_text("spam = 1\n")
+    (module.module_inner_path / "sql" / "query.sql").write_text("select 1")
+    (module.module_inner_path / "sql" / "scratch.sql").write_text("select 2")
+    (module.module_inner_path / "__pycache__" / "__init__.cpython-310.pyc").write_bytes(b"\x00")
+    (module.module_inner_path / "_speedups.so").write_bytes(b"\x7fELF\x00\xff")
+    (module.module_root_path / "setup.cfg").write_text("[metadata]")
+    assert [module.zipfile_relative_path(f) for f in module.module_files()] == ["beans/__init__.py"]
+
+    module.config_file.write_text(
+        "package:\n  include:\n    - beans/sql/*.sql\n    - setup.cfg\n  exclude:\n    - beans/sql/scratch.sql\n"
+    )
+    relative_paths = [module.zipfile_relative_path(f) for f in module.module_files()]
+    assert relative_paths == [
+        "beans/__init__.py",
+        "beans/sql/query.sql",
+        "setup.cfg",
+    ]
+
+
+@patch.object(SuperglueModule, "package_manifest", return_value={"files": {}})
+@patch.object(SuperglueModule, "packaged_manifest", return_value=None)
 @patch.object(SuperglueModule, "module_files")
+@patch.object(SuperglueModule, "local_digest", return_value="abc")
 @patch.object(SuperglueModule, "zipfile_relative_path")
-@patch.object(SuperglueModule, "zipfile_content")
-@patch("superglue.core.components.module.zipfile.ZipFile")
+@patch("superglue.core.components.module.build_zipfile")
 def test_module_package_method(
-    zipfile: MagicMock, zipfile_content: MagicMock, zipfile_relative_path: MagicMock, module_files: MagicMock
+    build_zipfile: MagicMock,
+    zipfile_relative_path: MagicMock,
+    local_digest: MagicMock,
+    module_files: MagicMock,
+    packaged_manifest: MagicMock,
+    package_manifest: MagicMock,
 ) -> None:
-    content = "This is the content"
     path_value = "/spam/eggs"
-    zipfile_file = MagicMock()
     module_files_files = MagicMock()
+    module_files_files.as_posix.return_value = "/abs/spam/eggs"
     module_files.return_value = [module_files_files]
-
-    zipfile.return_value.__enter__.return_value = zipfile_file
-    zipfile_content.return_value = content
     zipfile_relative_path.return_value = path_value
 
     module = SuperglueModule("beans")
-    module.package()
+    assert module.package()
 
-    zipfile_content.assert_called_once_with(module_files_files)
     zipfile_relative_path.assert_called_once_with(module_files_files)
+    build_zipfile.assert_called_once_with(
+        {
+            "name": "beans",
+            "zipfile": module.zipfile.as_posix(),
+            "files": [["/abs/spam/eggs", path_value]],
+            "manifest_name": ".superglue-manifest",
+            "manifest": {"files": {}},
+            "compression": "deflated",
+            "compression_level": 9,
+            "bytecode": None,
+            "compare_imports": False,
+            "report": {"requirements": 0, "vendored_files": 0},
+        }
+    )
+
+
+def test_module_package_skips_current_zipfile(tmp_path) -> None:
+    module = SuperglueModule("beans")
+    module.root_dir = tmp_path
+    module.module_inner_path.mkdir(parents=True)
+    (module.module_inner_path / "__init__.py").write_text("spam = 1\n")
+
+    assert module.package()
+    assert module.is_package_current
+    assert not module.package()
+    assert module.package(force=True)
 
-    zipfile_file.writestr.assert_called_once_with(path_value, content)
+    assert module.package(compression="stored")
+    assert not module.package(compression="stored")
+
+    (module.module_inner_path / "__init__.py").write_text("spam = 2\n")
+    module.version_hashes = None
+    assert not module.is_package_current
+    assert module.package()
 
 
 @patch.object(SuperglueModule, "zipfile")
@@ -166,3 +230,64 @@ def test_module_remove_zipfile_false(zipfile: MagicMock) -> None:
     module.remove_zipfile()
 
     zipfile.unlink.assert_not_called()
+
+
+def test_module_s3_zipfile_path_content_addressed(module: SuperglueModule) -> None:
+    module.storage_mode = "content"
+    blob = "superglue/blobs/abc/green_eggs_and_ham.zip"
+
+    with patch.object(
+        SuperglueModule, "fetch_files_manifest", return_value={f"{TEST_MODULE_NAME}/{TEST_ZIPFILE_NAME}": blob}
+    ):
+        assert module.s3_zipfile_path == f"s3://{module.bucket}/{blob}"
+
+    with patch.object(SuperglueModule, "fetch_files_manifest", return_value={}):
+        assert module.s3_zipfile_path == f"{module.s3_path}/{TEST_ZIPFILE_NAME}"
+
+
+def test_module_s3_zipfile_path_content_addressed_undeployed(tmp_path) -> None:
+    module = SuperglueModule("beans")
+    module.root_dir = tmp_path
+    module.storage_mode = "content"
+    module.module_root_path.mkdir()
+    module.zipfile.write_bytes(b"zip")
+    blob = module.blob_key(module.zipfile)
+
+    with (
+        patch.object(SuperglueModule, "fetch_files_manifest", return_value={}),
+        patch.object(SuperglueModule, "download_s3_version", return_value={}),
+    ):
+        # not deployed yet, the zip file goes to the blob of its local digest
+        assert module.s3_zipfile_path == f"s3://{module.bucket}/{blob}"
+
+        module.version_number = 3
+        assert module.s3_zipfile_path == f"{module.s3_path}/beans.zip"
+
+    module.version_number = 0
+    module.invalidate_remote()
+    with (
+        patch.object(SuperglueModule, "fetch_files_manifest", return_value={}),
+        patch.object(SuperglueModule, "download_s3_version", return_value={"beans/beans.zip": "abc"}),
+    ):
+        # deployed before content addressing was enabled
+        assert module.s3_zipfile_path == f"{module.s3_path}/beans.zip"
+
+
+def test_module_package_vendors_requirements(tmp_path) -> None:
+    cache = MagicMock()
+    cache.files.return_value = {"tinydep/__init__.py": {"path": tmp_path / "tinydep.py", "digest": "vendor:abc"}}
+    (tmp_path / "tinydep.py").write_text("VALUE = 42\n")
+
+    module = SuperglueModule("beans")
+    module.root_dir = tmp_path
+    module.module_inner_path.mkdir(parents=True)
+    (module.module_inner_path / "__init__.py").write_text("spam = 1\n")
+    module.config_file.write_text("requirements:\n  - tinydep==1.0\n")
+
+    module.vendor_cache = cache
+    task = module.package_task()
+
+    cache.files.assert_called_with(["tinydep==1.0"])
+    assert [arcname for _, arcname in task["files"]] == ["beans/__init__.py", "tinydep/__init__.py"]
+    assert task["manifest"]["files"]["tinydep/__init__.py"] == "vendor:abc"
+    assert task["report"] == {"requirements": 1, "vendored_files": 1}
@@ -1,3 +1,4 @@
+import time
 import pytest
 from prettytable import PrettyTable
 from unittest.mock import MagicMock, patch
@@ -167,3 +168,40 @@ def test_create_project_method() -> None:
 
             save_base_project.assert_called_once()
             save_project_components.assert_called_once()
+
+
+def test_jobs_property_scanned_once() -> None:
+    with patch.object(SuperglueProject, "job") as m_job:
+        with patch.object(SuperglueProject, "jobs_path") as m_jobs_path:
+            mock_path = MagicMock()
+            mock_path.name = "watermelon"
+            m_jobs_path.iterdir.return_value = [mock_path]
+
+            project = SuperglueProject()
+            assert project.jobs is project.jobs
+            m_job.get.assert_called_once_with("watermelon")
+
+
+def test_components_share_hash_cache() -> None:
+    with patch.object(SuperglueProject, "module") as m_module:
+        with patch.object(SuperglueProject, "modules_path") as m_modules_path:
+            m_modules_path.iterdir.return_value = [MagicMock()]
+
+            project = SuperglueProject(use_hash_cache=False)
+            module = project.modules[0]
+
+            assert module.hash_cache is project.hash_cache
+            assert module.vendor_cache is project.vendor_cache
+            assert project.hash_cache.enabled is False
+
+
+def test_pretty_table_rows_keep_component_order() -> None:
+    components = []
+    for i, delay in enumerate([0.03, 0.0, 0.01]):
+        component = MagicMock()
+        component.version_hashes = {}
+        type(component).pretty_table_row = property(lambda _, i=i, d=delay: time.sleep(d) or [f"component-{i}"])
+        components.append(component)
+
+    rows = SuperglueProject().pretty_table_rows(components, max_workers=3)
+    assert rows == [["component-0"], ["component-1"], ["component-2"]]
@@ -0,0 +1,72 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from superglue.core import aws
+
+
+@pytest.fixture(autouse=True)
+def session() -> MagicMock:
+    aws.reset_clients()
+    with patch("superglue.core.aws.boto3.session.Session") as session:
+        session.return_value.client.side_effect = lambda service, **kwargs: MagicMock(name=service)
+        yield session
+    aws.reset_clients()
+
+
+def test_get_client_is_cached(session: MagicMock) -> None:
+    assert aws.get_client("s3") is aws.get_client("s3")
+    assert aws.get_client("s3") is not aws.get_client("glue")
+    session.assert_called_once()
+    assert session.return_value.client.call_count == 2
+
+
+def test_get_client_config(session: MagicMock) -> None:
+    aws.get_client("glue")
+    config = session.return_value.client.call_args.kwargs["config"]
+
+    assert config.max_pool_connections == aws.SUPERGLUE_AWS_MAX_POOL_CONNECTIONS
+    assert config.retries == {"mode": "standard", "total_max_attempts": 1}
+    assert config.connect_timeout == aws.SUPERGLUE_AWS_CONNECT_TIMEOUT
+    assert config.read_timeout == aws.SUPERGLUE_AWS_READ_TIMEOUT
+
+
+def test_get_client_botocore_retries(session: MagicMock) -> None:
+    aws.configure_clients(retry_mode="adaptive")
+    try:
+        aws.get_client("glue")
+        config = session.return_value.client.call_args.kwargs["config"]
+        assert config.retries == {"mode": "adaptive", "max_attempts": aws.SUPERGLUE_AWS_MAX_ATTEMPTS}
+    finally:
+        aws.configure_clients(retry_mode=aws.SUPERGLUE_AWS_RETRY_MODE)
+
+
+def test_get_client_registers_rate_limiter(session: MagicMock) -> None:
+    client = aws.get_client("glue")
+    events = [c.args[0] for c in client.meta.events.register.call_args_list]
+    service_id = client.meta.service_model.service_id.hyphenize()
+
+    assert events == [f"before-send.{service_id}", f"after-call.{service_id}", f"needs-retry.{service_id}"]
+    assert aws.get_rate_limiter() is aws.get_rate_limiter()
+
+
+def test_endpoint_url_override() -> None:
+    with patch.dict(aws.SERVICE_ENDPOINT_URLS, {"s3": "http://localhost:9000"}):
+        with patch("superglue.core.aws.SUPERGLUE_AWS_ENDPOINT_URL", "http://localhost:4566"):
+            assert aws.endpoint_url("s3") == "http://localhost:9000"
+            assert aws.endpoint_url("glue") == "http://localhost:4566"
+
+
+def test_configure_clients_rebuilds_clients(session: MagicMock) -> None:
+    settings = aws._settings.copy()
+    try:
+        client = aws.get_client("s3")
+        aws.configure_clients(max_pool_connections=50)
+
+        assert aws.get_client("s3") is not client
+        assert session.return_value.client.call_args.kwargs["config"].max_pool_connections == 50
+    finally:
+        aws.configure_clients(**settings)
+
+
+def test_configure_clients_unknown_setting() -> None:
+    with pytest.raises(ValueError):
+        aws.configure_clients(spam="eggs")
@@ -0,0 +1,83 @@
+import sys
+import json
+import pytest
+import zipfile
+import subprocess
+from pathlib import Path
+from superglue.core.bytecode import bytecode_settings, compile_bytecode, find_python
+from superglue.core.packaging import build_zipfile, package_module
+
+
+def make_task(tmp_path: Path, mode: str) -> dict:
+    source = tmp_path / "spam.py"
+    source.write_text("eggs = 'ham'\n")
+    data = tmp_path / "spam.json"
+    data.write_text("{}")
+    return {
+        "name": "spam",
+        "zipfile": (tmp_path / "spam.zip").as_posix(),
+        "files": [[source.as_posix(), "spam/__init__.py"], [data.as_posix(), "spam/spam.json"]],
+        "manifest_name": ".superglue-manifest",
+        "manifest": {"files": {}},
+        "compression": "deflated",
+        "compression_level": 9,
+        "bytecode": bytecode_settings(mode, sys.executable),
+    }
+
+
+def test_bytecode_settings() -> None:
+    assert bytecode_settings("off", "python3.10") is None
+    assert bytecode_settings("with-sources", "python3.10") == {"python": "python3.10", "sources": True}
+    assert bytecode_settings("only", "python3.10") == {"python": "python3.10", "sources": False}
+
+    with pytest.raises(ValueError):
+        bytecode_settings("sometimes", "python3.10")
+
+
+def test_find_python_missing_interpreter() -> None:
+    with pytest.raises(RuntimeError):
+        find_python("python0.1")
+
+
+def test_compile_bytecode(tmp_path: Path) -> None:
+    source = tmp_path / "spam.py"
+    source.write_text("eggs = 'ham'\n")
+
+    result = compile_bytecode(sys.executable, [[source.as_posix(), "spam/__init__.py"]], tmp_path / "out")
+
+    assert result["version"] == "%d.%d" % sys.version_info[:2]
+    assert result["files"] == [[(tmp_path / "out" / "spam" / "__init__.pyc").as_posix(), "spam/__init__.pyc"]]
+    # flags of an unchecked hash based pyc
+    assert (tmp_path / "out" / "spam" / "__init__.pyc").read_bytes()[4:8] == b"\x01\x00\x00\x00"
+
+
+def test_compile_bytecode_syntax_error(tmp_path: Path) -> None:
+    source = tmp_path / "spam.py"
+    source.write_text("eggs = \n")
+
+    with pytest.raises(RuntimeError):
+        compile_bytecode(sys.executable, [[source.as_posix(), "spam/__init__.py"]], tmp_path / "out")
+
+
+@pytest.mark.parametrize("mode", ["with-sources", "only"])
+def test_build_zipfile_with_bytecode(tmp_path: Path, mode: str) -> None:
+    result = build_zipfile(make_task(tmp_path, mode))
+
+    with zipfile.ZipFile(tmp_path / "spam.zip") as zip_file:
+        names = zip_file.namelist()
+    assert "spam/__init__.pyc" in names
+    assert "spam/spam.json" in names
+    assert ("spam/__init__.py" in names) == (mode == "with-sources")
+    assert result["bytecode"] == "%d.%d" % sys.version_info[:2]
+
+    script = "import sys; sys.path.insert(0, sys.argv[1]); import spam; print(spam.__file__)"
+    output = subprocess.run([sys.executable, "-I", "-c", script, result["zipfile"]], capture_output=True, text=True)
+    assert output.stdout.strip().endswith("__init__.pyc")
+
+
+def test_package_module_compares_import_times(tmp_path: Path) -> None:
+    task = dict(make_task(tmp_path, "only"), compare_imports=True)
+    result = package_module(task)
+
+    assert set(result["import_times"]) == {"source", "bytecode"}
+    assert json.dumps(result)
@@ -0,0 +1,76 @@
+import time
+import threading
+from unittest.mock import MagicMock
+from superglue.core.deploy import SuperglueDeployScheduler
+
+
+def make_component(component_type: str, name: str, modules=None) -> MagicMock:
+    component = MagicMock()
+    component.component_type = component_type
+    component.component_name = name
+    component.name = name
+    component.superglue_modules = {m: {"version_number": 1} for m in modules or []}
+    return component
+
+
+def test_dependencies_only_include_deployed_modules() -> None:
+    module = make_component("superglue_module", "spam")
+    job = make_component("superglue_job", "eggs", modules=["spam", "bacon"])
+
+    graph = SuperglueDeployScheduler.dependencies([module, job])
+    assert graph[("superglue_job", "eggs")] == {("superglue_module", "spam")}
+    assert graph[("superglue_module", "spam")] == set()
+
+
+def test_jobs_wait_for_their_modules() -> None:
+    module = make_component("superglue_module", "spam")
+    job = make_component("superglue_job", "eggs", modules=["spam"])
+    other = make_component("superglue_job", "bacon")
+    finished = []
+    lock = threading.Lock()
+
+    def deploy(component) -> None:
+        if component is module:
+            time.sleep(0.05)
+        with lock:
+            finished.append(component.name)
+
+    results = SuperglueDeployScheduler(parallelism=4).run([module, job, other], deploy)
+
+    assert finished.index("spam") < finished.index("eggs")
+    assert finished[0] == "bacon"
+    assert [r["status"] for r in results] == ["deployed"] * 3
+
+
+def test_failure_skips_dependents_and_stops() -> None:
+    module = make_component("superglue_module", "spam")
+    job = make_component("superglue_job", "eggs", modules=["spam"])
+    other = make_component("superglue_job", "bacon")
+
+    def deploy(component) -> None:
+        if component is module:
+            raise RuntimeError("boom")
+
+    scheduler = SuperglueDeployScheduler(parallelism=1)
+    results = scheduler.run([module, job, other], deploy)
+
+    assert [r["status"] for r in results] == ["failed", "skipped", "skipped"]
+    assert str(scheduler.failed[0]["error"]) == "boom"
+    assert not scheduler.succeeded
+
+
+def test_continue_on_error() -> None:
+    module = make_component("superglue_module", "spam")
+    job = make_component("superglue_job", "eggs", modules=["spam"])
+    other = make_component("superglue_job", "bacon")
+    completed = []
+
+    def deploy(component) -> None:
+        if component is module:
+            raise RuntimeError("boom")
+
+    scheduler = SuperglueDeployScheduler(parallelism=1, continue_on_error=True)
+    results = scheduler.run([module, job, other], deploy, on_complete=lambda r: completed.append(r["status"]))
+
+    assert [r["status"] for r in results] == ["failed", "skipped", "deployed"]
+    assert sorted(completed) == ["deployed", "failed", "skipped"]
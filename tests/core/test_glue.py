@@ -0,0 +1,118 @@
+import botocore
+from unittest.mock import MagicMock, patch
+from superglue.core.glue import SuperglueGlueState, job_arn, job_update_differs, normalize_job_update, tag_changes
+
+JOB_UPDATE = {
+    "Role": "GlueRole",
+    "Command": {"Name": "glueetl", "ScriptLocation": "s3://bucket/main.py"},
+    "DefaultArguments": {"--retries": 3},
+    "WorkerType": "G.1X",
+    "NumberOfWorkers": 2,
+    "GlueVersion": "3.0",
+}
+
+REMOTE_JOB = {
+    "Name": "spam",
+    "Role": "arn:aws:iam::123456789012:role/GlueRole",
+    "CreatedOn": "yesterday",
+    "LastModifiedOn": "today",
+    "ExecutionProperty": {"MaxConcurrentRuns": 1},
+    "Command": {"Name": "glueetl", "ScriptLocation": "s3://bucket/main.py", "PythonVersion": "3"},
+    "DefaultArguments": {"--retries": "3"},
+    "MaxRetries": 0,
+    "AllocatedCapacity": 2,
+    "Timeout": 2880,
+    "MaxCapacity": 2.0,
+    "WorkerType": "G.1X",
+    "NumberOfWorkers": 2,
+    "GlueVersion": "3.0",
+}
+
+
+def test_normalize_job_update() -> None:
+    normalized = normalize_job_update(REMOTE_JOB)
+    assert normalized["Role"] == "GlueRole"
+    assert normalized["DefaultArguments"] == {"--retries": "3"}
+    assert "Name" not in normalized
+    assert "ExecutionProperty" not in normalized
+
+
+def test_job_update_differs() -> None:
+    assert not job_update_differs(JOB_UPDATE, REMOTE_JOB)
+    assert job_update_differs(dict(JOB_UPDATE, NumberOfWorkers=10), REMOTE_JOB)
+    assert job_update_differs(JOB_UPDATE, dict(REMOTE_JOB, SecurityConfiguration="encrypted"))
+
+
+def test_job_update_differs_timeout() -> None:
+    # glue fills in a timeout which depends on the job type when none is given
+    assert not job_update_differs(JOB_UPDATE, dict(REMOTE_JOB, Timeout=480))
+    assert not job_update_differs(JOB_UPDATE, {k: v for k, v in REMOTE_JOB.items() if k != "Timeout"})
+    assert not job_update_differs(dict(JOB_UPDATE, Timeout=2880), REMOTE_JOB)
+    assert job_update_differs(dict(JOB_UPDATE, Timeout=60), REMOTE_JOB)
+    assert job_update_differs(dict(JOB_UPDATE, Timeout=60), dict(REMOTE_JOB, Timeout=None))
+
+
+def test_glue_state_fetches_in_batches() -> None:
+    names = [f"job_{i}" for i in range(30)]
+
+    with patch("superglue.core.glue.get_client") as get_client:
+        glue_client = get_client.return_value
+        glue_client.get_resources.return_value = {"ResourceTagMappingList": []}
+        glue_client.batch_get_jobs.side_effect = lambda JobNames: {
+            "Jobs": [{"Name": n} for n in JobNames if n != "job_3"],
+            "JobsNotFound": ["job_3"] if "job_3" in JobNames else [],
+        }
+
+        state = SuperglueGlueState().fetch(names)
+        state.fetch(names)
+
+        assert glue_client.batch_get_jobs.call_count == 2
+        assert state.get("job_0") == {"Name": "job_0"}
+        assert state.get("job_3") is None
+        assert glue_client.batch_get_jobs.call_count == 2
+
+
+def test_glue_state_record() -> None:
+    state = SuperglueGlueState()
+    state.record("spam", {"Role": "GlueRole"})
+    assert state.get("spam") == {"Role": "GlueRole", "Name": "spam"}
+
+
+def test_glue_state_fetches_tags() -> None:
+    with patch("superglue.core.glue.get_client") as get_client:
+        client = get_client.return_value
+        client.batch_get_jobs.return_value = {"Jobs": [{"Name": "spam"}, {"Name": "eggs"}], "JobsNotFound": ["ham"]}
+        client.get_resources.return_value = {
+            "ResourceTagMappingList": [{"ResourceARN": job_arn("spam"), "Tags": [{"Key": "team", "Value": "data"}]}]
+        }
+
+        state = SuperglueGlueState().fetch(["spam", "eggs", "ham"])
+
+    client.get_resources.assert_called_once_with(ResourceARNList=[job_arn("eggs"), job_arn("spam")])
+    assert state.get_tags("spam") == {"team": "data"}
+    assert state.get_tags("eggs") == {}
+
+
+def test_glue_state_fetches_tags_without_tagging_api() -> None:
+    denied = botocore.exceptions.ClientError({"Error": {"Code": "AccessDeniedException"}}, "GetResources")
+
+    with patch("superglue.core.glue.get_client") as get_client:
+        client = get_client.return_value
+        client.batch_get_jobs.side_effect = lambda JobNames: {"Jobs": [{"Name": n} for n in JobNames]}
+        client.get_resources.side_effect = denied
+        client.get_tags.side_effect = lambda ResourceArn: {"Tags": {"team": "data"} if "spam" in ResourceArn else {}}
+
+        state = SuperglueGlueState().fetch(["spam", "eggs"])
+        state.fetch(["ham"])
+
+    client.get_resources.assert_called_once()
+    assert client.get_tags.call_count == 3
+    assert state.get_tags("spam") == {"team": "data"}
+    assert state.get_tags("eggs") == {}
+
+
+def test_tag_changes() -> None:
+    to_add, to_remove = tag_changes({"a": "1", "b": "2"}, {"a": "1", "b": "3", "c": "4", "aws:system": "x"})
+    assert to_add == {"b": "2"}
+    assert to_remove == ["c"]
+    assert tag_changes({"a": "1"}, {"a": "1"}) == ({}, [])
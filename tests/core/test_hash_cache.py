@@ -0,0 +1,95 @@
+import os
+import json
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock
+from superglue.core.hash_cache import SuperglueHashCache
+
+
+@pytest.fixture()
+def source_file(tmp_path: Path) -> Path:
+    path = tmp_path / "jobs" / "spam" / "main.py"
+    path.parent.mkdir(parents=True)
+    path.write_text("print('spam')")
+
+    # push the mtime out of the racy window so the digest is cacheable
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10_000_000_000))
+    return path
+
+
+@pytest.fixture()
+def hash_cache(tmp_path: Path) -> SuperglueHashCache:
+    return SuperglueHashCache(cache_file=tmp_path / ".superglue" / "cache" / "hashes", root_dir=tmp_path)
+
+
+def test_hash_cache_miss_then_hit(hash_cache: SuperglueHashCache, source_file: Path) -> None:
+    hasher = MagicMock(return_value="abc")
+
+    assert hash_cache.get_digest(source_file, hasher) == "abc"
+    assert hash_cache.get_digest(source_file, hasher) == "abc"
+
+    hasher.assert_called_once_with(source_file)
+    assert hash_cache.hits == 1
+    assert hash_cache.misses == 1
+
+
+def test_hash_cache_key_is_relative(hash_cache: SuperglueHashCache, source_file: Path) -> None:
+    assert hash_cache.cache_key(source_file) == "jobs/spam/main.py"
+
+
+def test_hash_cache_invalidated_by_stat_change(hash_cache: SuperglueHashCache, source_file: Path) -> None:
+    hasher = MagicMock(side_effect=["abc", "def"])
+    hash_cache.get_digest(source_file, hasher)
+
+    stat = source_file.stat()
+    os.utime(source_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    assert hash_cache.get_digest(source_file, hasher) == "def"
+    assert hash_cache.misses == 2
+
+
+def test_hash_cache_skips_racy_files(hash_cache: SuperglueHashCache, source_file: Path) -> None:
+    source_file.write_text("print('eggs')")
+    hash_cache.get_digest(source_file, MagicMock(return_value="abc"))
+    assert hash_cache.cache_key(source_file) not in hash_cache.entries
+
+
+def test_hash_cache_disabled(hash_cache: SuperglueHashCache, source_file: Path) -> None:
+    hash_cache.enabled = False
+    hasher = MagicMock(return_value="abc")
+
+    hash_cache.get_digest(source_file, hasher)
+    hash_cache.get_digest(source_file, hasher)
+    hash_cache.save()
+
+    assert hasher.call_count == 2
+    assert hash_cache.lookups == 0
+    assert not hash_cache.cache_file.exists()
+
+
+def test_hash_cache_save_and_load(hash_cache: SuperglueHashCache, source_file: Path, tmp_path: Path) -> None:
+    hash_cache.get_digest(source_file, MagicMock(return_value="abc"))
+    hash_cache.save()
+
+    reloaded = SuperglueHashCache(cache_file=hash_cache.cache_file, root_dir=tmp_path)
+    hasher = MagicMock()
+
+    assert reloaded.get_digest(source_file, hasher) == "abc"
+    hasher.assert_not_called()
+
+
+def test_hash_cache_prunes_deleted_files(hash_cache: SuperglueHashCache, source_file: Path) -> None:
+    hash_cache.get_digest(source_file, MagicMock(return_value="abc"))
+    source_file.unlink()
+    hash_cache.save()
+
+    content = json.loads(hash_cache.cache_file.read_text())
+    assert content["entries"] == {}
+
+
+@pytest.mark.parametrize("content", ["not json", json.dumps({"cache_version": -1, "entries": {"a": {}}})])
+def test_hash_cache_ignores_invalid_file(hash_cache: SuperglueHashCache, content: str) -> None:
+    hash_cache.cache_file.parent.mkdir(parents=True)
+    hash_cache.cache_file.write_text(content)
+    assert hash_cache.entries == {}
@@ -0,0 +1,59 @@
+import pytest
+from hashlib import md5
+from pathlib import Path
+from unittest.mock import MagicMock
+from superglue.core.hashing import SuperglueHashingEngine, file_digest
+
+
+@pytest.fixture()
+def files(tmp_path: Path) -> list:
+    paths = []
+    for name in ["spam", "eggs", "beans"]:
+        path = tmp_path / name
+        path.write_bytes(name.encode() * 1000)
+        paths.append(path)
+    return paths
+
+
+def make_component(paths: list) -> MagicMock:
+    component = MagicMock()
+    component.version_hashes = None
+    component.version_file_paths.return_value = paths
+    component.hash_file.side_effect = lambda path: (path.name, file_digest(path))
+    return component
+
+
+@pytest.mark.parametrize("buffer_size", [1, 7, 4096, 1024 * 1024])
+def test_file_digest_buffer_size(files: list, buffer_size: int) -> None:
+    expected = md5(files[0].read_bytes()).hexdigest()
+    assert file_digest(files[0], buffer_size=buffer_size) == expected
+
+
+def test_engine_hashes_all_components(files: list) -> None:
+    first = make_component(files[:2])
+    second = make_component(files[2:])
+
+    SuperglueHashingEngine(max_workers=2).hash_components([first, second])
+
+    assert first.version_hashes == {p.name: md5(p.read_bytes()).hexdigest() for p in files[:2]}
+    assert second.version_hashes == {"beans": md5(files[2].read_bytes()).hexdigest()}
+
+
+def test_engine_skips_hashed_components(files: list) -> None:
+    component = make_component(files)
+    component.version_hashes = {"already": "hashed"}
+
+    SuperglueHashingEngine().hash_components([component])
+
+    component.hash_file.assert_not_called()
+    assert component.version_hashes == {"already": "hashed"}
+
+
+def test_engine_component_without_files() -> None:
+    component = make_component([])
+    SuperglueHashingEngine().hash_components([component])
+    assert component.version_hashes == {}
+
+
+def test_engine_min_workers() -> None:
+    assert SuperglueHashingEngine(max_workers=0).max_workers == 1
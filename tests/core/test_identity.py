@@ -0,0 +1,64 @@
+import time
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from superglue.core.identity import SuperglueIdentityCache
+
+
+@pytest.fixture()
+def session() -> MagicMock:
+    with patch("superglue.core.identity.get_session") as get_session:
+        credentials = get_session.return_value.get_credentials.return_value.get_frozen_credentials.return_value
+        credentials.access_key = "AKIASPAM"
+        credentials.token = None
+        get_session.return_value.profile_name = "default"
+        yield get_session.return_value
+
+
+@pytest.fixture()
+def sts() -> MagicMock:
+    with patch("superglue.core.identity.get_client") as get_client:
+        get_client.return_value.get_caller_identity.return_value = {"Account": "123456789012"}
+        yield get_client.return_value
+
+
+def test_account_id_is_cached(tmp_path: Path, session: MagicMock, sts: MagicMock) -> None:
+    cache = SuperglueIdentityCache(cache_file=tmp_path / "identity", ttl=60)
+
+    assert cache.account_id() == "123456789012"
+    assert SuperglueIdentityCache(cache_file=tmp_path / "identity", ttl=60).account_id() == "123456789012"
+    sts.get_caller_identity.assert_called_once()
+    assert "AKIASPAM" not in (tmp_path / "identity").read_text()
+
+
+def test_account_id_revalidate(tmp_path: Path, session: MagicMock, sts: MagicMock) -> None:
+    cache = SuperglueIdentityCache(cache_file=tmp_path / "identity", ttl=60)
+    cache.account_id()
+    cache.account_id(revalidate=True)
+    assert sts.get_caller_identity.call_count == 2
+
+
+def test_account_id_other_credentials(tmp_path: Path, session: MagicMock, sts: MagicMock) -> None:
+    cache = SuperglueIdentityCache(cache_file=tmp_path / "identity", ttl=60)
+    cache.account_id()
+
+    session.get_credentials.return_value.get_frozen_credentials.return_value.access_key = "AKIAEGGS"
+    cache.account_id()
+    assert sts.get_caller_identity.call_count == 2
+
+
+def test_account_id_expires(tmp_path: Path, session: MagicMock, sts: MagicMock) -> None:
+    cache = SuperglueIdentityCache(cache_file=tmp_path / "identity", ttl=60)
+    cache.account_id()
+
+    with patch("superglue.core.identity.time.time", return_value=time.time() + 120):
+        cache.account_id()
+    assert sts.get_caller_identity.call_count == 2
+
+
+def test_account_id_disabled(tmp_path: Path, session: MagicMock, sts: MagicMock) -> None:
+    cache = SuperglueIdentityCache(cache_file=tmp_path / "identity", ttl=0)
+    cache.account_id()
+    cache.account_id()
+    assert sts.get_caller_identity.call_count == 2
+    assert not (tmp_path / "identity").exists()
@@ -0,0 +1,90 @@
+from pathlib import Path
+from superglue.core.imports import SuperglueImportGraph, imported_names, module_name, resolve_relative
+
+
+def write_files(root: Path, files: dict) -> dict:
+    paths = {}
+    for arcname, content in files.items():
+        path = root / arcname
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        paths[arcname] = path
+    return paths
+
+
+def test_module_name() -> None:
+    assert module_name("spam/__init__.py") == "spam"
+    assert module_name("spam/eggs/ham.py") == "spam.eggs.ham"
+    assert module_name("spam.py") == "spam"
+    assert module_name("spam/data.json") is None
+
+
+def test_resolve_relative() -> None:
+    assert resolve_relative("spam.eggs", False, 1, "ham") == "spam.ham"
+    assert resolve_relative("spam.eggs", True, 1, "ham") == "spam.eggs.ham"
+    assert resolve_relative("spam.eggs.ham", False, 2, None) == "spam"
+    assert resolve_relative("spam", False, 1, None) is None
+
+
+def test_imported_names() -> None:
+    source = b"""
+import os.path
+from spam import eggs, ham
+from .sausage import *
+
+def lazy():
+    import bacon
+"""
+    names, dynamic = imported_names(source, "beans.beans", False)
+
+    assert names == {"os.path", "spam", "spam.eggs", "spam.ham", "beans.sausage", "beans.sausage.*", "bacon"}
+    assert not dynamic
+    assert imported_names(b"import importlib\nimportlib.import_module('spam')", "beans", False)[1]
+
+
+def test_import_graph_reachable(tmp_path: Path) -> None:
+    files = write_files(
+        tmp_path / "modules",
+        {
+            "spam/__init__.py": "",
+            "spam/eggs.py": "from . import ham",
+            "spam/ham.py": "",
+            "spam/unused.py": "",
+            "spam/data.json": "{}",
+            "spam/star/__init__.py": "",
+            "spam/star/one.py": "",
+            "beans/__init__.py": "",
+            "beans/data.json": "{}",
+        },
+    )
+    entries = write_files(tmp_path / "job", {"main.py": "import spam.eggs\nfrom spam.star import *"})
+
+    reachable = SuperglueImportGraph(files).reachable({"__main__": entries["main.py"]})
+
+    assert reachable == {
+        "spam/__init__.py",
+        "spam/eggs.py",
+        "spam/ham.py",
+        "spam/data.json",
+        "spam/star/__init__.py",
+        "spam/star/one.py",
+    }
+
+
+def test_import_graph_keeps_dynamic_packages(tmp_path: Path) -> None:
+    files = write_files(
+        tmp_path / "modules",
+        {
+            "spam/__init__.py": "import importlib\nplugin = importlib.import_module('spam.plugins.one')",
+            "spam/plugins/one.py": "",
+            "beans/__init__.py": "",
+        },
+    )
+    entries = write_files(tmp_path / "job", {"main.py": "import spam", "loader.py": "__import__('beans')"})
+
+    graph = SuperglueImportGraph(files)
+    assert graph.reachable({"__main__": entries["main.py"]}) == {"spam/__init__.py", "spam/plugins/one.py"}
+    assert graph.dynamic == {"spam"}
+
+    graph = SuperglueImportGraph(files)
+    assert graph.reachable({"__main__": entries["main.py"], "loader": entries["loader.py"]}) == set(files)
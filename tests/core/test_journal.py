@@ -0,0 +1,59 @@
+from pathlib import Path
+from unittest.mock import MagicMock
+from superglue.core.journal import SuperglueDeployJournal
+
+
+def make_component(version_number: int = 2) -> MagicMock:
+    component = MagicMock()
+    component.component_type = "superglue_job"
+    component.component_name = "spam"
+    component.version_number = version_number
+    return component
+
+
+def test_journal_survives_restart(tmp_path: Path) -> None:
+    component = make_component()
+    journal = SuperglueDeployJournal(tmp_path / "deploy.journal").start()
+    journal.record_version(component)
+    journal.record("transfer", component_type="superglue_job", component_name="spam", key="a/b", digest="abc")
+
+    resumed = SuperglueDeployJournal(tmp_path / "deploy.journal").start(resume=True)
+    assert resumed.resumed
+    assert resumed.version_number(component) == 2
+    assert resumed.find("transfer", key="a/b", digest="abc")
+    assert resumed.find("transfer", key="a/b", digest="def") is None
+    assert resumed.started(component)
+    assert not resumed.is_deployed(component)
+
+    resumed.record_deployed(component)
+    assert resumed.is_deployed(component)
+    assert not resumed.is_deployed(make_component(version_number=3))
+
+
+def test_journal_ignores_torn_last_line(tmp_path: Path) -> None:
+    journal = SuperglueDeployJournal(tmp_path / "deploy.journal").start()
+    journal.record_version(make_component())
+
+    with journal.journal_file.open("a") as f:
+        f.write('{"event": "transf')
+
+    resumed = SuperglueDeployJournal(tmp_path / "deploy.journal").start(resume=True)
+    assert len(resumed.records) == 2
+
+
+def test_journal_without_resume_starts_over(tmp_path: Path) -> None:
+    journal = SuperglueDeployJournal(tmp_path / "deploy.journal").start()
+    journal.record_version(make_component())
+
+    fresh = SuperglueDeployJournal(tmp_path / "deploy.journal").start()
+    assert not fresh.resumed
+    assert fresh.version_number(make_component()) is None
+
+
+def test_journal_removed_on_success(tmp_path: Path) -> None:
+    journal = SuperglueDeployJournal(tmp_path / "deploy.journal").start()
+    journal.close(succeeded=False)
+    assert journal.exists
+
+    journal.close(succeeded=True)
+    assert not journal.exists
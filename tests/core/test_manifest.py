@@ -0,0 +1,91 @@
+import io
+import json
+import pytest
+import botocore
+from unittest.mock import MagicMock, patch
+from superglue.core.manifest import SuperglueManifest, version_digest
+
+
+def make_component(name: str, version_number: int = 1) -> MagicMock:
+    component = MagicMock()
+    component.component_type = "superglue_job"
+    component.component_name = name
+    component.version_number = version_number
+    component.version_digest = f"{name}-digest"
+    return component
+
+
+@pytest.fixture()
+def manifest() -> SuperglueManifest:
+    return SuperglueManifest(bucket="some-bucket", prefix_root="superglue")
+
+
+@pytest.fixture()
+def s3_client() -> MagicMock:
+    with patch("superglue.core.manifest.get_client") as client:
+        yield client.return_value
+
+
+def test_version_digest_ignores_key_order() -> None:
+    assert version_digest({"a": "1", "b": "2"}) == version_digest({"b": "2", "a": "1"})
+    assert version_digest({"a": "1"}) != version_digest({"a": "2"})
+
+
+def test_manifest_key(manifest: SuperglueManifest) -> None:
+    assert manifest.key == "superglue/_manifest.json"
+
+
+def test_manifest_update_and_seed(manifest: SuperglueManifest) -> None:
+    component = make_component("zelda", version_number=4)
+    manifest.record(component, 7, "older")
+    manifest.update(component)
+
+    assert manifest.seed(component) is True
+    assert component.remote_version_number == 7
+    assert component.remote_version_digest == "zelda-digest"
+
+
+def test_manifest_seed_unknown(manifest: SuperglueManifest) -> None:
+    assert manifest.seed(make_component("ganon")) is False
+
+
+def test_manifest_load(manifest: SuperglueManifest, s3_client: MagicMock) -> None:
+    content = {"manifest_version": 1, "components": {"superglue_job": {"zelda": {}}}}
+    s3_client.get_object.return_value = {"Body": io.BytesIO(json.dumps(content).encode())}
+
+    assert manifest.load() is True
+    assert manifest.components == content["components"]
+    s3_client.get_object.assert_called_once_with(Bucket="some-bucket", Key="superglue/_manifest.json")
+
+
+def test_manifest_load_missing(manifest: SuperglueManifest, s3_client: MagicMock) -> None:
+    error = botocore.exceptions.ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+    s3_client.get_object.side_effect = error
+    assert manifest.load() is False
+
+
+def test_manifest_save_swaps_temporary_key(manifest: SuperglueManifest, s3_client: MagicMock) -> None:
+    manifest.save()
+
+    temp_key = s3_client.put_object.call_args.kwargs["Key"]
+    assert temp_key.startswith("superglue/_manifest.json.")
+    s3_client.copy_object.assert_called_once_with(
+        Bucket="some-bucket", Key="superglue/_manifest.json", CopySource={"Bucket": "some-bucket", "Key": temp_key}
+    )
+    s3_client.delete_object.assert_called_once_with(Bucket="some-bucket", Key=temp_key)
+
+
+def test_manifest_rebuild(manifest: SuperglueManifest) -> None:
+    zelda, ganon = make_component("zelda", version_number=2), make_component("ganon")
+    zelda.download_s3_version.side_effect = lambda n: {"version_number": n}
+
+    index = MagicMock()
+    index.available_versions.side_effect = lambda c: [1, 2, 3] if c is zelda else []
+
+    manifest.rebuild([zelda, ganon], index=index)
+
+    entry = manifest.get(zelda)
+    assert entry["latest_version"] == 3
+    assert entry["versions"] == {"2": version_digest({"version_number": 2}), "3": version_digest({"version_number": 3})}
+    assert manifest.get(ganon) is None
+    ganon.download_s3_version.assert_not_called()
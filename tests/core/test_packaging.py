@@ -0,0 +1,109 @@
+import json
+import zipfile
+from pathlib import Path
+from superglue.core.packaging import SuperglueModulePackager, build_zipfile
+
+
+def make_task(tmp_path: Path, name: str) -> dict:
+    source = tmp_path / f"{name}.py"
+    source.write_text(f"name = '{name}'\n")
+    return {
+        "name": name,
+        "zipfile": (tmp_path / f"{name}.zip").as_posix(),
+        "files": [[source.as_posix(), f"{name}/__init__.py"]],
+        "manifest_name": ".superglue-manifest",
+        "manifest": {"files": {f"{name}/__init__.py": "abc"}},
+        "compression": "deflated",
+        "compression_level": 9,
+    }
+
+
+def test_build_zipfile(tmp_path: Path) -> None:
+    result = build_zipfile(make_task(tmp_path, "spam"))
+
+    assert result["files"] == 1
+    assert result["bytes"] == (tmp_path / "spam.zip").stat().st_size
+
+    with zipfile.ZipFile(tmp_path / "spam.zip") as zip_file:
+        assert zip_file.read("spam/__init__.py") == b"name = 'spam'\n"
+        assert json.loads(zip_file.read(".superglue-manifest")) == {"files": {"spam/__init__.py": "abc"}}
+
+
+def test_build_zipfile_copies_binary_files(tmp_path: Path) -> None:
+    task = make_task(tmp_path, "spam")
+    content = bytes(range(256)) * 64
+    binary = tmp_path / "_speedups.so"
+    binary.write_bytes(content)
+    task["files"].append([binary.as_posix(), "spam/_speedups.so"])
+
+    for compression in ["deflated", "stored"]:
+        build_zipfile(dict(task, compression=compression))
+        with zipfile.ZipFile(tmp_path / "spam.zip") as zip_file:
+            assert zip_file.read("spam/_speedups.so") == content
+            assert zip_file.getinfo("spam/_speedups.so").file_size == len(content)
+
+
+def test_build_zipfile_is_reproducible(tmp_path: Path) -> None:
+    task = make_task(tmp_path, "spam")
+    extra = tmp_path / "extra.py"
+    extra.write_text("x = 1\n" * 100)
+    task["files"].insert(0, [extra.as_posix(), "spam/extra.py"])
+
+    build_zipfile(task)
+    first = (tmp_path / "spam.zip").read_bytes()
+
+    task["files"].reverse()
+    build_zipfile(task)
+    assert (tmp_path / "spam.zip").read_bytes() == first
+
+    with zipfile.ZipFile(tmp_path / "spam.zip") as zip_file:
+        assert zip_file.namelist() == ["spam/__init__.py", "spam/extra.py", ".superglue-manifest"]
+        info = zip_file.getinfo("spam/extra.py")
+        assert info.date_time == (1980, 1, 1, 0, 0, 0)
+        assert info.compress_type == zipfile.ZIP_DEFLATED
+        assert info.external_attr >> 16 == 0o100644
+
+    task["compression"] = "stored"
+    build_zipfile(task)
+    with zipfile.ZipFile(tmp_path / "spam.zip") as zip_file:
+        assert zip_file.getinfo("spam/extra.py").compress_type == zipfile.ZIP_STORED
+
+
+def test_build_zipfile_compression_level(tmp_path: Path) -> None:
+    task = make_task(tmp_path, "spam")
+    source = tmp_path / "data.py"
+    source.write_text("".join(f"value_{i} = {i * 7919 % 104729}\n" for i in range(5000)))
+    task["files"].append([source.as_posix(), "spam/data.py"])
+
+    sizes = {}
+    for level in [1, 9]:
+        build_zipfile(dict(task, compression_level=level))
+        with zipfile.ZipFile(tmp_path / "spam.zip") as zip_file:
+            sizes[level] = zip_file.getinfo("spam/data.py").compress_size
+    assert sizes[9] < sizes[1]
+
+
+def test_build_zipfile_failure_leaves_no_zipfile(tmp_path: Path) -> None:
+    task = make_task(tmp_path, "spam")
+    task["files"].append([(tmp_path / "missing.py").as_posix(), "spam/missing.py"])
+
+    try:
+        build_zipfile(task)
+    except FileNotFoundError:
+        pass
+
+    assert list(tmp_path.glob("*.zip*")) == []
+
+
+def test_packager_runs_on_processes(tmp_path: Path) -> None:
+    tasks = [make_task(tmp_path, name) for name in ["spam", "eggs", "ham"]]
+    tasks[1]["files"].append([(tmp_path / "missing.py").as_posix(), "eggs/missing.py"])
+    completed = []
+
+    results = SuperglueModulePackager(workers=2).run(tasks, on_complete=lambda r: completed.append(r["name"]))
+
+    assert [r["name"] for r in results] == ["spam", "eggs", "ham"]
+    assert [r["status"] for r in results] == ["packaged", "failed", "packaged"]
+    assert isinstance(results[1]["error"], FileNotFoundError)
+    assert sorted(completed) == ["eggs", "ham", "spam"]
+    assert (tmp_path / "ham.zip").exists()
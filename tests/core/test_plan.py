@@ -0,0 +1,87 @@
+from pathlib import Path
+from unittest.mock import MagicMock
+from superglue.core.plan import SuperglueDeployPlan
+
+
+def make_entry(name: str = "spam", glue_jobs=None) -> dict:
+    entry = {
+        "component_type": "superglue_job",
+        "component_name": name,
+        "version_number": 2,
+        "version_digest": "abc",
+        "files": [
+            {"path": "spam/main.py", "key": "k/main.py", "bytes": 10, "action": "upload"},
+            {
+                "path": "spam/big.jar",
+                "key": "k/big.jar",
+                "bytes": 20 * 1024 * 1024,
+                "action": "copy",
+                "source_key": "s",
+            },
+            {"path": "spam/lib.py", "key": "k/lib.py", "bytes": 5, "action": "skip"},
+        ],
+    }
+    if glue_jobs is not None:
+        entry["glue_jobs"] = glue_jobs
+    return entry
+
+
+def make_component(name: str = "spam", version_number: int = 2, version_digest: str = "abc") -> MagicMock:
+    component = MagicMock()
+    component.component_type = "superglue_job"
+    component.component_name = name
+    component.version_number = version_number
+    component.version_digest = version_digest
+    return component
+
+
+def test_plan_build() -> None:
+    component = make_component()
+    component.plan.return_value = make_entry()
+
+    plan = SuperglueDeployPlan.build([component])
+    assert plan.entry(component) == make_entry()
+    assert plan.entry(make_component("eggs")) is None
+
+
+def test_plan_component_summary() -> None:
+    glue_jobs = [
+        {"name": "a", "action": "create", "tags_to_add": {}, "tags_to_remove": []},
+        {"name": "b", "action": "unchanged", "tags_to_add": {}, "tags_to_remove": []},
+    ]
+    summary = SuperglueDeployPlan.component_summary(make_entry(glue_jobs=glue_jobs))
+
+    assert summary["upload_files"] == 1
+    assert summary["upload_bytes"] == 10
+    assert summary["copy_bytes"] == 20 * 1024 * 1024
+    assert summary["skip_files"] == 1
+    assert summary["glue_create"] == 1
+    assert summary["glue_unchanged"] == 1
+
+
+def test_plan_api_calls() -> None:
+    glue_jobs = [
+        {"name": "a", "action": "update", "tags_to_add": {"team": "data"}, "tags_to_remove": ["old"]},
+        {"name": "b", "action": "unchanged", "tags_to_add": {}, "tags_to_remove": []},
+    ]
+    plan = SuperglueDeployPlan([make_entry(glue_jobs=glue_jobs)], storage_mode="versioned")
+
+    # one small upload, a multipart copy of three parts, and the project manifest
+    assert plan.api_calls() == {"s3": 1 + 5 + 3, "glue": 3, "total": 12}
+    assert SuperglueDeployPlan().api_calls() == {"s3": 0, "glue": 0, "total": 0}
+
+
+def test_plan_save_and_load(tmp_path: Path) -> None:
+    plan = SuperglueDeployPlan([make_entry(glue_jobs=[])], bucket="bucket", storage_mode="versioned")
+    plan.save(tmp_path / "plan.json")
+
+    loaded = SuperglueDeployPlan.load(tmp_path / "plan.json")
+    assert loaded.components == plan.components
+    assert loaded.bucket == "bucket"
+    assert loaded.created == plan.created
+
+
+def test_plan_stale() -> None:
+    plan = SuperglueDeployPlan([make_entry("spam"), make_entry("eggs"), make_entry("ham")])
+    components = [make_component("spam"), make_component("eggs", version_digest="changed")]
+    assert plan.stale(components) == ["eggs", "ham"]
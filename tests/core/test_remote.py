@@ -0,0 +1,63 @@
+import pytest
+from typing import Dict, List
+from unittest.mock import MagicMock, patch
+from superglue.core.remote import SuperglueRemoteIndex, list_common_prefixes, list_version_numbers
+
+LISTINGS = {
+    "superglue/superglue_job/": [
+        {"CommonPrefixes": [{"Prefix": "superglue/superglue_job/zelda/"}]},
+        {"CommonPrefixes": [{"Prefix": "superglue/superglue_job/link/"}]},
+    ],
+    "superglue/superglue_job/zelda/": [
+        {"CommonPrefixes": [{"Prefix": "superglue/superglue_job/zelda/version=1/"}]},
+        {"CommonPrefixes": [{"Prefix": "superglue/superglue_job/zelda/version=12/"}]},
+    ],
+    "superglue/superglue_job/link/": [{"CommonPrefixes": [{"Prefix": "superglue/superglue_job/link/version=3/"}]}],
+}
+
+
+@pytest.fixture()
+def s3_client() -> MagicMock:
+    def paginate(**kwargs) -> List[Dict]:
+        assert kwargs["Delimiter"] == "/"
+        return LISTINGS.get(kwargs["Prefix"], [{}])
+
+    with patch("superglue.core.remote.get_client") as client:
+        client.return_value.get_paginator.return_value.paginate.side_effect = paginate
+        yield client.return_value
+
+
+def make_component(name: str) -> MagicMock:
+    component = MagicMock()
+    component.bucket = "some-bucket"
+    component.component_type = "superglue_job"
+    component.component_name = name
+    component.s3_type_prefix = "superglue/superglue_job"
+    component.s3_filter = f"superglue/superglue_job/{name}"
+    return component
+
+
+def test_list_common_prefixes_follows_pages(s3_client: MagicMock) -> None:
+    prefixes = list_common_prefixes("some-bucket", "superglue/superglue_job/")
+    assert prefixes == ["superglue/superglue_job/zelda/", "superglue/superglue_job/link/"]
+    s3_client.get_paginator.assert_called_with("list_objects_v2")
+
+
+def test_list_version_numbers(s3_client: MagicMock) -> None:
+    assert list_version_numbers("some-bucket", "superglue/superglue_job/zelda") == [1, 12]
+
+
+def test_remote_index_build(s3_client: MagicMock) -> None:
+    zelda, link, ganon = make_component("zelda"), make_component("link"), make_component("ganon")
+    index = SuperglueRemoteIndex(max_workers=2).build([zelda, link, ganon])
+
+    assert index.available_versions(zelda) == [1, 12]
+    assert index.latest_version(zelda) == 12
+    assert index.latest_version(link) == 3
+    assert index.latest_version(ganon) == 0
+
+
+def test_remote_index_skips_unknown_components(s3_client: MagicMock) -> None:
+    SuperglueRemoteIndex().build([make_component("ganon")])
+    prefixes = [c.kwargs["Prefix"] for c in s3_client.get_paginator.return_value.paginate.call_args_list]
+    assert prefixes == ["superglue/superglue_job/"]
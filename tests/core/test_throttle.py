@@ -0,0 +1,81 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from superglue.core.throttle import RetryBudget, SuperglueRateLimiter, TokenBucket, parse_rate_limits
+
+
+def error_response(code: str, status: int = 400):
+    return MagicMock(status_code=status), {"Error": {"Code": code}}
+
+
+def test_parse_rate_limits() -> None:
+    assert parse_rate_limits("glue=20, glue.UpdateJob=2.5,") == {"glue": 20.0, "glue.UpdateJob": 2.5}
+    assert parse_rate_limits("") == {}
+
+    with pytest.raises(ValueError):
+        parse_rate_limits("glue")
+
+
+def test_token_bucket_waits_when_empty() -> None:
+    bucket = TokenBucket(rate=2)
+
+    with patch("superglue.core.throttle.time.sleep") as sleep:
+        assert bucket.acquire() == 0
+        assert bucket.acquire() == 0
+        assert bucket.acquire() > 0
+        sleep.assert_called_once()
+
+
+def test_token_bucket_adapts_rate() -> None:
+    bucket = TokenBucket(rate=20)
+    bucket.throttled()
+    assert bucket.rate == 10
+
+    # a second throttle within the same second does not slow down further
+    bucket.throttled()
+    assert bucket.rate == 10
+
+    bucket.succeeded()
+    assert bucket.rate == 11
+
+    for _ in range(20):
+        bucket.succeeded()
+    assert bucket.rate == 20
+
+
+def test_retry_budget() -> None:
+    budget = RetryBudget(capacity=10)
+    assert budget.withdraw()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+    budget.deposit()
+    assert budget.available == 1
+
+
+def test_limiter_buckets() -> None:
+    limiter = SuperglueRateLimiter(rate_limits={"glue.UpdateJob": 2, "s3": 0})
+    assert limiter.bucket("glue", "UpdateJob").max_rate == 2
+    assert limiter.bucket("glue", "CreateJob").max_rate == 20
+    assert limiter.bucket("s3", "PutObject") is None
+
+
+def test_limiter_retries_throttles() -> None:
+    limiter = SuperglueRateLimiter(max_attempts=3)
+    event = "needs-retry.glue.UpdateJob"
+
+    delay = limiter.needs_retry("glue", event, attempts=1, response=error_response("ThrottlingException"))
+    assert 0 <= delay <= limiter.base_delay
+    assert limiter.bucket("glue", "UpdateJob").rate == 10
+
+    assert limiter.needs_retry("glue", event, 2, response=error_response("ConcurrentModificationException")) is not None
+    assert limiter.needs_retry("glue", event, 3, response=error_response("ThrottlingException")) is None
+    assert limiter.needs_retry("glue", event, 1, response=error_response("EntityNotFoundException")) is None
+    assert limiter.totals == {"requests": 0, "retries": 2, "throttles": 2}
+
+
+def test_limiter_respects_budget() -> None:
+    limiter = SuperglueRateLimiter(max_attempts=10, budget=RetryBudget(capacity=5))
+    event = "needs-retry.s3.PutObject"
+
+    assert limiter.needs_retry("s3", event, 1, response=error_response("SlowDown", 503)) is not None
+    assert limiter.needs_retry("s3", event, 2, response=error_response("SlowDown", 503)) is None
@@ -0,0 +1,48 @@
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from superglue.core.transfer import SuperglueUploadScheduler
+
+
+@pytest.fixture()
+def scheduler() -> SuperglueUploadScheduler:
+    with patch("superglue.core.transfer.get_client"):
+        with patch("superglue.core.transfer.create_transfer_manager"):
+            scheduler = SuperglueUploadScheduler(max_concurrency=4)
+            yield scheduler
+            scheduler.close()
+
+
+def test_scheduler_concurrency(scheduler: SuperglueUploadScheduler) -> None:
+    assert scheduler.transfer_config.max_concurrency == 4
+    assert scheduler.pool._max_workers == 4
+
+
+def test_scheduler_upload_file(scheduler: SuperglueUploadScheduler) -> None:
+    scheduler.upload_file(Path("/spam/eggs.jar"), "some-bucket", "some/key.jar")
+    scheduler.transfer_manager.upload.assert_called_once_with("/spam/eggs.jar", "some-bucket", "some/key.jar")
+    scheduler.transfer_manager.upload.return_value.result.assert_called_once()
+
+
+def test_scheduler_copy_object(scheduler: SuperglueUploadScheduler) -> None:
+    scheduler.copy_object("some-bucket", "old/key", "new/key")
+    scheduler.transfer_manager.copy.assert_called_once_with(
+        {"Bucket": "some-bucket", "Key": "old/key"}, "some-bucket", "new/key"
+    )
+
+
+def test_scheduler_map(scheduler: SuperglueUploadScheduler) -> None:
+    assert scheduler.map(lambda x: x * 2, [1, 2, 3]) == [2, 4, 6]
+
+
+def test_scheduler_map_raises_after_all_finished(scheduler: SuperglueUploadScheduler) -> None:
+    done = []
+
+    def work(item: int) -> None:
+        if item == 1:
+            raise ValueError("spam")
+        done.append(item)
+
+    with pytest.raises(ValueError):
+        scheduler.map(work, [1, 2, 3])
+    assert sorted(done) == [2, 3]
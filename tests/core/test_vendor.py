@@ -0,0 +1,73 @@
+import pytest
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+from superglue.core.vendor import SuperglueVendorCache
+
+
+def make_wheel(path: Path, name: str, tag: str = "py3-none-any") -> None:
+    purelib = "true" if tag.endswith("-none-any") else "false"
+    with zipfile.ZipFile(path / f"{name}-1.0-{tag}.whl", "w") as wheel:
+        wheel.writestr(f"{name}/__init__.py", "VALUE = 42\n")
+        wheel.writestr(f"{name}-1.0.dist-info/METADATA", f"Metadata-Version: 2.1\nName: {name}\nVersion: 1.0\n")
+        wheel.writestr(
+            f"{name}-1.0.dist-info/WHEEL",
+            f"Wheel-Version: 1.0\nGenerator: test\nRoot-Is-Purelib: {purelib}\nTag: {tag}\n",
+        )
+        wheel.writestr(f"{name}-1.0.dist-info/RECORD", "")
+
+
+def make_wheelhouse(path: Path) -> Path:
+    path.mkdir(parents=True)
+    make_wheel(path, "tinydep")
+    return path
+
+
+def test_vendor_cache_key(tmp_path: Path) -> None:
+    wheelhouse = make_wheelhouse(tmp_path / "wheelhouse")
+    cache = SuperglueVendorCache(tmp_path / "cache", wheelhouse.as_posix())
+    key = cache.key(["tinydep", "spam==1.0"])
+
+    assert key == cache.key(["spam==1.0", "tinydep"])
+    assert key != cache.key(["tinydep"])
+    assert key != SuperglueVendorCache(tmp_path / "cache", wheelhouse.as_posix(), "3.7").key(["tinydep", "spam==1.0"])
+
+    (wheelhouse / "spam-1.0-py3-none-any.whl").write_bytes(b"")
+    assert key != cache.key(["tinydep", "spam==1.0"])
+
+
+def test_vendor_cache_files(tmp_path: Path) -> None:
+    wheelhouse = make_wheelhouse(tmp_path / "wheelhouse")
+    cache = SuperglueVendorCache(tmp_path / "cache", wheelhouse.as_posix())
+
+    files = cache.files(["tinydep"])
+    key = cache.key(["tinydep"])
+
+    assert files["tinydep/__init__.py"]["path"].read_text() == "VALUE = 42\n"
+    assert "tinydep-1.0.dist-info/METADATA" in files
+    assert {f["digest"] for f in files.values()} == {f"vendor:{key}"}
+    assert cache.files([]) == {}
+
+    # installed trees are reused without running pip
+    with patch("superglue.core.vendor.subprocess.run") as run:
+        assert cache.files(["tinydep"]) == files
+        run.assert_not_called()
+
+
+def test_vendor_cache_missing_requirement(tmp_path: Path) -> None:
+    wheelhouse = make_wheelhouse(tmp_path / "wheelhouse")
+    cache = SuperglueVendorCache(tmp_path / "cache", wheelhouse.as_posix())
+
+    with pytest.raises(RuntimeError):
+        cache.files(["spam"])
+    assert list((tmp_path / "cache").iterdir()) == []
+
+
+def test_vendor_cache_platform_wheel(tmp_path: Path) -> None:
+    wheelhouse = make_wheelhouse(tmp_path / "wheelhouse")
+    make_wheel(wheelhouse, "fastdep", "cp310-cp310-manylinux2014_x86_64")
+    cache = SuperglueVendorCache(tmp_path / "cache", wheelhouse.as_posix())
+
+    with pytest.raises(RuntimeError, match="fastdep-1.0 is not a pure python wheel"):
+        cache.files(["tinydep", "fastdep"])
+    assert list((tmp_path / "cache").iterdir()) == []